@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Benchmark the peak memory of rendering huge generated modules within a budget of the parsed source files."""
+import argparse
+import importlib
+import json
+import os
+import pathlib
+import py_compile
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, List, MutableMapping, Optional
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+import sphinx_icontract  # pylint: disable=wrong-import-position
+import benchmark_rendering  # pylint: disable=wrong-import-position
+import synthetic  # pylint: disable=wrong-import-position
+
+# pylint: disable=protected-access
+
+
+def reset_peak_rss() -> bool:
+    """Reset the peak resident set size of this process (only on Linux); return True if it has been reset."""
+    try:
+        with open('/proc/self/clear_refs', 'wt') as fid:
+            fid.write('5')
+    except OSError:
+        return False
+
+    return True
+
+
+def peak_rss() -> int:
+    """Measure the peak resident set size of this process in bytes."""
+    try:
+        with open('/proc/self/status', 'rt') as fid:
+            mtch = re.search(r'^VmHWM:\s+(\d+) kB$', fid.read(), flags=re.MULTILINE)
+    except OSError:
+        mtch = None
+
+    if mtch is not None:
+        return int(mtch.group(1)) * 1024
+
+    # ru_maxrss is given in kilobytes on Linux and can not be reset.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure_child(directory: str, budget: Optional[int]) -> int:
+    """Render the contracts of the generated module in this process and print the measurements as JSON."""
+    sys.path.insert(0, directory)
+    module = importlib.import_module('huge_module')
+    events = benchmark_rendering.collect_events(module=module)
+    contracts = sum(benchmark_rendering.count_contracts(what=what, obj=obj) for what, obj in events)
+
+    # The module itself is not part of the rendering so we measure from the memory after the import. If the peak
+    # can not be reset, the peak of the import is the baseline and might hide the peak of the rendering.
+    reset = reset_peak_rss()
+    baseline = peak_rss()
+
+    benchmark_rendering.reset_caches()
+    sphinx_icontract._index.SOURCE_INDEXES.budget = budget
+
+    start = time.perf_counter()
+    benchmark_rendering.render(events=events)
+    duration = time.perf_counter() - start
+
+    peak = peak_rss()
+
+    print(
+        json.dumps({
+            'contracts': contracts,
+            'seconds': duration,
+            'contracts_per_second': contracts / duration,
+            'baseline_rss_bytes': baseline,
+            'peak_rss_bytes': peak,
+            'rendering_rss_bytes': peak - baseline,
+            'peak_reset': reset,
+            'evictions': sphinx_icontract._index.SOURCE_INDEXES.evictions
+        }))
+
+    return 0
+
+
+def measure(directory: str, budget: Optional[int]) -> MutableMapping[str, Any]:
+    """Measure the rendering in a separate process so that the peak memory is not affected by the other runs."""
+    command = [sys.executable, __file__, '--child', directory]
+    if budget is not None:
+        command.extend(['--child_budget', str(budget)])
+
+    output = subprocess.check_output(command, universal_newlines=True)
+
+    result = json.loads(output.strip().splitlines()[-1])  # type: MutableMapping[str, Any]
+    return result
+
+
+def main() -> int:
+    """Execute the main routine."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--contracts",
+        help="Approximate total numbers of the contracts in the generated modules",
+        type=int,
+        nargs='+',
+        default=[10000, 50000])
+    parser.add_argument("--per_function", help="Number of the contracts per function", type=int, default=6)
+    parser.add_argument(
+        "--budget", help="Memory budget of the parsed source files in megabytes", type=float, default=64)
+    parser.add_argument("--json", help="Path to the file where the results are written as JSON")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--child_budget", help=argparse.SUPPRESS, type=int)
+    args = parser.parse_args()
+
+    if args.child:
+        return measure_child(directory=args.child, budget=args.child_budget)
+
+    results = []  # type: List[MutableMapping[str, Any]]
+
+    for contracts in args.contracts:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            functions = (contracts + args.per_function - 1) // args.per_function
+            with open(os.path.join(tmp_dir, 'huge_module.py'), 'wt') as fid:
+                fid.write(synthetic.generate_module(functions=functions, contracts=args.per_function))
+
+            size = os.path.getsize(os.path.join(tmp_dir, 'huge_module.py'))
+
+            # Compile the module ahead so that the peak of the compilation does not hide the peak of the rendering.
+            py_compile.compile(os.path.join(tmp_dir, 'huge_module.py'), doraise=True)
+
+            for budget in [None, int(args.budget * 2**20)]:
+                result = measure(directory=tmp_dir, budget=budget)
+                result['module_bytes'] = size
+                result['budget_bytes'] = budget
+                results.append(result)
+
+                print("{:>7} contracts ({:5.1f} MB module), budget {:>9}: "
+                      "{:8.0f} contracts/s, rendering {:7.1f} MB, peak RSS {:7.1f} MB".format(
+                          result['contracts'], size / 2**20, 'none'
+                          if budget is None else '{:.0f} MB'.format(budget / 2**20), result['contracts_per_second'],
+                          result['rendering_rss_bytes'] / 2**20, result['peak_rss_bytes'] / 2**20))
+
+    if args.json:
+        with open(args.json, 'wt') as fid:
+            json.dump(results, fid, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""Benchmark the throughput of rendering the contracts on synthetic modules."""
+import argparse
+import importlib
+import inspect
+import json
+import os
+import pathlib
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from typing import Any, List, Tuple, MutableMapping
+
+import icontract
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+import sphinx_icontract  # pylint: disable=wrong-import-position
+import synthetic  # pylint: disable=wrong-import-position
+
+# pylint: disable=protected-access
+
+
+def collect_events(module: Any) -> List[Tuple[str, Any]]:
+    """Collect the docstring events (``what`` and the object) which autodoc emits for the members of the module."""
+    events = []  # type: List[Tuple[str, Any]]
+    for _, obj in sorted(vars(module).items()):
+        if getattr(obj, '__module__', None) != module.__name__:
+            continue
+
+        if inspect.isfunction(obj):
+            events.append(('function', obj))
+
+        elif inspect.isclass(obj):
+            events.append(('class', obj))
+
+            for _, attr in sorted(vars(obj).items()):
+                if inspect.isfunction(attr):
+                    events.append(('method', attr))
+                elif isinstance(attr, property):
+                    events.append(('attribute', attr))
+
+    return events
+
+
+def count_contracts(what: str, obj: Any) -> int:
+    """Count the contracts (including the snapshots) rendered for the object."""
+    if what == 'class':
+        return len(getattr(obj, '__invariants__', []))
+
+    funcs = [obj.fget, obj.fset, obj.fdel] if isinstance(obj, property) else [obj]
+
+    count = 0
+    for func in funcs:
+        checker = None if func is None else icontract._checkers.find_checker(func=func)
+        if checker is not None:
+            pps = sphinx_icontract._format.preconditions_snapshots_postconditions(checker=checker)
+            count += sum(len(group) for group in pps.preconditions) + len(pps.snapshots) + len(pps.postconditions)
+
+    return count
+
+
+def reset_caches() -> None:
+    """Reset all the caches of sphinx-icontract so that the next rendering is cold."""
+    sphinx_icontract._reset_caches()
+    sphinx_icontract._renderings.DISK_CACHE = None
+    sphinx_icontract._renderings.PREWARMED = None
+
+
+def render(events: List[Tuple[str, Any]]) -> None:
+    """Render the contracts of all the events."""
+    for what, obj in events:
+        list(sphinx_icontract._format.format_contracts(what=what, obj=obj))
+
+
+def benchmark_format_contracts(directory: str, modules: int) -> MutableMapping[str, Any]:
+    """Measure the throughput and the peak memory of ``_format_contracts`` on the generated package."""
+    sys.path.insert(0, directory)
+
+    events = []  # type: List[Tuple[str, Any]]
+    for i in range(modules):
+        events.extend(collect_events(module=importlib.import_module('synthetic_package.module_{}'.format(i))))
+
+    contracts = sum(count_contracts(what=what, obj=obj) for what, obj in events)
+
+    reset_caches()
+    start = time.perf_counter()
+    render(events=events)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    render(events=events)
+    warm = time.perf_counter() - start
+
+    # Measure the memory in a separate run since tracing slows down the execution.
+    reset_caches()
+    tracemalloc.start()
+    render(events=events)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'events': len(events),
+        'contracts': contracts,
+        'cold_seconds': cold,
+        'cold_contracts_per_second': contracts / cold,
+        'warm_seconds': warm,
+        'warm_contracts_per_second': contracts / warm,
+        'peak_traced_memory_bytes': peak
+    }
+
+
+def benchmark_condition_as_text(modules: int, number: int) -> MutableMapping[str, Any]:
+    """Measure the pattern matching of the conditions (``_condition_as_text``) on the already inspected lambdas."""
+    events = []  # type: List[Tuple[str, Any]]
+    for i in range(modules):
+        events.extend(collect_events(module=importlib.import_module('synthetic_package.module_{}'.format(i))))
+
+    conditions = []  # type: List[Any]
+    for what, obj in events:
+        if what == 'class':
+            contracts = list(getattr(obj, '__invariants__', []))
+        else:
+            funcs = [obj.fget, obj.fset, obj.fdel] if isinstance(obj, property) else [obj]
+            contracts = []
+            for func in funcs:
+                checker = None if func is None else icontract._checkers.find_checker(func=func)
+                if checker is not None:
+                    pps = sphinx_icontract._format.preconditions_snapshots_postconditions(checker=checker)
+                    contracts.extend(contract for group in pps.preconditions for contract in group)
+                    contracts.extend(pps.postconditions)
+
+        conditions.extend(
+            contract.condition for contract in contracts
+            if icontract._represent.is_lambda(a_function=contract.condition))
+
+    # Deduplicate the inherited contracts.
+    conditions = list({id(condition): condition for condition in conditions}.values())
+
+    inspections = [
+        icontract._represent.find_lambda_condition(
+            decorator_inspection=sphinx_icontract._index.inspect_decorator(func=condition)) for condition in conditions
+    ]
+
+    def run() -> None:
+        for inspection in inspections:
+            sphinx_icontract._render.condition_as_text(lambda_inspection=inspection)
+
+    seconds = timeit.timeit(run, number=number)
+
+    return {'conditions': len(inspections), 'seconds_per_condition': seconds / (number * len(inspections))}
+
+
+def run_sphinx(source_dir: str, build_dir: str, with_extension: bool, prerender: bool) -> MutableMapping[str, Any]:
+    """Build the generated Sphinx project in a separate process and measure it."""
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.pathsep.join([str(pathlib.Path(__file__).parent.parent), env.get('PYTHONPATH', '')])
+    if not with_extension:
+        env['BENCHMARK_WITHOUT_SPHINX_ICONTRACT'] = 'true'
+    if prerender:
+        env['BENCHMARK_PRERENDER'] = 'true'
+
+    output = subprocess.check_output(
+        [sys.executable, __file__, '--sphinx_child', source_dir, build_dir], env=env, universal_newlines=True)
+
+    result = json.loads(output.strip().splitlines()[-1])  # type: MutableMapping[str, Any]
+    return result
+
+
+def sphinx_child(source_dir: str, build_dir: str) -> int:
+    """Build the Sphinx project in this process and print the duration and the peak memory as JSON."""
+    import sphinx.cmd.build  # pylint: disable=import-outside-toplevel
+
+    start = time.perf_counter()
+    exit_code = sphinx.cmd.build.build_main([
+        '-q', '-E', '-b', 'html', '-d',
+        os.path.join(build_dir, 'doctrees'), source_dir,
+        os.path.join(build_dir, 'html')
+    ])
+    duration = time.perf_counter() - start
+
+    # ru_maxrss is given in kilobytes on Linux.
+    print(
+        json.dumps({
+            'seconds': duration,
+            'peak_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        }))
+
+    return exit_code
+
+
+def main() -> int:
+    """Execute the main routine."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modules", help="Number of the generated modules", type=int, default=5)
+    parser.add_argument("--functions", help="Number of the functions per module", type=int, default=100)
+    parser.add_argument("--contracts", help="Number of the contracts per function", type=int, default=6)
+    parser.add_argument("--classes", help="Number of the class hierarchies per module", type=int, default=5)
+    parser.add_argument("--depth", help="Depth of the class hierarchies", type=int, default=3)
+    parser.add_argument(
+        "--number", help="Number of repetitions in the micro-benchmarks of the pattern matching", type=int, default=100)
+    parser.add_argument("--skip_sphinx", help="Do not benchmark the full Sphinx build", action='store_true')
+    parser.add_argument("--json", help="Path to the file where the results are written as JSON")
+    parser.add_argument("--sphinx_child", help=argparse.SUPPRESS, nargs=2)
+    args = parser.parse_args()
+
+    if args.sphinx_child:
+        return sphinx_child(source_dir=args.sphinx_child[0], build_dir=args.sphinx_child[1])
+
+    results = dict()  # type: MutableMapping[str, Any]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source_dir = os.path.join(tmp_dir, 'source')
+        synthetic.generate_package(
+            directory=source_dir,
+            modules=args.modules,
+            functions=args.functions,
+            contracts=args.contracts,
+            classes=args.classes,
+            depth=args.depth)
+
+        results['format_contracts'] = benchmark_format_contracts(directory=source_dir, modules=args.modules)
+
+        fmt = results['format_contracts']
+        print("_format_contracts: {} events, {} contracts".format(fmt['events'], fmt['contracts']))
+        print("  cold: {:10.0f} contracts/s ({:.3f} s)".format(fmt['cold_contracts_per_second'], fmt['cold_seconds']))
+        print("  warm: {:10.0f} contracts/s ({:.3f} s)".format(fmt['warm_contracts_per_second'], fmt['warm_seconds']))
+        print("  peak traced memory: {:.1f} MB".format(fmt['peak_traced_memory_bytes'] / 2**20))
+
+        results['condition_as_text'] = benchmark_condition_as_text(modules=args.modules, number=args.number)
+        cond = results['condition_as_text']
+        print("_condition_as_text: {} conditions, {:.2f} µs per condition".format(cond['conditions'],
+                                                                                  cond['seconds_per_condition'] * 1e6))
+
+        if not args.skip_sphinx:
+            synthetic.generate_sphinx_project(directory=source_dir, modules=args.modules)
+
+            # (name, with extension, pre-rendering, build directory)
+            builds = [
+                ('without_extension', False, False, 'build_without'),
+                ('cold', True, False, 'build'),
+                ('warm_disk_cache', True, False, 'build'),
+                ('cold_prerendered', True, True, 'build_prerendered'),
+            ]
+
+            results['sphinx_build'] = dict()
+            for name, with_extension, prerender, build_subdir in builds:
+                results['sphinx_build'][name] = run_sphinx(
+                    source_dir=source_dir,
+                    build_dir=os.path.join(tmp_dir, build_subdir),
+                    with_extension=with_extension,
+                    prerender=prerender)
+
+            if (os.cpu_count() or 1) < 2:
+                print("Warning: the pre-rendering can not speed up the build on a single CPU core.")
+
+            print("sphinx-build:")
+            for name, build in results['sphinx_build'].items():
+                print("  {:<18} {:8.3f} s, peak RSS {:.1f} MB".format(name, build['seconds'],
+                                                                      build['peak_rss_bytes'] / 2**20))
+
+    if args.json:
+        with open(args.json, 'wt') as fid:
+            json.dump(results, fid, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Benchmark the overhead of the self-checks of sphinx-icontract on the docstring events."""
+import argparse
+import os
+import pathlib
+import subprocess
+import sys
+import timeit
+from typing import List
+
+import icontract
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+import sphinx_icontract  # pylint: disable=wrong-import-position
+
+# pylint: disable=missing-docstring
+
+
+@icontract.require(lambda x: x > 0)
+@icontract.require(lambda x: x % 2 == 0, "x must be even", error=lambda: ValueError("x must be even"))
+@icontract.snapshot(lambda lst: lst[:])
+@icontract.ensure(lambda OLD, lst: OLD.lst == lst)
+@icontract.ensure(lambda result: result > 0)
+def some_func(x: int, lst: List[int]) -> int:
+    return x
+
+
+@icontract.invariant(lambda self: self.x > 0)
+class SomeClass(icontract.DBC):
+    def __init__(self) -> None:
+        self.x = 1
+
+    @property
+    @icontract.ensure(lambda result: result > 0)
+    def some_prop(self) -> int:
+        return self.x
+
+
+def measure(number: int) -> float:
+    """Measure the average duration of a docstring event in seconds."""
+    events = [('function', some_func), ('class', SomeClass), ('attribute', SomeClass.some_prop)]
+
+    def run() -> None:
+        for what, obj in events:
+            sphinx_icontract.process_docstring(app=None, what=what, name='', obj=obj, options=None, lines=[])
+
+    # Warm up the caches so that only the per-event overhead is measured.
+    run()
+
+    return timeit.timeit(run, number=number) / (number * len(events))
+
+
+def main() -> int:
+    """Execute the main routine."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", help="Number of repetitions", type=int, default=10000)
+    parser.add_argument("--measure", help="Only measure in this process and print the result", action='store_true')
+    args = parser.parse_args()
+
+    if args.measure:
+        print(measure(number=args.number))
+        return 0
+
+    results = dict()
+    for mode, slow in [('checked', True), ('production', False)]:
+        env = os.environ.copy()
+        if slow:
+            env['ICONTRACT_SLOW'] = 'true'
+        else:
+            env.pop('ICONTRACT_SLOW', None)
+
+        output = subprocess.check_output(
+            [sys.executable, __file__, '--measure', '--number',
+             str(args.number)], env=env, universal_newlines=True)
+        results[mode] = float(output.strip())
+
+    for mode, duration in results.items():
+        print("{:<12} {:8.2f} µs per docstring event".format(mode, duration * 1e6))
+
+    print("Saved {:.2f} µs ({:.0f}%) per docstring event in the production mode".format(
+        (results['checked'] - results['production']) * 1e6,
+        100.0 * (results['checked'] - results['production']) / results['checked']))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Benchmark the cost of sphinx-icontract at the start of Sphinx (importing and setting up the extension)."""
+import argparse
+import json
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, List, MutableMapping
+
+# Modules which we do not want to import at the start
+_HEAVY_MODULES = ['icontract', 'asttokens', 'concurrent.futures']
+
+
+def measure(directory: str, preload_sphinx: bool) -> MutableMapping[str, Any]:
+    """Measure the import and the set-up of the extension in this process."""
+    # pylint: disable=import-outside-toplevel
+    if preload_sphinx:
+        # Sphinx and autodoc are always imported before the extension in a real build.
+        import sphinx.application
+        import sphinx.ext.autodoc  # pylint: disable=unused-import
+
+    start = time.perf_counter()
+    import sphinx_icontract
+    import_seconds = time.perf_counter() - start
+
+    result = {'import_seconds': import_seconds}  # type: MutableMapping[str, Any]
+
+    if preload_sphinx:
+        app = sphinx.application.Sphinx(
+            srcdir=directory,
+            confdir=None,
+            outdir=os.path.join(directory, 'html'),
+            doctreedir=os.path.join(directory, 'doctrees'),
+            buildername='html',
+            status=None,
+            warning=None)
+        app.setup_extension('sphinx.ext.autodoc')
+
+        start = time.perf_counter()
+        app.setup_extension('sphinx_icontract')
+        app.config.init_values()
+        sphinx_icontract._builder_inited(app)  # pylint: disable=protected-access
+        result['setup_seconds'] = time.perf_counter() - start
+
+    result['heavy_modules'] = [name for name in _HEAVY_MODULES if name in sys.modules]
+
+    return result
+
+
+def main() -> int:
+    """Execute the main routine."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", help="Number of the measured processes", type=int, default=10)
+    parser.add_argument("--measure", help=argparse.SUPPRESS, nargs=2)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(directory=args.measure[0], preload_sphinx=args.measure[1] == 'sphinx')))
+        return 0
+
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.pathsep.join([str(pathlib.Path(__file__).parent.parent), env.get('PYTHONPATH', '')])
+
+    # Measure with the compiled bytecode as in an installed package.
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        (pathlib.Path(tmp_dir) / 'index.rst').write_text('Index\n=====\n')
+
+        for mode in ['standalone', 'sphinx']:
+            # Run once more to compile the bytecode so that it does not distort the first measurement.
+            runs = []  # type: List[MutableMapping[str, Any]]
+            for _ in range(args.repeat + 1):
+                output = subprocess.check_output(
+                    [sys.executable, __file__, '--measure', tmp_dir, mode], env=env, universal_newlines=True)
+                runs.append(json.loads(output.strip().splitlines()[-1]))
+
+            runs = runs[1:]
+
+            print("{}:".format(mode))
+            print("  import sphinx_icontract: {:8.2f} ms (median)".format(
+                statistics.median(run['import_seconds'] for run in runs) * 1e3))
+
+            if mode == 'sphinx':
+                print("  setup and builder-inited: {:6.2f} ms (median)".format(
+                    statistics.median(run['setup_seconds'] for run in runs) * 1e3))
+
+            print("  heavy modules imported: {}".format(', '.join(runs[-1]['heavy_modules']) or 'none'))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""Generate synthetic modules with contracts for the benchmarks."""
+import os
+import textwrap
+from typing import List
+
+# yapf: disable
+_FUNCTION_CONTRACTS = [
+    # single-line lambda
+    '@icontract.require(lambda x: x > {i})',
+    # implication
+    '@icontract.require(lambda x: not (x > {i}) or x % 2 == 0)',
+    # multi-line lambda
+    textwrap.dedent('''\
+        @icontract.require(
+            lambda lst:
+            all(
+                item > {i}
+                for item in lst
+            )
+        )'''),
+    # error lambda
+    '@icontract.require(lambda x: x < 1000 + {i}, error=lambda: ValueError("x must be small"))',
+    # description
+    '@icontract.ensure(lambda result: result > {i}, "result positive")',
+    # snapshot
+    textwrap.dedent('''\
+        @icontract.snapshot(lambda lst: lst[:], name="{tag}lst_{i}")
+        @icontract.ensure(lambda OLD, lst: OLD.{tag}lst_{i} == lst)'''),
+]
+# yapf: enable
+
+
+def _function(name: str, contracts: int, indent: str = '', tag: str = '') -> List[str]:
+    """
+    Generate the source code of a function with the given number of contracts.
+
+    The ``tag`` is prepended to the snapshot names so that the overriding methods do not conflict
+    with the snapshots of the overridden ones.
+    """
+    lines = []  # type: List[str]
+    for i in range(contracts):
+        lines.extend(_FUNCTION_CONTRACTS[i % len(_FUNCTION_CONTRACTS)].format(i=i, tag=tag).splitlines())
+
+    lines.append('def {}(x: int, lst: List[int]) -> int:'.format(name))
+    lines.append('    """Do something."""')
+    lines.append('    return x')
+
+    return [indent + line for line in lines]
+
+
+def _class_hierarchy(name: str, depth: int, contracts: int) -> List[str]:
+    """Generate a class hierarchy with invariants, overridden methods and properties."""
+    lines = []  # type: List[str]
+    for level in range(depth):
+        base = '{}{}'.format(name, level - 1) if level > 0 else 'icontract.DBC'
+
+        lines.append('@icontract.invariant(lambda self: self.x > {})'.format(level))
+        lines.append('class {}{}({}):'.format(name, level, base))
+        lines.append('    """Represent some class."""')
+        lines.append('')
+        lines.append('    def __init__(self) -> None:')
+        lines.append('        self.x = 1')
+        lines.append('')
+        lines.extend(_function(name='some_method', contracts=contracts, indent='    ', tag='level{}_'.format(level)))
+        lines.append('')
+        lines.append('    @property')
+        lines.append('    @icontract.ensure(lambda result: result > {})'.format(level))
+        lines.append('    def some_property(self) -> int:')
+        lines.append('        """Get something."""')
+        lines.append('        return self.x')
+        lines.append('')
+        lines.append('')
+
+    return lines
+
+
+class Stats:
+    """Represent the statistics of the generated code."""
+
+    def __init__(self) -> None:
+        """Initialize with zeros."""
+        self.modules = 0
+        self.functions = 0
+        self.classes = 0
+
+
+def generate_module(functions: int, contracts: int, classes: int = 0, depth: int = 3) -> str:
+    """
+    Generate the source code of a module.
+
+    :param functions: number of the module-level functions
+    :param contracts: number of the contracts per function or method
+    :param classes: number of the class hierarchies
+    :param depth: depth of each class hierarchy
+    :return: source code
+    """
+    lines = ['"""Provide synthetic functions and classes with contracts."""', 'from typing import List', '']
+    lines.append('import icontract')
+    lines.append('')
+    lines.append('')
+
+    for i in range(functions):
+        lines.extend(_function(name='some_func_{}'.format(i), contracts=contracts))
+        lines.append('')
+        lines.append('')
+
+    for i in range(classes):
+        lines.extend(_class_hierarchy(name='SomeClass{}_'.format(i), depth=depth, contracts=contracts))
+
+    return '\n'.join(lines) + '\n'
+
+
+def generate_package(directory: str, modules: int, functions: int, contracts: int, classes: int = 0,
+                     depth: int = 3) -> Stats:
+    """
+    Generate a package ``synthetic_package`` with the given number of modules in the ``directory``.
+
+    :return: statistics of the generated code
+    """
+    package_dir = os.path.join(directory, 'synthetic_package')
+    os.makedirs(package_dir, exist_ok=True)
+
+    with open(os.path.join(package_dir, '__init__.py'), 'wt') as fid:
+        fid.write('"""Provide synthetic modules with contracts."""\n')
+
+    stats = Stats()
+    for i in range(modules):
+        with open(os.path.join(package_dir, 'module_{}.py'.format(i)), 'wt') as fid:
+            fid.write(generate_module(functions=functions, contracts=contracts, classes=classes, depth=depth))
+
+        stats.modules += 1
+        stats.functions += functions
+        stats.classes += classes * depth
+
+    return stats
+
+
+def generate_sphinx_project(directory: str, modules: int) -> None:
+    """Generate a Sphinx project documenting the package ``synthetic_package`` generated in the ``directory``."""
+    with open(os.path.join(directory, 'conf.py'), 'wt') as fid:
+        fid.write(
+            textwrap.dedent('''\
+            import os
+            import sys
+
+            sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+            project = 'synthetic_package'
+            extensions = ['sphinx.ext.autodoc']
+
+            if not os.environ.get('BENCHMARK_WITHOUT_SPHINX_ICONTRACT'):
+                extensions.append('sphinx_icontract')
+
+            if os.environ.get('BENCHMARK_PRERENDER'):
+                icontract_prerender_modules = [
+                    'synthetic_package.module_{{}}'.format(i) for i in range({modules})]
+            '''.format(modules=modules)))
+
+    with open(os.path.join(directory, 'index.rst'), 'wt') as fid:
+        fid.write('Synthetic\n=========\n\n')
+        for i in range(modules):
+            fid.write('.. automodule:: synthetic_package.module_{}\n    :members:\n\n'.format(i))
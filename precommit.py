@@ -28,15 +28,15 @@ def main() -> int:
     if overwrite:
         subprocess.check_call(
             [
-                "yapf", "--in-place", "--style=style.yapf", "--recursive", "tests", "sphinx_icontract", "setup.py",
-                "precommit.py"
+                "yapf", "--in-place", "--style=style.yapf", "--recursive", "tests", "sphinx_icontract", "benchmarks",
+                "setup.py", "precommit.py"
             ],
             cwd=str(repo_root))
     else:
         subprocess.check_call(
             [
-                "yapf", "--diff", "--style=style.yapf", "--recursive", "tests", "sphinx_icontract", "setup.py",
-                "precommit.py"
+                "yapf", "--diff", "--style=style.yapf", "--recursive", "tests", "sphinx_icontract", "benchmarks",
+                "setup.py", "precommit.py"
             ],
             cwd=str(repo_root))
 
@@ -66,6 +66,10 @@ def main() -> int:
     print("Doctesting...")
     subprocess.check_call([sys.executable, "-m", "doctest", str(repo_root / "README.rst")])
     for pth in (repo_root / "sphinx_icontract").glob("**/*.py"):
+        # The module __main__ would collide with the __main__ of doctest itself.
+        if pth.name == "__main__.py":
+            continue
+
         subprocess.check_call([sys.executable, "-m", "doctest", str(pth)])
 
     return 0
@@ -1,16 +1,29 @@
 """Add contracts to the documentation."""
-import ast
 import inspect
-import re
-import textwrap
-from typing import List, Callable, Any, Optional, Tuple, Sequence, cast, overload, Union, Iterator
-
-import asttokens
-import icontract
-import icontract._checkers
-import icontract._represent
+import json
+import os
+import sys
+import typing
+from typing import List, Callable, Any, Optional, Tuple, Dict
 
 import sphinx_icontract_meta
+import sphinx_icontract._batch
+import sphinx_icontract._disk_cache
+import sphinx_icontract._env
+import sphinx_icontract._format
+import sphinx_icontract._index
+import sphinx_icontract._lines
+import sphinx_icontract._patterns
+import sphinx_icontract._prerender
+import sphinx_icontract._profiling
+import sphinx_icontract._render
+import sphinx_icontract._renderings
+import sphinx_icontract._statistics
+
+if typing.TYPE_CHECKING:
+    # icontract is imported only once the contracts are rendered so that the start of Sphinx does not pay for it
+    # (see :func:`sphinx_icontract._format.format_contracts`).
+    import icontract
 
 __title__ = sphinx_icontract_meta.__title__
 __description__ = sphinx_icontract_meta.__description__
@@ -25,644 +38,466 @@ __copyright__ = sphinx_icontract_meta.__copyright__
 # rather add noise to the most clients of icontract library.
 # pylint: disable=protected-access
 
+Lines = sphinx_icontract._lines.Lines
+PatternFunc = sphinx_icontract._patterns.PatternFunc
+NegationFunc = sphinx_icontract._patterns.NegationFunc
 
-class Lines(icontract.DBC):
-    """Represent a sequence of text lines."""
-
-    # yapf: disable
-    @icontract.require(
-        lambda lines:
-        all(
-            '\n' not in line and '\r' not in line
-            for line in lines
-        )
-    )
-    # yapf: enable
-    def __new__(cls, lines: Sequence[str]) -> "Lines":
-        r"""
-        Ensure the properties on the ``lines``.
-
-        Please make sure that you transfer the "ownership" immediately to Lines
-        and don't modify the original list of strings any more:
+render_module = sphinx_icontract._batch.render_module
+render_class = sphinx_icontract._batch.render_class
+render_async = sphinx_icontract._batch.render_async
 
-        .. code-block: python
 
-            ##
-            # OK
-            ##
+def _register(func: Callable[..., Any]) -> None:
+    """Record the registered function and drop the renderings made without it."""
+    sphinx_icontract._render.CONTRACT_CACHE.clear()
+    sphinx_icontract._renderings.register(
+        name='{}.{}'.format(getattr(func, '__module__', None), getattr(func, '__qualname__', repr(func))))
 
-            lines = Lines(some_text.splitlines())
 
-            ##
-            # Not OK
-            ##
-
-            some_lines = some_text.splitlines()
-            lines = Lines(some_lines)
-            # ... do something assuming ``lines`` is immutable ...
+def register_pattern(node_type: type, pattern: PatternFunc, first: bool = False) -> None:
+    """
+    Register a pattern to pretty-print the single-line conditions whose body is an AST node of the given type.
 
-            some_lines[0] = "This will break \n your logic"
-            # ERROR! lines[0] now contains a new-line which is unexpected!
+    The patterns of a node type are tried in the order of the registration and the first match is rendered.
+    If no pattern matches, the condition is rendered as-is.
 
-        """
-        return cast(Lines, lines)
+    Register the patterns in the ``setup`` of your Sphinx extension or in ``conf.py`` before any contract
+    is rendered.
 
-    def __add__(self, other: "Lines") -> "Lines":
-        """Concatenate two list of lines."""
-        raise NotImplementedError("Only for type annotations")
+    :param node_type: type of the AST node of the lambda body (*e.g.*, ``ast.Call`` for ``all(...)``)
+    :param pattern:
+        function given the parsing obtained with ``asttokens`` and the body node, returning
+        the reST text or None if the pattern does not match
+    :param first: if set, try the pattern before the patterns already registered for the node type
+    :return:
+    """
+    patterns = sphinx_icontract._patterns.PATTERNS.get(node_type, [])
+    sphinx_icontract._patterns.PATTERNS[node_type] = [pattern] + patterns if first else patterns + [pattern]
 
-    # pylint: disable=function-redefined
+    _register(func=pattern)
 
-    @overload
-    def __getitem__(self, index: int) -> str:
-        """Get the item at the given integer index."""
-        pass
 
-    @overload
-    def __getitem__(self, index: slice) -> "Lines":
-        """Get the slice of the lines."""
-        pass
+def register_negation(node_type: type, negation: NegationFunc) -> None:
+    """
+    Register how to negate an AST node of the given type in an implication ``not A or B`` rendered as ``A ⇒ B``.
 
-    def __getitem__(self, index: Union[int, slice]) -> Union[str, "Lines"]:
-        """Get the line(s) at the given index."""
-        raise NotImplementedError("Only for type annotations")
+    The registered negation replaces the previous negation of the node type.
 
-    def __len__(self) -> int:
-        """Return the number of the lines."""
-        raise NotImplementedError("Only for type annotations")
+    :param node_type: type of the AST node of ``A``
+    :param negation:
+        function given the parsing obtained with ``asttokens`` and the node, returning the text of the negation
+        or None if the node can not be negated
+    :return:
+    """
+    sphinx_icontract._patterns.NEGATIONS[node_type] = negation
 
-    def __iter__(self) -> Iterator[str]:
-        """Iterate over the lines."""
-        raise NotImplementedError("Only for type annotations")
+    _register(func=negation)
 
 
-def _negate_compare_text(atok: asttokens.ASTTokens, node: ast.Compare) -> str:
+def _object_has_contracts(what: str, obj: Any) -> bool:
     """
-    Generate the text representing the negation of the comparison node.
-
-    :param atok:
-        parsing obtained with ``asttokens`` so that we can access the last tokens of a node.
+    Check whether the class, the function or the property has contracts.
 
-        The standard ``ast`` module provides only the first token of an AST node. In lack of concrete syntax tree,
-        getting text from first to last token is currently the simplest approach.
-    :param node: AST node representing the comparison in a condition
-    :return: text representation of the node's negation
+    The objects are given as yielded by :func:`sphinx_icontract._prerender.class_members`.
     """
-    assert len(node.ops) == 1, "A single comparison expected, but got: {}".format(len(node.ops))
-    assert len(node.comparators) == 1, "A single comparator expected, but got: {}".format(len(node.comparators))
+    import icontract  # pylint: disable=import-outside-toplevel,redefined-outer-name
 
-    operator = node.ops[0]
-    left = node.left
-    right = node.comparators[0]
+    if what == 'class':
+        # The classes with the metaclass of icontract inherit the contracts of their bases.
+        return isinstance(obj, icontract.DBCMeta) or bool(getattr(obj, "__invariants__", None))
 
-    left_text = atok.get_text(node=left)
-    right_text = atok.get_text(node=right)
+    if what == 'attribute':
+        return any(
+            func is not None
+            and sphinx_icontract._format.function_contracts(func=func) is not sphinx_icontract._format.NO_CONTRACTS
+            for func in [obj.fget, obj.fset, obj.fdel])
 
-    text = ''
+    return sphinx_icontract._format.function_contracts(func=obj) is not sphinx_icontract._format.NO_CONTRACTS
 
-    if isinstance(operator, ast.Eq):
-        text = '{} != {}'.format(left_text, right_text)
 
-    elif isinstance(operator, ast.NotEq):
-        text = '{} == {}'.format(left_text, right_text)
+def _defines_contracts(module: Any) -> bool:
+    """Check whether any function or class defined in the module, including the nested classes, has contracts."""
+    classes = []  # type: List[type]
+    for _, what, obj in sphinx_icontract._prerender.module_members(module=module):
+        if _object_has_contracts(what=what, obj=obj):
+            return True
 
-    elif isinstance(operator, ast.Lt):
-        text = '{} >= {}'.format(left_text, right_text)
+        if what == 'class':
+            classes.append(obj)
 
-    elif isinstance(operator, ast.LtE):
-        text = '{} > {}'.format(left_text, right_text)
+    # The nested classes are not walked by :func:`sphinx_icontract._prerender.module_members`.
+    visited = set(id(cls) for cls in classes)
+    while classes:
+        cls = classes.pop()
+        for value in list(vars(cls).values()):
+            if not inspect.isclass(value) or value.__module__ != module.__name__ or id(value) in visited:
+                continue
 
-    elif isinstance(operator, ast.Gt):
-        text = '{} <= {}'.format(left_text, right_text)
+            if any(
+                    _object_has_contracts(what=what, obj=obj)
+                    for _, what, obj in sphinx_icontract._prerender.class_members(cls=value)):
+                return True
 
-    elif isinstance(operator, ast.GtE):
-        text = '{} < {}'.format(left_text, right_text)
+            visited.add(id(value))
+            classes.append(value)
 
-    elif isinstance(operator, ast.Is):
-        text = '{} is not {}'.format(left_text, right_text)
+    return False
 
-    elif isinstance(operator, ast.IsNot):
-        text = '{} is {}'.format(left_text, right_text)
 
-    elif isinstance(operator, ast.In):
-        text = '{} not in {}'.format(left_text, right_text)
+def _documented_has_contracts(obj: Any) -> bool:
+    """Check whether the documented function, class or property has contracts regardless of its module."""
+    if isinstance(obj, property):
+        return _object_has_contracts(what='attribute', obj=obj)
 
-    elif isinstance(operator, ast.NotIn):
-        text = '{} in {}'.format(left_text, right_text)
+    if inspect.isclass(obj):
+        return _object_has_contracts(what='class', obj=obj)
 
-    else:
-        raise NotImplementedError("Unhandled comparison operator: {}".format(operator))
+    return callable(
+        obj) and sphinx_icontract._format.function_contracts(func=obj) is not sphinx_icontract._format.NO_CONTRACTS
 
-    return text
 
+# Map module name -> True if no function or class defined in the module has contracts
+_CONTRACT_FREE_MODULES = dict()  # type: Dict[str, bool]
 
-def _condition_as_text(lambda_inspection: icontract._represent.ConditionLambdaInspection) -> Lines:
-    """Format condition lambda function as reST lines."""
-    lambda_ast_node = lambda_inspection.node
-    assert isinstance(lambda_ast_node, ast.Lambda)
 
-    body_node = lambda_ast_node.body
-
-    is_multiline_condition = '\n' in lambda_inspection.text
-
-    if not is_multiline_condition:
-        # Pretty-print single-line implications
-        text = None  # type: Optional[str]
+def _contract_free(what: str, obj: Any) -> bool:
+    """
+    Check whether the documented object comes from a module which defines no contracts.
 
-        if isinstance(body_node, ast.BoolOp) and isinstance(body_node.op, ast.Or) and len(body_node.values) == 2:
-            left, right = body_node.values
+    The module is scanned on the first docstring event of its objects. Only the objects reachable from the module
+    (*i.e.*, not defined in a local scope of a function) are considered since the scan can not see the others.
 
-            if isinstance(left, ast.UnaryOp) and isinstance(left.op, ast.Not):
-                # Handle the case: not A or B is transformed to A => B
-                text = ':code:`{}` ⇒ :code:`{}`'.format(
-                    lambda_inspection.atok.get_text(node=left.operand), lambda_inspection.atok.get_text(node=right))
+    The module of an object does not necessarily define its contracts (*e.g.*, a wrapper made with
+    :func:`functools.wraps` takes over the module of the wrapped function), so the object itself is checked as well.
 
-            elif isinstance(left, (ast.UnaryOp, ast.BinOp, ast.GeneratorExp, ast.IfExp)):
-                text = ':code:`not ({})` ⇒ :code:`{}`'.format(
-                    lambda_inspection.atok.get_text(node=left), lambda_inspection.atok.get_text(node=right))
+    :param what: what is documented (as in autodoc, *e.g.*, ``function``)
+    :param obj: documented object
+    :return: True if the object can not have contracts
+    """
+    if 'icontract' not in sys.modules:
+        # No module can have contracts if icontract has not been imported.
+        return True
 
-            elif isinstance(left, ast.Compare) and len(left.ops) == 1:
-                text = ':code:`{}` ⇒ :code:`{}`'.format(
-                    _negate_compare_text(atok=lambda_inspection.atok, node=left),
-                    lambda_inspection.atok.get_text(node=right))
+    if what == 'module':
+        module_name = getattr(obj, '__name__', None)
+    else:
+        func = obj.fget if isinstance(obj, property) else obj
 
-            elif isinstance(left, (ast.Call, ast.Attribute, ast.Name, ast.Subscript, ast.Index, ast.Slice, ast.ExtSlice,
-                                   ast.ListComp, ast.SetComp, ast.DictComp)):
-                text = ':code:`not {}` ⇒ :code:`{}`'.format(
-                    lambda_inspection.atok.get_text(node=left), lambda_inspection.atok.get_text(node=right))
+        qualname = getattr(func, '__qualname__', None)
+        if not isinstance(qualname, str) or '<locals>' in qualname:
+            return False
 
-        elif (isinstance(body_node, ast.IfExp) and isinstance(body_node.orelse, ast.NameConstant)
-              and body_node.orelse.value):
-            text = ':code:`{}` ⇒ :code:`{}`'.format(
-                lambda_inspection.atok.get_text(node=body_node.test),
-                lambda_inspection.atok.get_text(node=body_node.body))
-        else:
-            # None of the patterns matched.
-            assert text is None
-            pass
+        module_name = getattr(func, '__module__', None)
 
-        if text is not None:
-            return Lines([text])
+    if not isinstance(module_name, str):
+        return False
 
-    # None of the previous re-formats worked, take the default approach.
-    if not is_multiline_condition:
-        result = [':code:`{}`'.format(lambda_inspection.atok.get_text(node=body_node))]
-    else:
-        result = ['.. code-block:: python', '']
+    contract_free = _CONTRACT_FREE_MODULES.get(module_name, None)
+    if contract_free is None:
+        module = sys.modules.get(module_name, None)
+        if module is None:
+            return False
 
-        dedented_body_lines = _smart_dedent_multi_line_lambda_condition(Lines(lambda_inspection.text.splitlines()))
+        contract_free = not _defines_contracts(module=module)
+        _CONTRACT_FREE_MODULES[module_name] = contract_free
 
-        for line in dedented_body_lines:
-            result.append('  {}'.format(line))
+    return contract_free and (what == 'module' or not _documented_has_contracts(obj=obj))
 
-        result.append('')
 
-    return Lines(result)
+# If set, the contracts of the documented objects are counted. Set when the builder is initialized.
+_STATISTICS = False
 
 
-def _error_type_and_message(
-        decorator_inspection: icontract._represent.DecoratorInspection) -> Tuple[Optional[str], Optional[str]]:
+def _object_statistics(what: str, obj: Any,
+                       has_contracts: bool) -> Optional[sphinx_icontract._statistics.ObjectStatistics]:
     """
-    Inspect the error argument of a contract and infer the error type and the message if the error is given as a lambda.
+    Count the contracts of the documented object from the already collected contracts and rendering paths.
 
-    If the error argument is not given or if it is not given as a lambda function, return immediately.
+    All the contracts of the object are counted including the inherited ones, even if they are rendered only as
+    a reference to the bases.
 
-    The error message is inferred as the single string-literal argument to a single call in the lambda body.
-
-    :param decorator_inspection: inspection of a contract decorator
-    :return: error type (None if not inferrable), error message (None if not inferrable)
+    :param what: what has been documented (*e.g.*, ``function``)
+    :param obj: documented object
+    :param has_contracts: if not set, the object is known to have no contracts and they are not looked up
+    :return: statistics, or None if the object can not have contracts
     """
-    call_node = decorator_inspection.node
-
-    error_arg_node = None  # type: Optional[ast.AST]
-    for keyword in call_node.keywords:
-        if keyword.arg == 'error':
-            error_arg_node = keyword.value
-
-    if error_arg_node is None and len(call_node.args) == 5:
-        error_arg_node = call_node.args[4]
-
-    if not isinstance(error_arg_node, ast.Lambda):
-        return None, None
-
-    body_node = error_arg_node.body
-
-    # The body of the error lambda needs to be a callable, since it needs to return an instance of Exception
-    if not isinstance(body_node, ast.Call):
-        return None, None
-
-    error_type = decorator_inspection.atok.get_text(node=body_node.func)
-
-    error_message = None  # type: Optional[str]
-    if len(body_node.args) == 1 and len(body_node.keywords) == 0:
-        if isinstance(body_node.args[0], ast.Str):
-            error_message = body_node.args[0].s
-
-    elif len(body_node.args) == 0 and len(body_node.keywords) == 1:
-        if isinstance(body_node.keywords[0].value, ast.Str):
-            error_message = body_node.keywords[0].value.s
-
-    else:
-        # The error message could not be inferred.
+    funcs = []  # type: List[Callable[..., Any]]
+    if what in ['function', 'method']:
+        funcs = [obj]
+    elif what == 'attribute' and isinstance(obj, property):
+        funcs = [func for func in [obj.fget, obj.fset, obj.fdel] if func is not None]
+    elif what == 'class':
         pass
-
-    return error_type, error_message
-
-
-def _format_contract(contract: icontract._Contract) -> Lines:
-    """Format the contract as reST."""
-    # pylint: disable=too-many-branches
-    decorator_inspection = None  # type: Optional[icontract._represent.DecoratorInspection]
-
-    ##
-    # Parse condition
-    ##
-
-    if not icontract._represent.is_lambda(a_function=contract.condition):
-        condition_lines = Lines([':py:func:`{}`'.format(contract.condition.__name__)])
-    else:
-        # We need to extract the source code corresponding to the decorator since inspect.getsource() is broken with
-        # lambdas.
-
-        # Find the line corresponding to the condition lambda
-        lines, condition_lineno = inspect.findsource(contract.condition)
-        filename = inspect.getsourcefile(contract.condition)
-        if filename is None:
-            filename = "<filename unavailable>"
-
-        decorator_inspection = icontract._represent.inspect_decorator(
-            lines=lines, lineno=condition_lineno, filename=filename)
-
-        lambda_inspection = icontract._represent.find_lambda_condition(decorator_inspection=decorator_inspection)
-        assert lambda_inspection is not None, \
-            "Expected non-None lambda inspection with the condition: {}".format(contract.condition)
-
-        condition_lines = _condition_as_text(lambda_inspection=lambda_inspection)
-
-    ##
-    # Parse error
-    ##
-
-    error_type = None  # type: Optional[str]
-
-    # Error message is set only for an error of a contract given as a lambda that takes no arguments and returns
-    # a result of a call on a string literal (*e.g.*, ``error=ValueError("some message")``.
-    error_msg = None  # type: Optional[str]
-
-    if contract.error is not None:
-        if isinstance(contract.error, type):
-            error_type = contract.error.__qualname__
-        elif callable(contract.error) and icontract._represent.is_lambda(a_function=contract.error):
-            if decorator_inspection is None:
-                lines, condition_lineno = inspect.findsource(contract.error)
-                filename = inspect.getsourcefile(contract.error)
-                if filename is None:
-                    filename = "<filename unavailable>"
-
-                decorator_inspection = icontract._represent.inspect_decorator(
-                    lines=lines, lineno=condition_lineno, filename=filename)
-
-            error_type, error_msg = _error_type_and_message(decorator_inspection=decorator_inspection)
-        else:
-            # Error type could not be inferred
-            pass
-
-    ##
-    # Format
-    ##
-
-    description = None  # type: Optional[str]
-    if contract.description:
-        description = contract.description
-    elif error_msg is not None:
-        description = error_msg
     else:
-        # Description could not be inferred.
-        pass
+        return None
 
-    doc = None  # type: Optional[str]
-    if description and error_type:
-        if description.strip()[-1] in [".", "!", "?"]:
-            doc = "{} Raise :py:class:`{}`".format(description, error_type)
-        elif description.strip()[-1] in [",", ";"]:
-            doc = "{} raise :py:class:`{}`".format(description, error_type)
-        else:
-            doc = "{}; raise :py:class:`{}`".format(description, error_type)
+    module = getattr(funcs[0] if funcs else obj, '__module__', None)
+    statistics = sphinx_icontract._statistics.ObjectStatistics(
+        what=what, module=module if isinstance(module, str) else None)
 
-    elif not description and error_type:
-        doc = "Raise :py:class:`{}`".format(error_type)
+    if not has_contracts:
+        return statistics
 
-    elif description and not error_type:
-        doc = description
+    def count(contracts: List["icontract._Contract"], kind: str, contract_kind: str) -> None:
+        """Count the contracts of the given kind and the rendering paths of their conditions."""
+        if not contracts:
+            return
 
-    else:
-        # No extra documentation can be generated since the error type could not be inferred and
-        # no contract description was given.
-        doc = None
+        statistics.kinds[kind] += len(contracts)
+        for contract in contracts:
+            statistics.paths[sphinx_icontract._render.render_contract(contract=contract, kind=contract_kind)[1]] += 1
 
-    if doc is not None:
-        result = condition_lines + Lines(["", "({})".format(doc)])
-    else:
-        result = condition_lines
+    for func in funcs:
+        pps = sphinx_icontract._format.function_contracts(func=func)
+        for i, group in enumerate(pps.preconditions):
+            count(
+                contracts=group,
+                kind=sphinx_icontract._statistics.REQUIRES if i == 0 else sphinx_icontract._statistics.REQUIRES_ELSE,
+                contract_kind='precondition')
 
-    return result
+        if pps.snapshots:
+            statistics.kinds[sphinx_icontract._statistics.OLD] += len(pps.snapshots)
 
+        count(contracts=pps.postconditions, kind=sphinx_icontract._statistics.ENSURES, contract_kind='postcondition')
 
-def _make_bullet(lines: Lines) -> Lines:
-    """
-    Indent the lines and put the bullet point in front.
+    if what == 'class':
+        count(
+            contracts=getattr(obj, "__invariants__", []),
+            kind=sphinx_icontract._statistics.ESTABLISHES,
+            contract_kind='invariant')
 
-    >>> _make_bullet(Lines(['x', '', '  y']))
-    ['    * x', '', '        y']
-    """
-    result = []  # type: List[str]
-    for i, line in enumerate(lines):
-        if i == 0:
-            result.append('    * {}'.format(line))
-        else:
-            if len(line.strip()) > 0:
-                result.append('      {}'.format(line))
-            else:
-                result.append('')
+    return statistics
 
-    return Lines(result)
 
+def _record_statistics(data: sphinx_icontract._env.DocumentData, what: str, name: str, obj: Any,
+                       has_contracts: bool) -> None:
+    """Record the statistics of the documented object in the data of the document, if the statistics are collected."""
+    if not _STATISTICS:
+        return
 
-_WHITESPACE_PREFIX_RE = re.compile(r'^\s+')
+    statistics = _object_statistics(what=what, obj=obj, has_contracts=has_contracts)
+    if statistics is not None:
+        data.statistics[name] = statistics
 
 
-def _smart_dedent_multi_line_lambda_condition(lines: Lines) -> Lines:
-    """
-    Try to dedent multi-line lambda condition for better aesthetics.
+def _format_contracts_profiled(profiler: sphinx_icontract._profiling.Profiler,
+                               data: Optional[sphinx_icontract._env.DocumentData], what: str, name: str,
+                               obj: Any) -> List[str]:
+    """Format the contracts of the documented object and record the time spent in the profiler."""
+    since = None if data is None else profiler.checkpoint(cache_counters=_cache_counters())
 
-    The first line is usually not indented, while the following lines are
-    (since we inspect the source code).
-    """
-    if len(lines) == 0:
-        return lines
+    # The time not spent in the nested phases goes to the assembly of the reST.
+    profiler.enter(sphinx_icontract._profiling.REST_ASSEMBLY)
+    try:
+        return list(sphinx_icontract._format.format_contracts(what=what, obj=obj))
+    finally:
+        seconds = profiler.exit()
+        profiler.record_object(what=what, name=name, seconds=seconds)
 
-    # If the first line is already indented, try to dedent it as a block
-    if _WHITESPACE_PREFIX_RE.match(lines[0]):
-        return Lines(textwrap.dedent('\n'.join(lines)).splitlines())
+        if data is not None and since is not None:
+            if data.profile is None:
+                data.profile = sphinx_icontract._profiling.DocumentProfile()
 
-    dedented = textwrap.dedent('\n'.join(lines[1:]))
-    dedented_lines = dedented.splitlines()
+            data.profile.add_event(
+                what=what,
+                name=name,
+                seconds=seconds,
+                since=since,
+                until=profiler.checkpoint(cache_counters=_cache_counters()))
 
-    return Lines([lines[0]] + dedented_lines)
 
+def process_docstring(app, what, name, obj, options, lines):
+    """React to a docstring event and append contracts to it."""
+    # pylint: disable=unused-argument
+    # pylint: disable=too-many-arguments
+    data = sphinx_icontract._env.document_data(app=app)
 
-@icontract.require(lambda prefix: prefix is None or prefix == prefix.strip())
-@icontract.ensure(lambda preconditions, result: not preconditions or len(result) > 0)
-def _format_preconditions(preconditions: List[List[icontract._Contract]], prefix: Optional[str] = None) -> Lines:
-    """
-    Format preconditions as reST.
-
-    :param preconditions: preconditions of a function
-    :param prefix: prefix of the ``:requires:`` and ``:requires else:`` directive
-    :return: list of lines
-    """
-    if not preconditions:
-        return Lines([])
+    if _contract_free(what=what, obj=obj):
+        if data is not None:
+            data.short_circuited += 1
+            _record_statistics(data=data, what=what, name=name, obj=obj, has_contracts=False)
 
-    result = []  # type: List[str]
-    for i, group in enumerate(preconditions):
-        if i == 0:
-            if prefix is not None:
-                result.append(":{} requires:".format(prefix))
-            else:
-                result.append(":requires:")
-        else:
-            if prefix is not None:
-                result.append(":{} requires else:".format(prefix))
-            else:
-                result.append(":requires else:")
+        return
 
-        for precondition in group:
-            contract_bullet_point = _make_bullet(_format_contract(contract=precondition))
-            result.extend(contract_bullet_point)
+    profiler = sphinx_icontract._profiling.PROFILER
+    if profiler is None:
+        contract_lines = list(sphinx_icontract._format.format_contracts(what=what, obj=obj))
+    else:
+        contract_lines = _format_contracts_profiled(profiler=profiler, data=data, what=what, name=name, obj=obj)
 
-    return Lines(result)
+    lines.extend(contract_lines)
 
+    if data is not None:
+        if contract_lines:
+            if name not in data.blocks:
+                data.counts[what] += 1
 
-def _capture_as_text(capture: Callable[..., Any]) -> Lines:
-    """Convert the capture function into its text representation by parsing the source code of the decorator."""
-    if not icontract._represent.is_lambda(a_function=capture):
-        signature = inspect.signature(capture)
-        param_names = list(signature.parameters.keys())
+            data.blocks[name] = contract_lines
 
-        return Lines(["{}({})".format(capture.__qualname__, ", ".join(param_names))])
+        disk_cache = sphinx_icontract._renderings.DISK_CACHE
+        if disk_cache is not None:
+            data.renderings.extend(disk_cache.take_new_entries())
 
-    lines, lineno = inspect.findsource(capture)
-    filename = inspect.getsourcefile(capture)
-    if filename is None:
-        filename = "<filename unavailable>"
+        _record_statistics(data=data, what=what, name=name, obj=obj, has_contracts=len(contract_lines) > 0)
 
-    decorator_inspection = icontract._represent.inspect_decorator(lines=lines, lineno=lineno, filename=filename)
 
-    call_node = decorator_inspection.node
+def _cache_counters() -> Dict[str, Tuple[int, int]]:
+    """Collect the hits and misses of the caches."""
+    counters = {
+        'contracts': (sphinx_icontract._render.CONTRACT_CACHE.hits, sphinx_icontract._render.CONTRACT_CACHE.misses),
+        'captures': (sphinx_icontract._render.CAPTURE_CACHE.hits, sphinx_icontract._render.CAPTURE_CACHE.misses),
+        'errors': (sphinx_icontract._render.ERROR_CACHE.hits, sphinx_icontract._render.ERROR_CACHE.misses),
+        'checkers': (sphinx_icontract._format.CHECKER_CACHE.hits, sphinx_icontract._format.CHECKER_CACHE.misses)
+    }
 
-    capture_node = None  # type: Optional[ast.Lambda]
+    disk_cache = sphinx_icontract._renderings.DISK_CACHE
+    if disk_cache is not None:
+        counters['disk'] = (disk_cache.hits, disk_cache.misses)
 
-    if len(call_node.args) > 0:
-        assert isinstance(call_node.args[0], ast.Lambda), \
-            ("Expected the first argument to the snapshot decorator to be a condition as lambda AST node, "
-             "but got: {}").format(type(call_node.args[0]))
+    return counters
 
-        capture_node = call_node.args[0]
 
-    elif len(call_node.keywords) > 0:
-        for keyword in call_node.keywords:
-            if keyword.arg == "capture":
-                assert isinstance(keyword.value, ast.Lambda), \
-                    "Expected lambda node as value of the 'capture' argument to the decorator."
+def _load_prewarmed(path: str) -> Optional[sphinx_icontract._disk_cache.Archive]:
+    """Load the archive pre-warming the disk cache, or warn and ignore it if it is not usable in this build."""
+    # Import sphinx only here so that the rendering does not depend on it.
+    import sphinx.util.logging  # pylint: disable=import-outside-toplevel
+    logger = sphinx.util.logging.getLogger(__name__)
 
-                capture_node = keyword.value
-                break
+    try:
+        archive = sphinx_icontract._disk_cache.read_archive(path=path)
+    except (OSError, ValueError) as error:
+        logger.warning('sphinx-icontract: the pre-warmed cache could not be loaded from {}: {}'.format(path, error))
+        return None
 
-        assert capture_node is not None, "Expected to find a keyword AST node with 'capture' arg, but found none"
-    else:
-        raise AssertionError(
-            "Expected a call AST node of a snapshot decorator to have either args or keywords, but got: {}".format(
-                ast.dump(call_node)))
+    # The archive has been built for the renderings of a particular version of sphinx-icontract and icontract.
+    # We need to import icontract here, but the pre-warmed cache is configured only for the packages with contracts.
+    version = sphinx_icontract._renderings.version()
+    if archive.version != version:
+        logger.warning('sphinx-icontract: the pre-warmed cache {} has been built for the version {!r}, '
+                       'but the version {!r} is needed; the cache is ignored'.format(path, archive.version, version))
+        return None
 
-    capture_text = decorator_inspection.atok.get_text(capture_node.body)
+    return archive
 
-    dedented_capture = _smart_dedent_multi_line_lambda_condition(capture_text.splitlines())
 
-    return dedented_capture
+def _reset_caches() -> None:
+    """Drop all the cached renderings and the indexed source files so that the next rendering starts cold."""
+    sphinx_icontract._render.CONTRACT_CACHE.clear()
+    sphinx_icontract._render.CAPTURE_CACHE.clear()
+    sphinx_icontract._render.ERROR_CACHE.clear()
+    sphinx_icontract._render.ERROR_CODE_CACHE.clear()
+    sphinx_icontract._format.CHECKER_CACHE.clear()
+    sphinx_icontract._index.SOURCE_INDEXES.clear()
+    sphinx_icontract._renderings.PRERENDERED.clear()
+    _CONTRACT_FREE_MODULES.clear()
 
 
-@icontract.require(lambda prefix: prefix is None or prefix == prefix.strip())
-@icontract.ensure(lambda snapshots, result: not snapshots or len(result) > 0)
-def _format_snapshots(snapshots: List[icontract._Snapshot], prefix: Optional[str] = None) -> Lines:
+def _builder_inited(app):
     """
-    Format snapshots as reST.
+    Reset the caches so that the changes to the sources are picked up, and load the pre-warmed disk cache.
 
-    :param snapshots: snapshots defined to capture the argument values of a function before the invocation
-    :param prefix: prefix to be prepended to ``:OLD:`` directive
-    :return: list of lines describing the snapshots
+    Start the profiling if it is enabled.
     """
-    if not snapshots:
-        return Lines([])
-
-    result = []  # type: List[str]
-
-    if prefix is not None:
-        result.append(":{} OLD:".format(prefix))
-    else:
-        result.append(":OLD:")
-
-    for snapshot in snapshots:
-        capture_lines = _capture_as_text(capture=snapshot.capture)
+    # pylint: disable=global-statement
+    global _STATISTICS
 
-        if len(capture_lines) == 1:
-            result.append("    * :code:`.{}` = :code:`{}`".format(snapshot.name, capture_lines[0]))
-        else:
-            capture_point = [':code:`.{}` ='.format(snapshot.name), '', '.. code-block: python', '']  # type: List[str]
-            capture_point.extend(capture_lines)
-            capture_point.append('')
+    _reset_caches()
+    budget = app.config.icontract_source_memory_budget
+    sphinx_icontract._index.SOURCE_INDEXES.budget = None if budget is None else int(budget * 2**20)
 
-            result.extend(_make_bullet(Lines(capture_point)))
+    sphinx_icontract._env.SHORT_CIRCUITED = 0
 
-    return Lines(result)
+    directory = None  # type: Optional[str]
+    if app.config.icontract_disk_cache:
+        directory = app.config.icontract_cache_dir
+        if directory is None:
+            directory = os.path.join(str(app.doctreedir), 'sphinx_icontract')
 
+    prewarmed = None  # type: Optional[sphinx_icontract._disk_cache.Archive]
+    if directory is not None and app.config.icontract_prewarm_cache is not None:
+        prewarmed = _load_prewarmed(path=app.config.icontract_prewarm_cache)
 
-@icontract.require(lambda prefix: prefix is None or prefix == prefix.strip())
-@icontract.ensure(lambda postconditions, result: not postconditions or len(result) > 0)
-def _format_postconditions(postconditions: List[icontract._Contract], prefix: Optional[str] = None) -> Lines:
-    """
-    Format postconditions as reST.
-
-    :param postconditions: postconditions of a function
-    :param prefix: prefix to be prepended to ``:ensures:`` directive
-    :return: list of lines describing the postconditions
-    """
-    if not postconditions:
-        return Lines([])
+    sphinx_icontract._renderings.DISK_CACHE = None
+    sphinx_icontract._renderings.DISK_CACHE_DIRECTORY = directory
+    sphinx_icontract._renderings.PREWARMED = prewarmed
 
-    result = []  # type: List[str]
+    sphinx_icontract._format.INHERITED_AS_REFERENCE = bool(app.config.icontract_inherited_as_reference)
+    _STATISTICS = bool(app.config.icontract_statistics)
 
-    if prefix is not None:
-        result.append(":{} ensures:".format(prefix))
+    if app.config.icontract_profile:
+        sphinx_icontract._profiling.PROFILER = sphinx_icontract._profiling.Profiler(cache_counters=_cache_counters())
     else:
-        result.append(":ensures:")
-
-    for postcondition in postconditions:
-        contract_bullet_point = _make_bullet(_format_contract(contract=postcondition))
-        result.extend(contract_bullet_point)
-
-    return Lines(result)
-
-
-@icontract.ensure(lambda invariants, result: not invariants or len(result) > 0)
-def _format_invariants(invariants: List[icontract._Contract]) -> Lines:
-    """Format invariants as reST."""
-    if not invariants:
-        return Lines([])
-
-    result = [":establishes:"]  # type: List[str]
-    for invariant in invariants:
-        contract_bullet_point = _make_bullet(_format_contract(contract=invariant))
-        result.extend(contract_bullet_point)
-
-    return Lines(result)
-
-
-class _PrePostSnaps:
-    """Represent preconditions, snapshots and postconditions associated with a contract checker."""
+        sphinx_icontract._profiling.PROFILER = None
 
-    def __init__(self, preconditions: List[List[icontract._Contract]], snapshots: List[icontract._Snapshot],
-                 postconditions: List[icontract._Contract]) -> None:
-        """Initialize with the given values."""
-        self.preconditions = preconditions
-        self.snapshots = snapshots
-        self.postconditions = postconditions
 
-
-def _preconditions_snapshots_postconditions(checker: Callable) -> _PrePostSnaps:
-    """Collect the preconditions, snapshots and postconditions from a contract checker of a function."""
-    preconditions = getattr(checker, "__preconditions__", [])  # type: List[List[icontract._Contract]]
-
-    assert all(isinstance(precondition_group, list) for precondition_group in preconditions)
-    assert (all(
-        isinstance(precondition, icontract._Contract) for precondition_group in preconditions
-        for precondition in precondition_group))
-
-    # Filter empty precondition groups ("require else" blocks)
-    preconditions = [group for group in preconditions if len(group) > 0]
-
-    snapshots = getattr(checker, "__postcondition_snapshots__", [])  # type: List[icontract._Snapshot]
-    assert all(isinstance(snap, icontract._Snapshot) for snap in snapshots)
-
-    postconditions = getattr(checker, "__postconditions__", [])  # type: List[icontract._Contract]
-
-    assert all(isinstance(postcondition, icontract._Contract) for postcondition in postconditions)
-
-    return _PrePostSnaps(preconditions=preconditions, snapshots=snapshots, postconditions=postconditions)
-
-
-def _format_function_contracts(func: Callable, prefix: Optional[str] = None) -> Lines:
+def _build_finished(app, exception):
     """
-    Format the preconditions and postconditions of a function given its checker decorator.
+    Persist the renderings and report the short-circuited events, the statistics and the profile.
 
-    :param func: function whose contracts we are describing
-    :param prefix: prefix to be prepended to the contract directives such as ``get`` or ``set``
-    :return: list of lines
+    Release the indexed source files.
     """
-    checker = icontract._checkers.find_checker(func=func)
-    if checker is None:
-        return Lines([])
-
-    pps = _preconditions_snapshots_postconditions(checker=checker)
-
-    pre_block = _format_preconditions(preconditions=pps.preconditions, prefix=prefix)
-    old_block = _format_snapshots(snapshots=pps.snapshots, prefix=prefix)
-    post_block = _format_postconditions(postconditions=pps.postconditions, prefix=prefix)
-
-    return pre_block + old_block + post_block
-
-
-def _format_property_contracts(prop: property) -> Lines:
-    result = []  # type: List[str]
-    for func, prefix in zip([prop.fget, prop.fset, prop.fdel], ['get', 'set', 'del']):
-        result.extend(_format_function_contracts(func=func, prefix=prefix))  # type: ignore
-
-    return Lines(result)
+    # pylint: disable=unused-argument
+    disk_cache = sphinx_icontract._renderings.DISK_CACHE
+    if disk_cache is not None:
+        disk_cache.flush()
 
+    # Import sphinx only here so that the rendering does not depend on it.
+    import sphinx.util.logging  # pylint: disable=import-outside-toplevel
+    logger = sphinx.util.logging.getLogger(__name__)
 
-def _format_contracts(what: str, obj: Any) -> Lines:
-    """Format the contracts as reST."""
-    if what in ['function', 'method', 'attribute']:
-        if what == 'attribute':
-            if not isinstance(obj, property):
-                return Lines([])
+    if sphinx_icontract._env.SHORT_CIRCUITED > 0:
+        logger.info('sphinx-icontract: {} docstring event(s) short-circuited in the modules without contracts'.format(
+            sphinx_icontract._env.SHORT_CIRCUITED))
 
-            return _format_property_contracts(prop=obj)
+    env = getattr(app, 'env', None)
+    if _STATISTICS and env is not None:
+        documents = sphinx_icontract._env.env_documents(env=env)
+        statistics = sphinx_icontract._statistics.to_jsonable(
+            objects=(item for docname in sorted(documents) for item in documents[docname].statistics.items()))
 
-        if what in ['function', 'method']:
-            return _format_function_contracts(func=obj)
+        logger.info(sphinx_icontract._statistics.format_summary(jsonable=statistics))
 
-        raise NotImplementedError("Unhandled what: {}".format(what))
+        if app.config.icontract_statistics_json is not None:
+            with open(app.config.icontract_statistics_json, 'wt', encoding='utf-8') as fid:
+                json.dump(statistics, fid, indent=2)
 
-    elif what == 'class':
-        invariants = getattr(obj, "__invariants__", [])  # type: List[icontract._Contract]
-        assert isinstance(invariants, list)
-        assert all(isinstance(inv, icontract._Contract) for inv in invariants)
+    profiler = sphinx_icontract._profiling.PROFILER
+    if profiler is not None:
+        jsonable = profiler.to_jsonable(cache_counters=_cache_counters())
+        sphinx_icontract._profiling.PROFILER = None
 
-        return _format_invariants(invariants=invariants)
+        logger.info(sphinx_icontract._profiling.format_summary(jsonable=jsonable, top=app.config.icontract_profile_top))
 
-    # Only properties, functions and classes have contracts.
-    return Lines([])
+        if app.config.icontract_profile_json is not None:
+            with open(app.config.icontract_profile_json, 'wt', encoding='utf-8') as fid:
+                json.dump(jsonable, fid, indent=2)
 
-
-def process_docstring(app, what, name, obj, options, lines):
-    """React to a docstring event and append contracts to it."""
-    # pylint: disable=unused-argument
-    # pylint: disable=too-many-arguments
-    lines.extend(_format_contracts(what=what, obj=obj))
+    # Release the memory maps of the source files which have not been parsed as a whole.
+    sphinx_icontract._index.SOURCE_INDEXES.clear()
 
 
 def setup(app):
     """Set up the extension in Sphinx."""
+    app.add_config_value('icontract_disk_cache', True, '')
+    app.add_config_value('icontract_cache_dir', None, '')
+    app.add_config_value('icontract_prewarm_cache', None, '')
+    app.add_config_value('icontract_prerender_modules', [], '')
+    app.add_config_value('icontract_prerender_workers', None, '')
+    app.add_config_value('icontract_source_memory_budget', None, '')
+    app.add_config_value('icontract_inherited_as_reference', False, 'env')
+    app.add_config_value('icontract_statistics', False, 'env')
+    app.add_config_value('icontract_statistics_json', None, '')
+    app.add_config_value('icontract_profile', False, '')
+    app.add_config_value('icontract_profile_top', 10, '')
+    app.add_config_value('icontract_profile_json', None, '')
+
+    app.connect('builder-inited', _builder_inited)
+    app.connect('env-before-read-docs', sphinx_icontract._env.before_read_docs)
+    app.connect('env-purge-doc', sphinx_icontract._env.purge_doc)
+    app.connect('env-merge-info', sphinx_icontract._env.merge_info)
+    app.connect('env-updated', sphinx_icontract._env.updated)
+    app.connect('build-finished', _build_finished)
     app.connect('autodoc-process-docstring', process_docstring)
-    return dict(parallel_read_safe=True)
+    # The version of the environment is bumped whenever the data stored in it (see
+    # :class:`sphinx_icontract._env.DocumentData`) changes, including the module of its class.
+    return dict(parallel_read_safe=True, parallel_write_safe=True, env_version=3)
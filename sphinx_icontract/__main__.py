@@ -0,0 +1,53 @@
+"""Export the contracts of the given packages or pre-warm the cache of their documentation without running Sphinx."""
+import argparse
+import sys
+from typing import List, Optional, TextIO
+
+import sphinx_icontract._disk_cache
+import sphinx_icontract._export
+import sphinx_icontract._prewarm
+
+# The command-line interface wraps the protected modules of the package.
+# pylint: disable=protected-access
+
+
+def main(argv: Optional[List[str]] = None, stdout: TextIO = sys.stdout) -> int:
+    """Execute the main routine."""
+    parser = argparse.ArgumentParser(prog='python -m sphinx_icontract', description=__doc__)
+    subparsers = parser.add_subparsers(dest='command')
+
+    export_parser = subparsers.add_parser(
+        'export', help="Stream the contracts of the packages as JSON Lines, one record per contract")
+    export_parser.add_argument(
+        'modules', help="Fully qualified names of the modules or packages (including their submodules)", nargs='+')
+    export_parser.add_argument("--output", help="Path to the output file; if not given, write to STDOUT")
+
+    prewarm_parser = subparsers.add_parser(
+        'prewarm', help="Render the contracts of the packages into a cache loaded by the documentation builds")
+    prewarm_parser.add_argument(
+        'modules', help="Fully qualified names of the modules or packages (including their submodules)", nargs='+')
+    prewarm_parser.add_argument(
+        "--output", help="Path to the cache file (set it as icontract_prewarm_cache in conf.py)", required=True)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'prewarm':
+        archive = sphinx_icontract._prewarm.build_archive(names=args.modules)
+        sphinx_icontract._disk_cache.write_archive(archive=archive, path=args.output)
+        return 0
+
+    if args.command != 'export':
+        parser.print_usage(sys.stderr)
+        return 1
+
+    if args.output is None:
+        sphinx_icontract._export.export(names=args.modules, stream=stdout)
+    else:
+        with open(args.output, 'wt', encoding='utf-8') as fid:
+            sphinx_icontract._export.export(names=args.modules, stream=fid)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
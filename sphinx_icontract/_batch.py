@@ -0,0 +1,141 @@
+"""Render the contracts of many objects at once, or of a single object without blocking an event loop."""
+import collections
+import functools
+import sys
+import threading
+import typing
+import weakref
+from typing import Any, Dict, MutableMapping, Optional, Sequence, Tuple
+
+import sphinx_icontract._format
+import sphinx_icontract._lines
+import sphinx_icontract._prerender
+import sphinx_icontract._renderings
+
+if typing.TYPE_CHECKING:
+    import concurrent.futures
+
+# We rely on the same private modules as the rendering for Sphinx.
+# pylint: disable=protected-access
+
+
+def _render_members(members: Sequence[Tuple[str, str, Any]]) -> Dict[str, sphinx_icontract._lines.Lines]:
+    """
+    Render the contracts of the members with the lambda functions grouped by their source files.
+
+    Each source file is looked up and parsed once, and all its lambda functions are rendered in one pass before
+    the contracts of the members are formatted.
+
+    :param members: qualified names, what the objects are (as in autodoc) and the objects
+    :return: map qualified name -> contracts as reST, only for the members with contracts
+    """
+    if 'icontract' not in sys.modules:
+        # See sphinx_icontract._format.format_contracts.
+        return collections.OrderedDict()
+
+    lambdas = (pair for _, what, obj in members
+               for pair in sphinx_icontract._prerender.object_lambdas(what=what, obj=obj))
+    keys_by_file = sphinx_icontract._prerender.prerendering_keys(lambdas=lambdas, disk_cache=None)
+
+    renderings = dict()  # type: Dict[Tuple[str, int, str], Any]
+    for filename, keys in keys_by_file.items():
+        for lineno, kind, value in sphinx_icontract._prerender.prerender_file(filename=filename, keys=keys):
+            renderings[(filename, lineno, kind)] = value
+
+    # The renderings are visible only to this call while the members are formatted.
+    previous = getattr(sphinx_icontract._renderings.BATCH, 'renderings', None)
+    sphinx_icontract._renderings.BATCH.renderings = renderings
+    try:
+        result = collections.OrderedDict()  # type: Dict[str, sphinx_icontract._lines.Lines]
+        for qualname, what, obj in members:
+            lines = sphinx_icontract._format.format_contracts(what=what, obj=obj)
+            if len(lines) > 0:
+                result[qualname] = lines
+
+    finally:
+        sphinx_icontract._renderings.BATCH.renderings = previous
+
+    return result
+
+
+def render_module(module: Any) -> Dict[str, sphinx_icontract._lines.Lines]:
+    """
+    Render the contracts of the functions and the classes (including their members) defined in the module.
+
+    Use this function instead of rendering the objects one by one (*e.g.*, when generating a report) since
+    the lambda functions are rendered grouped by their source files.
+
+    :param module: module whose contracts are rendered
+    :return: map qualified name -> contracts as reST lines, only for the objects with contracts
+    """
+    return _render_members(members=list(sphinx_icontract._prerender.module_members(module=module)))
+
+
+def render_class(cls: type) -> Dict[str, sphinx_icontract._lines.Lines]:
+    """
+    Render the invariants of the class and the contracts of its methods and properties.
+
+    Only the members defined in the class itself are rendered, while the inherited contracts are included in
+    the contracts of the overriding methods.
+
+    :param cls: class whose contracts are rendered
+    :return: map qualified name -> contracts as reST lines, only for the objects with contracts
+    """
+    return _render_members(members=list(sphinx_icontract._prerender.class_members(cls=cls)))
+
+
+# Map event loop -> (what, id of the object) -> future of the rendering in flight
+IN_FLIGHT = weakref.WeakKeyDictionary()  # type: MutableMapping[Any, Dict[Tuple[str, int], Any]]
+
+# Lock guarding the creation of the in-flight renderings of an event loop
+_IN_FLIGHT_LOCK = threading.Lock()
+
+
+async def render_async(what: str, obj: Any,
+                       executor: Optional["concurrent.futures.Executor"] = None) -> sphinx_icontract._lines.Lines:
+    """
+    Render the contracts of the object without blocking the event loop.
+
+    The source files are read and parsed in the executor. The concurrent requests for the same object are coalesced
+    so that the object is rendered only once while its rendering is in flight. Cancelling a request does not cancel
+    the rendering awaited by the other requests.
+
+    :param what: what the object is (as in autodoc, *e.g.*, ``'function'``, ``'class'`` or ``'attribute'``)
+    :param obj: object whose contracts are rendered
+    :param executor: executor to render in; if None, the default executor of the event loop is used
+    :return: contracts as reST lines, the same as rendered in the docstring of the object
+    """
+    if 'icontract' not in sys.modules:
+        # See sphinx_icontract._format.format_contracts.
+        return sphinx_icontract._lines.Lines([])
+
+    # We import asyncio only here since it is expensive to import and not needed by Sphinx.
+    import asyncio  # pylint: disable=import-outside-toplevel
+
+    if sys.version_info >= (3, 7):
+        loop = asyncio.get_running_loop()
+    else:
+        # Python 3.6 lacks get_running_loop. Within a coroutine, get_event_loop returns the running loop.
+        loop = asyncio.get_event_loop()
+
+    with _IN_FLIGHT_LOCK:
+        in_flight = IN_FLIGHT.setdefault(loop, dict())
+
+    # The object can not be garbage-collected and its id re-used while its rendering is in flight since
+    # the rendering references it.
+    key = (what, id(obj))
+
+    future = in_flight.get(key, None)
+    if future is None:
+        future = loop.run_in_executor(executor,
+                                      functools.partial(sphinx_icontract._format.format_contracts, what=what, obj=obj))
+        in_flight[key] = future
+
+        def remove(done: asyncio.Future) -> None:
+            """Remove the rendering from the in-flight renderings once it is done."""
+            if in_flight.get(key, None) is done:
+                del in_flight[key]
+
+        future.add_done_callback(remove)
+
+    return await asyncio.shield(future)
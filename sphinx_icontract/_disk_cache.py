@@ -0,0 +1,317 @@
+"""Persist the rendered contracts across the builds."""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple
+
+import sphinx_icontract._locks
+
+
+class _Record:
+    """Represent the cached renderings of a single source file."""
+
+    def __init__(self, path: str, mtime_ns: int, size: int, digest: str, entries: Dict[str, Any]) -> None:
+        """Initialize with the given values."""
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+        self.entries = entries
+
+
+class _Records:
+    """Keep the records of the source files valid in this build, each loaded only once under the lock of its file."""
+
+    def __init__(self) -> None:
+        """Initialize without any record."""
+        # Map path of the source file -> record of the file valid in this build, None if the file is not available
+        self._records = dict()  # type: Dict[str, Optional[_Record]]
+
+        # Locks of the records per source file
+        self.locks = sphinx_icontract._locks.StripedLocks()
+
+    def get(self, path: str, load: Callable[[], Optional[_Record]]) -> Optional[_Record]:
+        """Retrieve the record of the source file, loading it on the first access."""
+        try:
+            return self._records[path]
+        except KeyError:
+            pass
+
+        with self.locks(path):
+            # The record might have been loaded while we were waiting for the lock.
+            if path not in self._records:
+                self._records[path] = load()
+
+            return self._records[path]
+
+    def loaded(self, path: str) -> Optional[_Record]:
+        """Retrieve the record of the source file if it has been loaded."""
+        return self._records.get(path, None)
+
+
+class _Changes:
+    """Track the changes of the records which have not been written or passed on yet."""
+
+    def __init__(self) -> None:
+        """Initialize without any change."""
+        # Lock of the changes and of the counters of the cache. If both are needed, the lock of the record
+        # is acquired first.
+        self.lock = threading.Lock()
+
+        # Paths of the source files whose records need to be written
+        self.dirty = set()  # type: Set[str]
+
+        # Renderings put since the last call to :meth:`DiskCache.take_new_entries` as (path, lineno, kind, value)
+        self.new_entries = []  # type: List[Tuple[str, int, str, Any]]
+
+
+def _digest(path: str) -> str:
+    """Compute the hash of the file content."""
+    hsh = hashlib.sha256()
+    with open(path, 'rb') as fid:
+        hsh.update(fid.read())
+
+    return hsh.hexdigest()
+
+
+class Archive:
+    """
+    Represent the renderings of the source files keyed by the hash of their content.
+
+    The archive is built once (*e.g.*, in the build job of a package) and pre-warms the disk caches of
+    the documentation builds. Since the renderings are keyed by the content and not by the path, the source files
+    can be checked out or installed anywhere.
+    """
+
+    def __init__(self, version: str, files: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Initialize with the given values.
+
+        :param version: version of the renderings (see :class:`DiskCache`)
+        :param files: map content hash of the source file -> entries as stored in the records of the disk cache
+        """
+        self.version = version
+        self.files = files
+
+
+def write_archive(archive: Archive, path: str) -> None:
+    """Write the archive to the given path."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Write to a temporary file first so that the archive is never left half-written.
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(tmp_path, 'wt', encoding='utf-8') as fid:
+        json.dump({'version': archive.version, 'files': archive.files}, fid)
+
+    os.replace(tmp_path, path)
+
+
+def read_archive(path: str) -> Archive:
+    """
+    Read the archive from the given path.
+
+    :param path: path to the archive
+    :return: archive
+    :raise OSError: if the archive could not be read
+    :raise ValueError: if the archive is corrupt
+    """
+    with open(path, 'rt', encoding='utf-8') as fid:
+        jsonable = json.load(fid)
+
+    if not isinstance(jsonable, dict) or not isinstance(jsonable.get('version', None), str) or \
+            not isinstance(jsonable.get('files', None), dict):
+        raise ValueError("Expected an object with the version and the files in the archive: {}".format(path))
+
+    return Archive(version=jsonable['version'], files=jsonable['files'])
+
+
+class DiskCache:
+    """
+    Cache the rendered contracts on disk keyed by the source file and the line of the rendered lambda.
+
+    A record is kept per source file. The record is valid as long as the file is unchanged; we check first the
+    modification time and the size of the file, and compare the content hash only if they differ (*e.g.*,
+    after a fresh checkout in a continuous integration).
+
+    All the records are invalidated if the ``version`` changes.
+
+    The cache can be shared among the threads. The records are loaded and modified under the lock of their source
+    file so that the different files are handled concurrently.
+    """
+
+    def __init__(self, directory: str, version: str, prewarmed: Optional[Mapping[str, Dict[str, Any]]] = None) -> None:
+        """
+        Initialize the cache.
+
+        :param directory: where the records are stored
+        :param version:
+            version of the renderings (*e.g.*, including the version of sphinx-icontract and icontract)
+        :param prewarmed:
+            map content hash of the source file -> entries (see :class:`Archive`) used for the source files which
+            have no valid record yet
+        """
+        self.directory = directory
+        self.version = version
+        self.prewarmed = prewarmed
+        self.hits = 0
+        self.misses = 0
+
+        self._records = _Records()
+        self._changes = _Changes()
+
+    def _record_path(self, path: str) -> str:
+        """Determine where the record of the source file is stored."""
+        return os.path.join(self.directory, hashlib.sha1(path.encode('utf-8')).hexdigest() + '.json')
+
+    def _load(self, path: str) -> Optional[_Record]:
+        """Load the record of the source file and discard it if the file changed in the meanwhile."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # The file is not available (*e.g.*, the module has been loaded from a zip archive).
+            return None
+
+        record = None  # type: Optional[_Record]
+        try:
+            with open(self._record_path(path=path), 'rt', encoding='utf-8') as fid:
+                jsonable = json.load(fid)
+
+            if jsonable['version'] == self.version and jsonable['path'] == path:
+                record = _Record(
+                    path=path,
+                    mtime_ns=jsonable['mtime_ns'],
+                    size=jsonable['size'],
+                    digest=jsonable['digest'],
+                    entries=jsonable['entries'])
+        except (OSError, ValueError, KeyError, TypeError):
+            # The record is missing or corrupt.
+            record = None
+
+        if record is not None and record.mtime_ns == stat.st_mtime_ns and record.size == stat.st_size:
+            return record
+
+        digest = _digest(path=path)
+        if record is not None and record.digest == digest:
+            record.mtime_ns = stat.st_mtime_ns
+            record.size = stat.st_size
+        else:
+            entries = dict()  # type: Dict[str, Any]
+            if self.prewarmed is not None:
+                entries.update(self.prewarmed.get(digest, dict()))
+
+            record = _Record(path=path, mtime_ns=stat.st_mtime_ns, size=stat.st_size, digest=digest, entries=entries)
+
+        with self._changes.lock:
+            self._changes.dirty.add(path)
+
+        return record
+
+    def _record(self, path: str) -> Optional[_Record]:
+        """Retrieve the record of the source file, loading it on the first access."""
+        return self._records.get(path=path, load=lambda: self._load(path=path))
+
+    def get(self, path: str, lineno: int, kind: str) -> Optional[Any]:
+        """
+        Retrieve the cached rendering.
+
+        :param path: path to the source file
+        :param lineno: line number of the rendered lambda
+        :param kind: kind of the rendering (*e.g.*, ``condition`` or ``error``)
+        :return: JSON-able rendering, or None if not cached
+        """
+        record = self._record(path=path)
+        value = None if record is None else record.entries.get('{}:{}'.format(lineno, kind), None)
+
+        with self._changes.lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return value
+
+    def contains(self, path: str, lineno: int, kind: str) -> bool:
+        """Check whether the rendering is cached without counting it as a hit or a miss."""
+        record = self._record(path=path)
+        return record is not None and '{}:{}'.format(lineno, kind) in record.entries
+
+    def put(self, path: str, lineno: int, kind: str, value: Any) -> None:
+        """
+        Cache the rendering.
+
+        :param path: path to the source file
+        :param lineno: line number of the rendered lambda
+        :param kind: kind of the rendering (*e.g.*, ``condition`` or ``error``)
+        :param value: JSON-able rendering
+        """
+        record = self._record(path=path)
+        if record is None:
+            return
+
+        with self._records.locks(path):
+            record.entries['{}:{}'.format(lineno, kind)] = value
+
+            with self._changes.lock:
+                self._changes.dirty.add(path)
+                self._changes.new_entries.append((path, lineno, kind, value))
+
+    def take_new_entries(self) -> List[Tuple[str, int, str, Any]]:
+        """
+        Remove and return the renderings put since the last call.
+
+        The renderings put in the processes of a parallel build need to be passed on to the main process
+        which writes the records.
+        """
+        with self._changes.lock:
+            new_entries = self._changes.new_entries
+            self._changes.new_entries = []
+
+        return new_entries
+
+    def flush(self) -> None:
+        """Write the changed records to the disk."""
+        with self._changes.lock:
+            dirty = sorted(self._changes.dirty)
+            self._changes.dirty.clear()
+
+        if not dirty:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        try:
+            for path in dirty:
+                self._write(path=path)
+        except BaseException:
+            # Keep the records marked so that they are written on the next flush.
+            with self._changes.lock:
+                self._changes.dirty.update(dirty)
+
+            raise
+
+    def _write(self, path: str) -> None:
+        """Write the record of the source file to the disk."""
+        record = self._records.loaded(path=path)
+        if record is None:
+            return
+
+        with self._records.locks(path):
+            jsonable = {
+                'version': self.version,
+                'path': record.path,
+                'mtime_ns': record.mtime_ns,
+                'size': record.size,
+                'digest': record.digest,
+                'entries': dict(record.entries)
+            }
+
+        # Write to a temporary file first so that the record is never left half-written.
+        record_path = self._record_path(path=path)
+        tmp_path = '{}.{}.{}.tmp'.format(record_path, os.getpid(), threading.get_ident())
+        with open(tmp_path, 'wt', encoding='utf-8') as fid:
+            json.dump(jsonable, fid)
+
+        os.replace(tmp_path, record_path)
@@ -0,0 +1,141 @@
+"""Keep the contract data of the documents in the build environment of Sphinx."""
+import collections
+import importlib
+import typing
+from typing import Any, Dict, List, Optional, Tuple
+
+import sphinx_icontract._prerender
+import sphinx_icontract._profiling
+import sphinx_icontract._renderings
+import sphinx_icontract._statistics
+
+# The handlers coordinate the private modules of sphinx-icontract.
+# pylint: disable=protected-access
+
+
+class DocumentData:
+    """
+    Represent the contract data of a single document stored in the build environment.
+
+    The build environment is pickled in the parallel reads and merged into the environment of the main process
+    (see :func:`merge_info`) so that nothing is lost even though the documents are read in other processes.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with empty data."""
+        # Map name of the documented object -> rendered contracts
+        self.blocks = dict()  # type: Dict[str, List[str]]
+
+        # Map what has been documented (*e.g.*, ``function``) -> number of the documented objects with contracts
+        self.counts = collections.Counter()  # type: typing.Counter[str]
+
+        # Renderings which need to be persisted in the disk cache as (path, lineno, kind, value).
+        # Cleared once the environment is updated.
+        self.renderings = []  # type: List[Tuple[str, int, str, Any]]
+
+        # Measurements of the docstring events if the profiling is enabled. Cleared once the environment is updated.
+        self.profile = None  # type: Optional[sphinx_icontract._profiling.DocumentProfile]
+
+        # Number of the docstring events short-circuited since the objects come from the modules without contracts.
+        # Reset once the environment is updated.
+        self.short_circuited = 0
+
+        # Map name of the documented object -> counts of its contracts, if the statistics are collected
+        self.statistics = dict()  # type: Dict[str, sphinx_icontract._statistics.ObjectStatistics]
+
+
+def env_documents(env: Any) -> Dict[str, DocumentData]:
+    """Retrieve the contract data of the documents from the build environment."""
+    documents = getattr(env, 'icontract_documents', None)  # type: Optional[Dict[str, DocumentData]]
+    if documents is None:
+        documents = dict()
+        env.icontract_documents = documents
+
+    return documents
+
+
+def document_data(app: Any) -> Optional[DocumentData]:
+    """Retrieve the contract data of the document being read, or None if no document is being read."""
+    env = getattr(app, 'env', None)
+    if env is None:
+        return None
+
+    docname = env.temp_data.get('docname', None)
+    if docname is None:
+        return None
+
+    documents = env_documents(env=env)
+    data = documents.get(docname, None)
+    if data is None:
+        data = DocumentData()
+        documents[docname] = data
+
+    return data
+
+
+# Number of the docstring events short-circuited in the current build, including the parallel reads
+SHORT_CIRCUITED = 0
+
+
+def before_read_docs(app, env, docnames):
+    """Pre-render the contracts of the configured modules if there are any documents to be read."""
+    # pylint: disable=unused-argument
+    if not docnames or not app.config.icontract_prerender_modules:
+        return
+
+    modules = [importlib.import_module(module_name) for module_name in app.config.icontract_prerender_modules]
+
+    sphinx_icontract._prerender.prerender(modules=modules, workers=app.config.icontract_prerender_workers)
+
+    disk_cache = sphinx_icontract._renderings.DISK_CACHE
+    if disk_cache is not None:
+        # The pre-renderings are already in the disk cache of the main process and need not be passed on.
+        disk_cache.take_new_entries()
+
+
+def purge_doc(app, env, docname):
+    """Remove the contract data of the document which is going to be re-read or has been removed."""
+    # pylint: disable=unused-argument
+    env_documents(env=env).pop(docname, None)
+
+
+def merge_info(app, env, docnames, other):
+    """Merge the contract data of the documents read in a parallel process into the main environment."""
+    # pylint: disable=unused-argument
+    documents = env_documents(env=env)
+    other_documents = env_documents(env=other)
+    profiler = sphinx_icontract._profiling.PROFILER
+
+    for docname in docnames:
+        data = other_documents.get(docname, None)
+        if data is None:
+            continue
+
+        documents[docname] = data
+
+        disk_cache = sphinx_icontract._renderings.get_disk_cache() if data.renderings else None
+        if disk_cache is not None:
+            for path, lineno, kind, value in data.renderings:
+                disk_cache.put(path=path, lineno=lineno, kind=kind, value=value)
+
+        if profiler is not None and data.profile is not None:
+            profiler.merge(document_profile=data.profile)
+
+    disk_cache = sphinx_icontract._renderings.DISK_CACHE
+    if disk_cache is not None:
+        # The merged renderings are already in the disk cache of the main process.
+        disk_cache.take_new_entries()
+
+
+def updated(app, env):
+    """Drop the contract data which has been merged and need not be pickled with the environment."""
+    # pylint: disable=unused-argument
+    # pylint: disable=global-statement
+    global SHORT_CIRCUITED
+
+    for data in env_documents(env=env).values():
+        data.renderings = []
+        data.profile = None
+
+        SHORT_CIRCUITED += data.short_circuited
+        data.short_circuited = 0
@@ -0,0 +1,166 @@
+"""Export the contracts of the packages as JSON Lines without running Sphinx."""
+import importlib
+import json
+import pkgutil
+import typing
+from typing import Any, Callable, Iterable, Iterator, Mapping, MutableMapping, Optional, TextIO, Tuple
+
+import sphinx_icontract._format
+import sphinx_icontract._index
+import sphinx_icontract._prerender
+import sphinx_icontract._render
+
+if typing.TYPE_CHECKING:
+    import icontract
+
+# We rely on the same protected functions as the rendering for Sphinx.
+# pylint: disable=protected-access
+
+
+def iterate_modules(names: Iterable[str]) -> Iterator[Any]:
+    """
+    Import the modules and, if a module is a package, all its submodules.
+
+    :param names: fully qualified names of the modules or packages
+    :return: imported modules, one at a time
+    """
+    for name in names:
+        module = importlib.import_module(name)
+        yield module
+
+        if hasattr(module, '__path__'):
+            for module_info in pkgutil.walk_packages(path=module.__path__, prefix=name + '.'):
+                yield importlib.import_module(module_info.name)
+
+
+def _location(func: Callable[..., Any]) -> Tuple[Optional[str], Optional[int]]:
+    """Get the source file and the first line of the function, if available."""
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return None, None
+
+    return code.co_filename, code.co_firstlineno
+
+
+def _member(name: str, what: str, accessor: Optional[str]) -> Mapping[str, Any]:
+    """Represent the documented member common to all the records of its contracts."""
+    return {'name': name, 'what': what, 'accessor': accessor}
+
+
+def _contract_record(*, member: Mapping[str, Any], kind: str, contract: "icontract._Contract",
+                     group: Optional[int]) -> MutableMapping[str, Any]:
+    """
+    Represent a precondition, a postcondition or an invariant as a JSON-able record.
+
+    :param member: documented member (see :func:`_member`)
+    :param kind: ``precondition``, ``postcondition`` or ``invariant``
+    :param contract: contract to be represented
+    :param group: index of the precondition group, None for the other kinds
+    :return: JSON-able record
+    """
+    path, lineno = _location(func=contract.condition)
+
+    ir = sphinx_icontract._render.extract_contract(contract=contract, kind=kind)
+    condition = ir.condition
+
+    return {
+        'name': member['name'],
+        'what': member['what'],
+        'kind': kind,
+        'accessor': member['accessor'],
+        'group': group,
+        'condition': condition.function if condition.function is not None else '\n'.join(condition.lines or []),
+        'rest': list(sphinx_icontract._render.write_condition(condition=condition)),
+        'implication': None if condition.implication is None else {
+            'antecedent': condition.implication[0],
+            'consequent': condition.implication[1]
+        },
+        'error_type': ir.error_type,
+        'error_message': ir.error_message,
+        'description': ir.description,
+        'path': path,
+        'lineno': lineno
+    }
+
+
+def _snapshot_record(*, member: Mapping[str, Any], snapshot: "icontract._Snapshot") -> MutableMapping[str, Any]:
+    """Represent a snapshot as a JSON-able record."""
+    path, lineno = _location(func=snapshot.capture)
+
+    ir = sphinx_icontract._render.extract_snapshot(snapshot=snapshot)
+
+    return {
+        'name': member['name'],
+        'what': member['what'],
+        'kind': 'snapshot',
+        'accessor': member['accessor'],
+        'snapshot_name': ir.name,
+        'capture': '\n'.join(ir.capture),
+        'path': path,
+        'lineno': lineno
+    }
+
+
+def _function_records(name: str, what: str, func: Optional[Callable[..., Any]],
+                      accessor: Optional[str] = None) -> Iterator[MutableMapping[str, Any]]:
+    """Yield the records of the preconditions, the snapshots and the postconditions of the function."""
+    if func is None:
+        return
+
+    pps = sphinx_icontract._format.function_contracts(func=func)
+    member = _member(name=name, what=what, accessor=accessor)
+
+    for group, preconditions in enumerate(pps.preconditions):
+        for precondition in preconditions:
+            yield _contract_record(member=member, kind='precondition', contract=precondition, group=group)
+
+    for snapshot in pps.snapshots:
+        yield _snapshot_record(member=member, snapshot=snapshot)
+
+    for postcondition in pps.postconditions:
+        yield _contract_record(member=member, kind='postcondition', contract=postcondition, group=None)
+
+
+def contract_records(module: Any) -> Iterator[MutableMapping[str, Any]]:
+    """
+    Yield a record for each contract of the functions and the classes (including their members) of the module.
+
+    :param module: module whose contracts are exported
+    :return: JSON-able records, one at a time
+    """
+    for name, what, obj in sphinx_icontract._prerender.module_members(module=module):
+        if what == 'class':
+            member = _member(name=name, what=what, accessor=None)
+            for invariant in getattr(obj, "__invariants__", []):
+                yield _contract_record(member=member, kind='invariant', contract=invariant, group=None)
+
+        elif what == 'attribute':
+            for func, accessor in zip([obj.fget, obj.fset, obj.fdel], ['get', 'set', 'del']):
+                yield from _function_records(name=name, what=what, func=func, accessor=accessor)
+
+        else:
+            yield from _function_records(name=name, what=what, func=obj)
+
+
+def export(names: Iterable[str], stream: TextIO) -> int:
+    """
+    Write the contracts of the modules as JSON Lines.
+
+    The records are streamed as they are rendered. The parsed source files are released after each module
+    so that the memory does not grow with the size of the code base.
+
+    :param names: fully qualified names of the modules or packages
+    :param stream: where to write the records
+    :return: number of the written records
+    """
+    count = 0
+    for module in iterate_modules(names=names):
+        try:
+            for record in contract_records(module=module):
+                stream.write(json.dumps(record, ensure_ascii=False))
+                stream.write('\n')
+                count += 1
+        finally:
+            sphinx_icontract._index.SOURCE_INDEXES.clear()
+
+    return count
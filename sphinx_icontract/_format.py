@@ -0,0 +1,383 @@
+"""Format the contracts of the functions, the properties and the classes as reST."""
+import inspect
+import sys
+import typing
+from typing import Any, Callable, List, Optional, Set
+
+import sphinx_icontract._lines
+import sphinx_icontract._render
+import sphinx_icontract._render_cache
+import sphinx_icontract._slow
+
+if typing.TYPE_CHECKING:
+    import icontract
+
+# Use protected methods from icontract and tightly couple with it (see the note in :mod:`sphinx_icontract`).
+# pylint: disable=protected-access
+
+
+@sphinx_icontract._slow.require(lambda prefix: prefix is None or prefix == prefix.strip())
+@sphinx_icontract._slow.ensure(lambda preconditions, result: not preconditions or len(result) > 0)
+def format_preconditions(preconditions: List[List["icontract._Contract"]],
+                         prefix: Optional[str] = None,
+                         weakening: bool = False) -> sphinx_icontract._lines.Lines:
+    """
+    Format preconditions as reST.
+
+    :param preconditions: preconditions of a function
+    :param prefix: prefix of the ``:requires:`` and ``:requires else:`` directive
+    :param weakening:
+        if set, the preconditions weaken the inherited preconditions which are not given so that
+        the first group is also rendered as ``:requires else:``
+    :return: list of lines
+    """
+    if not preconditions:
+        return sphinx_icontract._lines.Lines([])
+
+    parts = []  # type: List[sphinx_icontract._lines.Lines]
+    for i, group in enumerate(preconditions):
+        if i == 0 and not weakening:
+            if prefix is not None:
+                parts.append(sphinx_icontract._lines.Lines([":{} requires:".format(prefix)]))
+            else:
+                parts.append(sphinx_icontract._lines.Lines([":requires:"]))
+        else:
+            if prefix is not None:
+                parts.append(sphinx_icontract._lines.Lines([":{} requires else:".format(prefix)]))
+            else:
+                parts.append(sphinx_icontract._lines.Lines([":requires else:"]))
+
+        for precondition in group:
+            parts.append(
+                sphinx_icontract._lines.make_bullet(
+                    sphinx_icontract._render.format_contract(contract=precondition, kind='precondition')))
+
+    return sphinx_icontract._lines.Lines.concatenate(parts)
+
+
+@sphinx_icontract._slow.require(lambda prefix: prefix is None or prefix == prefix.strip())
+@sphinx_icontract._slow.ensure(lambda snapshots, result: not snapshots or len(result) > 0)
+def _format_snapshots(snapshots: List["icontract._Snapshot"],
+                      prefix: Optional[str] = None) -> sphinx_icontract._lines.Lines:
+    """
+    Format snapshots as reST.
+
+    :param snapshots: snapshots defined to capture the argument values of a function before the invocation
+    :param prefix: prefix to be prepended to ``:OLD:`` directive
+    :return: list of lines describing the snapshots
+    """
+    if not snapshots:
+        return sphinx_icontract._lines.Lines([])
+
+    parts = []  # type: List[sphinx_icontract._lines.Lines]
+
+    if prefix is not None:
+        parts.append(sphinx_icontract._lines.Lines([":{} OLD:".format(prefix)]))
+    else:
+        parts.append(sphinx_icontract._lines.Lines([":OLD:"]))
+
+    for snapshot in snapshots:
+        parts.append(
+            sphinx_icontract._render.write_snapshot(
+                snapshot=sphinx_icontract._render.extract_snapshot(snapshot=snapshot)))
+
+    return sphinx_icontract._lines.Lines.concatenate(parts)
+
+
+@sphinx_icontract._slow.require(lambda prefix: prefix is None or prefix == prefix.strip())
+@sphinx_icontract._slow.ensure(lambda postconditions, result: not postconditions or len(result) > 0)
+def _format_postconditions(postconditions: List["icontract._Contract"],
+                           prefix: Optional[str] = None) -> sphinx_icontract._lines.Lines:
+    """
+    Format postconditions as reST.
+
+    :param postconditions: postconditions of a function
+    :param prefix: prefix to be prepended to ``:ensures:`` directive
+    :return: list of lines describing the postconditions
+    """
+    if not postconditions:
+        return sphinx_icontract._lines.Lines([])
+
+    parts = []  # type: List[sphinx_icontract._lines.Lines]
+
+    if prefix is not None:
+        parts.append(sphinx_icontract._lines.Lines([":{} ensures:".format(prefix)]))
+    else:
+        parts.append(sphinx_icontract._lines.Lines([":ensures:"]))
+
+    for postcondition in postconditions:
+        parts.append(
+            sphinx_icontract._lines.make_bullet(
+                sphinx_icontract._render.format_contract(contract=postcondition, kind='postcondition')))
+
+    return sphinx_icontract._lines.Lines.concatenate(parts)
+
+
+@sphinx_icontract._slow.ensure(lambda invariants, result: not invariants or len(result) > 0)
+def _format_invariants(invariants: List["icontract._Contract"]) -> sphinx_icontract._lines.Lines:
+    """Format invariants as reST."""
+    if not invariants:
+        return sphinx_icontract._lines.Lines([])
+
+    parts = [sphinx_icontract._lines.Lines([":establishes:"])]  # type: List[sphinx_icontract._lines.Lines]
+    for invariant in invariants:
+        parts.append(
+            sphinx_icontract._lines.make_bullet(
+                sphinx_icontract._render.format_contract(contract=invariant, kind='invariant')))
+
+    return sphinx_icontract._lines.Lines.concatenate(parts)
+
+
+class PrePostSnaps:
+    """Represent preconditions, snapshots and postconditions associated with a contract checker."""
+
+    def __init__(self, preconditions: List[List["icontract._Contract"]], snapshots: List["icontract._Snapshot"],
+                 postconditions: List["icontract._Contract"]) -> None:
+        """Initialize with the given values."""
+        self.preconditions = preconditions
+        self.snapshots = snapshots
+        self.postconditions = postconditions
+
+
+def preconditions_snapshots_postconditions(checker: Callable) -> PrePostSnaps:
+    """Collect the preconditions, snapshots and postconditions from a contract checker of a function."""
+    import icontract  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    preconditions = getattr(checker, "__preconditions__", [])  # type: List[List[icontract._Contract]]
+
+    assert all(isinstance(precondition_group, list) for precondition_group in preconditions)
+    assert (all(
+        isinstance(precondition, icontract._Contract) for precondition_group in preconditions
+        for precondition in precondition_group))
+
+    # Filter empty precondition groups ("require else" blocks)
+    preconditions = [group for group in preconditions if len(group) > 0]
+
+    snapshots = getattr(checker, "__postcondition_snapshots__", [])  # type: List[icontract._Snapshot]
+    assert all(isinstance(snap, icontract._Snapshot) for snap in snapshots)
+
+    postconditions = getattr(checker, "__postconditions__", [])  # type: List[icontract._Contract]
+
+    assert all(isinstance(postcondition, icontract._Contract) for postcondition in postconditions)
+
+    return PrePostSnaps(preconditions=preconditions, snapshots=snapshots, postconditions=postconditions)
+
+
+# Contracts of the functions without a checker
+NO_CONTRACTS = PrePostSnaps(preconditions=[], snapshots=[], postconditions=[])
+
+# Contracts collected from the checkers of the functions, including the functions without contracts (as
+# :py:data:`NO_CONTRACTS`), so that the checker is looked up only once per function
+CHECKER_CACHE = sphinx_icontract._render_cache.RenderCache(
+    maxsize=sphinx_icontract._render_cache.CACHE_MAXSIZE
+)  # type: sphinx_icontract._render_cache.RenderCache[PrePostSnaps]
+
+
+def function_contracts(func: Callable[..., Any]) -> PrePostSnaps:
+    """
+    Collect the contracts of the function, looking up its checker only on the first access.
+
+    :param func: function whose contracts we are collecting
+    :return: preconditions, snapshots and postconditions, or :py:data:`NO_CONTRACTS` if the function has no checker
+    """
+    # The bound methods are created anew on each access, so we cache by the underlying function.
+    key = getattr(func, '__func__', func)
+
+    pps = CHECKER_CACHE.get(key)
+    if pps is None:
+        import icontract._checkers  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        checker = icontract._checkers.find_checker(func=func)
+        pps = NO_CONTRACTS if checker is None else preconditions_snapshots_postconditions(checker=checker)
+
+        CHECKER_CACHE.put(key, pps)
+
+    return pps
+
+
+def format_function_contracts(func: Callable, prefix: Optional[str] = None) -> sphinx_icontract._lines.Lines:
+    """
+    Format the preconditions and postconditions of a function given its checker decorator.
+
+    :param func: function whose contracts we are describing
+    :param prefix: prefix to be prepended to the contract directives such as ``get`` or ``set``
+    :return: list of lines
+    """
+    pps = function_contracts(func=func)
+    if pps is NO_CONTRACTS:
+        return sphinx_icontract._lines.Lines([])
+
+    if INHERITED_AS_REFERENCE:
+        base_funcs = _base_functions(func=func, prefix=prefix)
+        if base_funcs:
+            return _format_function_contracts_with_reference(pps=pps, base_funcs=base_funcs, prefix=prefix)
+
+    pre_block = format_preconditions(preconditions=pps.preconditions, prefix=prefix)
+    old_block = _format_snapshots(snapshots=pps.snapshots, prefix=prefix)
+    post_block = _format_postconditions(postconditions=pps.postconditions, prefix=prefix)
+
+    return pre_block + old_block + post_block
+
+
+# If set, the contracts inherited from the base classes are rendered as a reference to the base instead of
+# repeating them. Set when the builder is initialized.
+INHERITED_AS_REFERENCE = False
+
+
+def _defining_class(obj: Any) -> Optional[type]:
+    """Resolve the class in which the function has been defined by its qualified name, if possible."""
+    qualname = getattr(obj, '__qualname__', None)
+    module = sys.modules.get(getattr(obj, '__module__', None) or '', None)
+    if not isinstance(qualname, str) or '<locals>' in qualname or module is None:
+        return None
+
+    parts = qualname.split('.')[:-1]
+    if not parts:
+        return None
+
+    cls = module  # type: Any
+    for part in parts:
+        cls = getattr(cls, part, None)
+        if cls is None:
+            return None
+
+    return cls if inspect.isclass(cls) else None
+
+
+# Map prefix of the contract directives -> attribute of the property with the corresponding function
+_PROPERTY_FUNCTIONS = {'get': 'fget', 'set': 'fset', 'del': 'fdel'}
+
+
+def _base_functions(func: Callable[..., Any], prefix: Optional[str] = None) -> List[Callable[..., Any]]:
+    """
+    Find the functions of the direct bases from which the method inherits the contracts.
+
+    The contracts are inherited in the same way as in :py:class:`icontract.DBCMeta`.
+
+    :param func: method (or a function of a property) whose contracts we are describing
+    :param prefix: ``get``, ``set`` or ``del`` if the function belongs to a property
+    :return: functions of the bases with contracts
+    """
+    cls = _defining_class(obj=func)
+    if cls is None:
+        return []
+
+    name = func.__name__
+    if prefix is None and name in ['__init__', '__new__']:
+        # The contracts of the constructors are not inherited.
+        return []
+
+    result = []  # type: List[Callable[..., Any]]
+    for base in cls.__bases__:
+        base_func = getattr(base, name, None)
+        if prefix is not None:
+            if isinstance(base_func, property):
+                base_func = getattr(base_func, _PROPERTY_FUNCTIONS[prefix])
+            else:
+                base_func = None
+
+        if base_func is not None and function_contracts(func=base_func) is not NO_CONTRACTS:
+            result.append(base_func)
+
+    return result
+
+
+def _format_function_contracts_with_reference(pps: PrePostSnaps, base_funcs: List[Callable[..., Any]],
+                                              prefix: Optional[str]) -> sphinx_icontract._lines.Lines:
+    """
+    Format the contracts of the function with the inherited contracts given as a reference to the bases.
+
+    The inherited contracts are identified by their identity, while the groups of the preconditions are
+    inherited as a whole.
+
+    :param pps: contracts of the function including the inherited ones
+    :param base_funcs: functions of the bases from which the contracts are inherited
+    :param prefix: prefix to be prepended to the contract directives such as ``get`` or ``set``
+    :return: list of lines
+    """
+    inherited = set()  # type: Set[int]
+    for base_func in base_funcs:
+        base_pps = function_contracts(func=base_func)
+        inherited.update(id(group) for group in base_pps.preconditions)
+        inherited.update(id(snapshot) for snapshot in base_pps.snapshots)
+        inherited.update(id(postcondition) for postcondition in base_pps.postconditions)
+
+    role = 'py:meth' if prefix is None else 'py:attr'
+    references = ', '.join(
+        ':{}:`{}.{}`'.format(role, base_func.__module__, base_func.__qualname__) for base_func in base_funcs)
+
+    if prefix is not None:
+        reference_block = sphinx_icontract._lines.Lines([":{} inherits contracts from: {}".format(prefix, references)])
+    else:
+        reference_block = sphinx_icontract._lines.Lines([":inherits contracts from: {}".format(references)])
+
+    preconditions = [group for group in pps.preconditions if id(group) not in inherited]
+
+    pre_block = format_preconditions(
+        preconditions=preconditions, prefix=prefix, weakening=len(preconditions) < len(pps.preconditions))
+    old_block = _format_snapshots(
+        snapshots=[snapshot for snapshot in pps.snapshots if id(snapshot) not in inherited], prefix=prefix)
+    post_block = _format_postconditions(
+        postconditions=[postcondition for postcondition in pps.postconditions if id(postcondition) not in inherited],
+        prefix=prefix)
+
+    return reference_block + pre_block + old_block + post_block
+
+
+def _format_class_invariants(cls: type) -> sphinx_icontract._lines.Lines:
+    """Format the invariants of the class, giving the inherited invariants as a reference if configured so."""
+    import icontract  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    invariants = getattr(cls, "__invariants__", [])  # type: List[icontract._Contract]
+    assert isinstance(invariants, list)
+    assert all(isinstance(inv, icontract._Contract) for inv in invariants)
+
+    if not INHERITED_AS_REFERENCE:
+        return _format_invariants(invariants=invariants)
+
+    bases = [base for base in cls.__bases__ if getattr(base, "__invariants__", None)]
+    if not bases:
+        return _format_invariants(invariants=invariants)
+
+    inherited = set(id(invariant) for base in bases for invariant in getattr(base, "__invariants__"))
+
+    references = ', '.join(':py:class:`{}.{}`'.format(base.__module__, base.__qualname__) for base in bases)
+
+    return sphinx_icontract._lines.Lines([
+        ":inherits invariants from: {}".format(references)
+    ]) + _format_invariants(invariants=[invariant for invariant in invariants if id(invariant) not in inherited])
+
+
+def _format_property_contracts(prop: property) -> sphinx_icontract._lines.Lines:
+    parts = []  # type: List[sphinx_icontract._lines.Lines]
+    for func, prefix in zip([prop.fget, prop.fset, prop.fdel], ['get', 'set', 'del']):
+        if func is not None:
+            parts.append(format_function_contracts(func=func, prefix=prefix))
+
+    return sphinx_icontract._lines.Lines.concatenate(parts)
+
+
+def format_contracts(what: str, obj: Any) -> sphinx_icontract._lines.Lines:
+    """Format the contracts as reST."""
+    if 'icontract' not in sys.modules:
+        # No object can have contracts if icontract has not been imported. We do not import icontract ourselves
+        # since many documented modules do not use contracts at all.
+        return sphinx_icontract._lines.Lines([])
+
+    if what in ['function', 'method', 'attribute']:
+        if what == 'attribute':
+            if not isinstance(obj, property):
+                return sphinx_icontract._lines.Lines([])
+
+            return _format_property_contracts(prop=obj)
+
+        if what in ['function', 'method']:
+            return format_function_contracts(func=obj)
+
+        raise NotImplementedError("Unhandled what: {}".format(what))
+
+    elif what == 'class':
+        return _format_class_invariants(cls=obj)
+
+    # Only properties, functions and classes have contracts.
+    return sphinx_icontract._lines.Lines([])
@@ -0,0 +1,432 @@
+"""Index the decorators of the source files so that each source file is parsed only once."""
+import ast
+import collections
+import inspect
+import threading
+import typing
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import sphinx_icontract._lines
+import sphinx_icontract._locks
+import sphinx_icontract._profiling
+import sphinx_icontract._source
+
+if typing.TYPE_CHECKING:
+    import asttokens
+    import icontract._represent
+
+# Use protected methods from icontract and tightly couple with it (see the note in :mod:`sphinx_icontract`).
+# pylint: disable=protected-access
+
+# Estimated memory of the parse state (tokens and AST nodes) per character of a source file, as measured on
+# the synthetic modules of the benchmarks
+PARSE_STATE_PER_CHARACTER = 256
+
+
+class SourceIndex:
+    """
+    Index the decorator calls of a source file by their lines.
+
+    The whole source file is tokenized only once and the individual decorators are looked up afterwards instead
+    of re-tokenizing the decorator text for each contract.
+    """
+
+    def __init__(self, text: Optional[str], filename: str,
+                 source: Optional[sphinx_icontract._source.SourceFile] = None) -> None:
+        """
+        Parse and index the source file.
+
+        :param text:
+            source code; if None, the source file is not parsed as a whole and the decorators are inspected
+            one by one in the ``source`` (see :func:`inspect_decorator`)
+        :param filename: name of the source file
+        :param source: memory-mapped source file, if available, to slice the lines of the decorators not indexed
+        """
+        self.filename = filename
+        self.source = source
+        self.atok = None  # type: Optional[asttokens.ASTTokens]
+
+        # Estimated memory of the index in bytes
+        self.size = 0 if source is None else source.memory()
+
+        # Map line index (starting with 0) -> decorator call node spanning the line
+        self._decorators = dict()  # type: Dict[int, ast.Call]
+
+        # Map line index (starting with 0) -> lambda nodes starting on the line
+        self._lambdas = dict()  # type: Dict[int, List[ast.Lambda]]
+
+        if text is None:
+            return
+
+        import asttokens  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        try:
+            atok = asttokens.ASTTokens(text, parse=True)
+        except (SyntaxError, ValueError):
+            # The source file can not be parsed (*e.g.*, it changed after the module has been imported).
+            # We fall back to the inspection of the individual decorators.
+            return
+
+        self.atok = atok
+        self.size += len(text) * PARSE_STATE_PER_CHARACTER
+
+        # The tokens hold the text, so the memory map is released and its file descriptor closed. The lines of
+        # the decorators not indexed are sliced from the file mapped anew.
+        if source is not None:
+            source.close()
+        assert atok.tree is not None, "Expected the source to be parsed"
+
+        for node in ast.walk(atok.tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                for decorator in node.decorator_list:
+                    if isinstance(decorator, ast.Call):
+                        # asttokens marks the nodes with the first and the last token.
+                        first_lineno = decorator.first_token.start[0]  # type: ignore
+                        last_lineno = decorator.last_token.end[0]  # type: ignore
+
+                        for i in range(first_lineno - 1, last_lineno):
+                            self._decorators[i] = decorator
+
+            elif isinstance(node, ast.Lambda):
+                self._lambdas.setdefault(node.lineno - 1, []).append(node)
+
+    def decorator(self, lineno: int) -> Optional[ast.Call]:
+        """
+        Look up the decorator call node spanning the given line.
+
+        :param lineno: line index (starting with 0) of one of the lines in the decorator call
+        :return: decorator call node, or None if no decorator call spans the line
+        """
+        return self._decorators.get(lineno, None)
+
+    def lambdas(self, lineno: int) -> List[ast.Lambda]:
+        """
+        Look up the lambda functions starting on the given line.
+
+        :param lineno: line index (starting with 0)
+        :return: lambda nodes
+        """
+        return self._lambdas.get(lineno, [])
+
+    def inspect_decorator(self, lineno: int) -> Optional["icontract._represent.DecoratorInspection"]:
+        """
+        Look up the decorator call spanning the given line.
+
+        :param lineno: line index (starting with 0) of one of the lines in the decorator call
+        :return: inspected decorator call, or None if no decorator call spans the line
+        """
+        node = self._decorators.get(lineno, None)
+        if node is None:
+            return None
+
+        assert self.atok is not None, "Expected the source file to be parsed if there are decorators indexed"
+
+        import icontract._represent  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        return icontract._represent.DecoratorInspection(atok=self.atok, node=node)
+
+    def close(self) -> None:
+        """Release the memory map of the source file, if any."""
+        if self.source is not None:
+            self.source.close()
+
+
+class SourceIndexes:
+    """
+    Keep the indexes of the source files within the memory budget.
+
+    The memory of an index is estimated from the size of its source file. If the indexes exceed the budget,
+    the least recently used ones are evicted and indexed again on the next access.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty map without a budget."""
+        # Memory budget in bytes, or None if unbounded
+        self.budget = None  # type: Optional[int]
+
+        # Estimated memory of all the indexes in bytes
+        self.size = 0
+
+        self.evictions = 0
+
+        # Map code filename -> index of the source file, from the least to the most recently used
+        self._indexes = collections.OrderedDict()  # type: collections.OrderedDict[str, SourceIndex]
+
+        self._lock = threading.Lock()
+
+    def get(self, filename: str, default: Optional[SourceIndex] = None) -> Optional[SourceIndex]:
+        """Retrieve the index of the source file, or the ``default`` if it has not been indexed."""
+        with self._lock:
+            index = self._indexes.get(filename, None)
+            if index is None:
+                return default
+
+            self._indexes.move_to_end(filename)
+            return index
+
+    def put(self, filename: str, index: SourceIndex) -> None:
+        """Keep the index of the source file and evict the least recently used indexes beyond the budget."""
+        with self._lock:
+            previous = self._indexes.pop(filename, None)
+            if previous is not None:
+                self.size -= previous.size
+                if previous is not index:
+                    previous.close()
+
+            self._indexes[filename] = index
+            self.size += index.size
+
+            if self.budget is not None:
+                # The index which has just been put is kept even if it exceeds the budget on its own as it is
+                # going to be used right away.
+                while self.size > self.budget and len(self._indexes) > 1:
+                    _, evicted = self._indexes.popitem(last=False)
+                    self.size -= evicted.size
+                    self.evictions += 1
+                    evicted.close()
+
+    def pop(self, filename: str, default: Optional[SourceIndex] = None) -> Optional[SourceIndex]:
+        """Remove the index of the source file and return it, or return the ``default`` if it has not been indexed."""
+        with self._lock:
+            index = self._indexes.pop(filename, None)
+            if index is None:
+                return default
+
+            self.size -= index.size
+            return index
+
+    def keys(self) -> List[str]:
+        """List the code filenames of the indexed source files."""
+        with self._lock:
+            return list(self._indexes.keys())
+
+    def clear(self) -> None:
+        """Remove all the indexes, release their memory maps and reset the counter of the evictions."""
+        with self._lock:
+            for index in self._indexes.values():
+                index.close()
+
+            self._indexes.clear()
+            self.size = 0
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        """Return the number of the indexed source files."""
+        with self._lock:
+            return len(self._indexes)
+
+
+# Indexes of the source files by the code filenames
+SOURCE_INDEXES = SourceIndexes()
+
+# Locks of the source files so that each source file is indexed only once, while the different files can be
+# indexed in different threads at the same time
+_SOURCE_INDEX_LOCKS = sphinx_icontract._locks.StripedLocks()
+
+
+def get_source_index(filename: str, index: Callable[[], SourceIndex]) -> SourceIndex:
+    """
+    Retrieve the index of the source file, indexing it on the first access.
+
+    :param filename: code filename
+    :param index: function indexing the source file
+    :return: index of the source file
+    """
+    result = SOURCE_INDEXES.get(filename, None)
+    if result is None:
+        with _SOURCE_INDEX_LOCKS(filename):
+            # The file might have been indexed while we were waiting for the lock.
+            result = SOURCE_INDEXES.get(filename, None)
+            if result is None:
+                result = index()
+                SOURCE_INDEXES.put(filename, result)
+
+    return result
+
+
+def open_source_index(filename: str) -> Optional[SourceIndex]:
+    """
+    Memory-map and index the source file.
+
+    :param filename: code filename
+    :return: index of the source file, or None if the code filename does not refer to a source file on disk
+    """
+    source = sphinx_icontract._source.open_source(path=filename)
+    if source is None:
+        return None
+
+    budget = SOURCE_INDEXES.budget
+    if budget is not None and source.memory() + source.size() * PARSE_STATE_PER_CHARACTER > budget:
+        # The parse state of the whole file would exceed the budget on its own (*e.g.*, in a huge generated
+        # module), so we inspect the decorators one by one in the windows around the lambda functions.
+        return SourceIndex(text=None, filename=filename, source=source)
+
+    return SourceIndex(text=source.text(), filename=filename, source=source)
+
+
+@sphinx_icontract._profiling.profiled(phase=sphinx_icontract._profiling.SOURCE_LOOKUP)
+def _index_source(func: Callable[..., Any]) -> SourceIndex:
+    """Index the source file of the function from the disk, or through inspect if it is not available on the disk."""
+    result = open_source_index(filename=func.__code__.co_filename)
+
+    if result is None:
+        # The function has not been defined in a file (*e.g.*, in a zipped package), so we let inspect find
+        # the source code through the loader.
+        lines, _ = inspect.findsource(func)
+        filename = inspect.getsourcefile(func)
+        if filename is None:
+            filename = "<filename unavailable>"
+
+        result = SourceIndex(text="".join(lines), filename=filename)
+
+    return result
+
+
+def source_index(func: Callable[..., Any]) -> SourceIndex:
+    """Retrieve the index of the source file in which the function has been defined, indexing it on the first access."""
+    code = func.__code__
+
+    result = SOURCE_INDEXES.get(code.co_filename, None)
+    if result is not None:
+        return result
+
+    # Only the actual lookups of the source files are profiled, not the hits of the indexes in memory.
+    return get_source_index(filename=code.co_filename, index=lambda: _index_source(func=func))
+
+
+# Number of the lines before and after the lambda function in which we look for its decorator if the decorator
+# has not been indexed
+DECORATOR_WINDOW = 64
+
+
+def inspect_decorator_in_window(source: sphinx_icontract._source.SourceFile, lineno: int,
+                                filename: str) -> "icontract._represent.DecoratorInspection":
+    """
+    Inspect the decorator call spanning the given line by slicing only the lines around it instead of the whole file.
+
+    The window is widened until the decorator fits in it so that a huge source file is never parsed as a whole.
+
+    :param source: source file
+    :param lineno: line index (starting with 0) of one of the lines in the decorator call
+    :param filename: name of the source file
+    :return: inspected decorator call
+    :raise SyntaxError: if the decorator could not be found even in the whole file
+    """
+    import icontract._represent  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    window = DECORATOR_WINDOW
+    while True:
+        start = max(0, lineno - window)
+        end = lineno + window
+
+        try:
+            return icontract._represent.inspect_decorator(
+                lines=source.lines(start=start, end=end), lineno=lineno - start, filename=filename)
+        except SyntaxError:
+            if start == 0 and end >= len(source):
+                raise
+
+            # The decorator spans beyond the window.
+            window *= 2
+
+
+def _indentation(line: str) -> int:
+    """Measure the leading whitespace of the line."""
+    return len(line) - len(line.lstrip(' \t'))
+
+
+def _parse_statement(lines: Sequence[str], lineno: int, filename: str) -> Optional[Tuple[int, SourceIndex]]:
+    """
+    Parse the statement spanning the given line.
+
+    The first line of the statement is at or above the given line and is not indented more, while the line after
+    the statement is not indented more than the first line.
+
+    :param lines: lines without the line endings
+    :param lineno: line index (starting with 0) in the ``lines``
+    :param filename: name of the source file
+    :return: line index of the first parsed line and the index of the parsed lines, or None if no statement spanning
+        the given line could be parsed
+    """
+    max_indentation = _indentation(lines[lineno])
+
+    for first in range(lineno, -1, -1):
+        stripped = lines[first].strip()
+        indentation = _indentation(lines[first])
+        if not stripped or stripped.startswith('#') or indentation > max_indentation:
+            continue
+
+        for end in range(lineno + 1, len(lines) + 1):
+            if end < len(lines) and (not lines[end].strip() or _indentation(lines[end]) > indentation):
+                continue
+
+            index = SourceIndex(
+                text='\n'.join(sphinx_icontract._lines.dedent_lines(lines[first:end])) + '\n', filename=filename)
+            if index.atok is not None:
+                return first, index
+
+    return None
+
+
+@sphinx_icontract._profiling.profiled(phase=sphinx_icontract._profiling.DECORATOR_INSPECTION)
+def index_window(source: sphinx_icontract._source.SourceFile, lineno: int,
+                 filename: str) -> Optional[Tuple[int, SourceIndex]]:
+    """
+    Parse only the statement around the given line by slicing the lines around it instead of the whole file.
+
+    The window is widened until the statement fits in it, as in :func:`inspect_decorator_in_window`.
+
+    :param source: source file
+    :param lineno: line index (starting with 0)
+    :param filename: name of the source file
+    :return: line index of the first parsed line and the index of the parsed lines, or None if no statement spanning
+        the given line could be parsed even in the whole file
+    """
+    if lineno < 0 or lineno >= len(source):
+        return None
+
+    window = DECORATOR_WINDOW
+    while True:
+        start = max(0, lineno - window)
+        end = lineno + window
+
+        lines = [line.rstrip('\n') for line in source.lines(start=start, end=end)]
+        result = _parse_statement(lines=lines, lineno=lineno - start, filename=filename)
+        if result is not None:
+            first, index = result
+            return start + first, index
+
+        if start == 0 and end >= len(source):
+            return None
+
+        # The statement spans beyond the window.
+        window *= 2
+
+
+@sphinx_icontract._profiling.profiled(phase=sphinx_icontract._profiling.DECORATOR_INSPECTION)
+def inspect_decorator(func: Callable[..., Any]) -> "icontract._represent.DecoratorInspection":
+    """
+    Inspect the decorator call in which the lambda function has been defined.
+
+    :param func: lambda function given as an argument to a decorator
+    :return: inspected decorator call
+    """
+    code = func.__code__
+
+    index = source_index(func=func)
+
+    decorator_inspection = index.inspect_decorator(lineno=code.co_firstlineno - 1)
+    if decorator_inspection is None:
+        # The lambda is not stated directly in a decorator of a function or a class. Leave it to icontract to
+        # inspect the decorator (or fail) in the usual way.
+        import icontract._represent  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        if index.source is not None:
+            decorator_inspection = inspect_decorator_in_window(
+                source=index.source, lineno=code.co_firstlineno - 1, filename=index.filename)
+        else:
+            lines, lineno = inspect.findsource(func)
+            decorator_inspection = icontract._represent.inspect_decorator(
+                lines=lines, lineno=lineno, filename=index.filename)
+
+    return decorator_inspection
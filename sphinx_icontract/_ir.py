@@ -0,0 +1,97 @@
+"""Represent the contracts independently of the output format."""
+from typing import Any, List, Optional, Tuple
+
+
+class ConditionIR:
+    """
+    Represent a condition independently of the output format.
+
+    The condition is extracted from the source code only once, while the reST is written from it
+    (see :func:`sphinx_icontract._render.write_condition`).
+    """
+
+    __slots__ = ['function', 'lines', 'implication', 'rest']
+
+    def __init__(self,
+                 function: Optional[str] = None,
+                 lines: Optional[Tuple[str, ...]] = None,
+                 implication: Optional[Tuple[str, str]] = None,
+                 rest: Optional[str] = None) -> None:
+        """
+        Initialize with the given values.
+
+        :param function: name of the condition function if the condition is not given as a lambda
+        :param lines: lines of the source code of the lambda body, dedented if it spans multiple lines
+        :param implication: antecedent and consequent if the condition is an implication
+        :param rest: reST text if the condition has been matched by a registered pattern
+        """
+        self.function = function
+        self.lines = lines
+        self.implication = implication
+        self.rest = rest
+
+    def to_jsonable(self) -> List[Any]:
+        """Represent the condition as a JSON-able list (*e.g.*, for the disk cache)."""
+        return [
+            self.function, None if self.lines is None else list(self.lines), None
+            if self.implication is None else list(self.implication), self.rest
+        ]
+
+    @staticmethod
+    def from_jsonable(value: List[Any]) -> 'ConditionIR':
+        """Restore the condition from the result of :meth:`to_jsonable`."""
+        function, lines, implication, rest = value
+        return ConditionIR(
+            function=function,
+            lines=None if lines is None else tuple(lines),
+            implication=None if implication is None else tuple(implication),
+            rest=rest)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare all the fields."""
+        return isinstance(other, ConditionIR) and self.to_jsonable() == other.to_jsonable()
+
+    def __repr__(self) -> str:
+        """Represent the condition with all its fields for easier debugging."""
+        return 'ConditionIR(function={!r}, lines={!r}, implication={!r}, rest={!r})'.format(
+            self.function, self.lines, self.implication, self.rest)
+
+
+class ContractIR:
+    """Represent a precondition, a postcondition or an invariant independently of the output format."""
+
+    __slots__ = ['kind', 'condition', 'error_type', 'error_message', 'description']
+
+    def __init__(self, kind: str, condition: ConditionIR, error_type: Optional[str], error_message: Optional[str],
+                 description: Optional[str]) -> None:
+        """
+        Initialize with the given values.
+
+        :param kind: ``precondition``, ``postcondition`` or ``invariant``
+        :param condition: condition of the contract
+        :param error_type: type of the error raised on violation, if it could be inferred
+        :param error_message:
+            message of the error if the error is given as a lambda calling the error type with a string literal
+        :param description: description of the contract, if given
+        """
+        self.kind = kind
+        self.condition = condition
+        self.error_type = error_type
+        self.error_message = error_message
+        self.description = description
+
+
+class SnapshotIR:
+    """Represent a snapshot independently of the output format."""
+
+    __slots__ = ['name', 'capture']
+
+    def __init__(self, name: str, capture: Tuple[str, ...]) -> None:
+        """
+        Initialize with the given values.
+
+        :param name: name of the snapshot
+        :param capture: lines of the source code of the capture, dedented if it spans multiple lines
+        """
+        self.name = name
+        self.capture = capture
@@ -0,0 +1,388 @@
+"""Represent the rendered reST as immutable lines which are concatenated without copying."""
+import itertools
+import os
+import re
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union, cast, overload
+
+import sphinx_icontract._slow
+
+# The lines link and memoize the parts through the protected members of each other.
+# pylint: disable=protected-access
+
+# Maximum depth of the nested concatenations in a rope of lines before it is flattened
+_MAX_ROPE_DEPTH = 32
+
+
+class Lines(list):
+    """
+    Represent an immutable list of text lines.
+
+    The lines are stored as a rope of parts. Concatenating lines links the parts instead of copying them, and
+    the indented lines (see :func:`make_bullet`) are produced only on iteration.
+
+    The lines are a list so that they can be used wherever a list is expected. The list itself is filled only once
+    it is accessed as a list (*e.g.*, on the first indexing). The methods which would modify it raise
+    a :class:`TypeError`.
+    """
+
+    __slots__ = ('_parts', '_len', '_depth', '_filled', '_bullet')
+
+    # yapf: disable
+    @sphinx_icontract._slow.require(
+        lambda lines:
+        all(
+            '\n' not in line and '\r' not in line
+            for line in lines
+        )
+    )
+    # yapf: enable
+    def __init__(self, lines: Sequence[str]) -> None:
+        r"""
+        Ensure the properties on the ``lines``.
+
+        Please make sure that you transfer the "ownership" immediately to Lines
+        and don't modify the original list of strings any more:
+
+        .. code-block: python
+
+            ##
+            # OK
+            ##
+
+            lines = Lines(some_text.splitlines())
+
+            ##
+            # Not OK
+            ##
+
+            some_lines = some_text.splitlines()
+            lines = Lines(some_lines)
+            # ... do something assuming ``lines`` is immutable ...
+
+            some_lines[0] = "This will break \n your logic"
+            # ERROR! lines[0] now contains a new-line which is unexpected!
+
+        """
+        # Each part is a sequence of lines, another ``Lines`` or a ``_Bullet`` view.
+        self._parts = (lines, )  # type: Tuple[Any, ...]
+        self._len = len(lines)
+
+        # Depth of the rope (0 for a leaf)
+        self._depth = 0
+
+        # True if the list has been filled with the lines (see :meth:`_flatten`)
+        self._filled = False
+
+        # Lines indented as a bullet point on the first iteration of a bullet view
+        self._bullet = None  # type: Optional[Tuple[str, ...]]
+
+    @staticmethod
+    def _from_parts(parts: Tuple[Any, ...]) -> "Lines":
+        """Link the parts in new lines bypassing the checks since the parts have been already checked."""
+        unwrapped = []  # type: List[Any]
+        length = 0
+        depth = 0
+        for part in parts:
+            if type(part) is Lines:  # pylint: disable=unidiomatic-typecheck
+                length += part._len
+
+                # Unwrap the single-part lines so that the iteration does not need to go through them
+                if not part._filled and len(part._parts) == 1:
+                    part = part._parts[0]
+            else:
+                length += len(part)
+
+            if type(part) is Lines:  # pylint: disable=unidiomatic-typecheck
+                depth = max(depth, part._depth)
+
+            unwrapped.append(part)
+
+        result = Lines.__new__(Lines)
+        result._parts = tuple(unwrapped)
+        result._len = length
+        result._depth = depth + 1
+        result._filled = False
+        result._bullet = None
+
+        if result._depth > _MAX_ROPE_DEPTH:
+            # Flatten the deep ropes (*e.g.*, resulting from a long chain of concatenations) so that
+            # the iteration does not need to descend too deep.
+            result._flatten()
+            result._parts = ()
+            result._depth = 0
+
+        return result
+
+    @staticmethod
+    def _of_part(part: Any, length: int) -> "Lines":
+        """Wrap a single part in lines bypassing the checks since the part has been already checked."""
+        result = Lines.__new__(Lines)
+        result._parts = (part, )
+        result._len = length
+        result._depth = 0
+        result._filled = False
+        result._bullet = None
+        return result
+
+    @staticmethod
+    def concatenate(parts: Sequence["Lines"]) -> "Lines":
+        """Concatenate the lines without copying them."""
+        return Lines._from_parts(tuple(parts))
+
+    def _flatten(self) -> None:
+        """Fill the list with the lines once it is accessed as a list."""
+        # The lines are shared among the threads (see :class:`sphinx_icontract._render_cache.RenderCache`). If two
+        # threads flatten them at the same time, both fill the list with the same lines as the whole list is replaced
+        # at once.
+        if not self._filled:
+            list.__setitem__(self, slice(None), tuple(itertools.chain.from_iterable(self._parts)))
+            self._filled = True
+
+    def __add__(self, other: Any) -> Any:
+        """Concatenate the lines with other lines without copying them, or with a list as a list."""
+        if isinstance(other, Lines):
+            return Lines.concatenate([self, other])
+
+        if isinstance(other, list):
+            return list(self) + other
+
+        return NotImplemented
+
+    def __radd__(self, other: Any) -> Any:
+        """Concatenate a list with the lines as a list."""
+        if isinstance(other, list):
+            return other + list(self)
+
+        return NotImplemented
+
+    def __iadd__(self, other: Any) -> Any:
+        """Concatenate without modifying the lines."""
+        return self + other
+
+    def __mul__(self, count: Any) -> Any:
+        """Repeat the lines as a list."""
+        return list(self) * count
+
+    __rmul__ = __mul__
+    __imul__ = __mul__
+
+    # pylint: disable=function-redefined
+
+    @overload  # type: ignore
+    def __getitem__(self, index: int) -> str:
+        """Get the item at the given integer index."""
+        pass
+
+    @overload
+    def __getitem__(self, index: slice) -> "Lines":
+        """Get the slice of the lines."""
+        pass
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, "Lines"]:
+        """Get the line(s) at the given index."""
+        self._flatten()
+
+        if isinstance(index, slice):
+            return Lines(list.__getitem__(self, index))
+
+        return cast(str, list.__getitem__(self, index))
+
+    def __len__(self) -> int:
+        """Return the number of the lines."""
+        return self._len
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the lines."""
+        if self._filled:
+            return list.__iter__(self)
+
+        parts = self._parts
+        if len(parts) == 1:
+            return iter(parts[0])
+
+        return itertools.chain.from_iterable(parts)
+
+    def __reversed__(self) -> Iterator[str]:
+        """Iterate over the lines in reverse."""
+        self._flatten()
+        return list.__reversed__(self)
+
+    def __contains__(self, line: object) -> bool:
+        """Check whether the line is among the lines."""
+        return any(line == another for another in self)
+
+    def count(self, line: Any) -> int:
+        """Count the occurrences of the line."""
+        return sum(1 for another in self if line == another)
+
+    def index(self, line: Any, *args: Any) -> int:
+        """Find the index of the first occurrence of the line."""
+        self._flatten()
+        return list.index(self, line, *args)
+
+    def copy(self) -> List[str]:
+        """Copy the lines to a list."""
+        return list(self)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare line-wise with other lines, a list or a tuple."""
+        if not isinstance(other, (list, tuple)):
+            return NotImplemented
+
+        return len(self) == len(other) and all(line == other_line for line, other_line in zip(self, other))
+
+    def __ne__(self, other: object) -> bool:
+        """Compare line-wise with other lines, a list or a tuple."""
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return NotImplemented
+
+        return not equal
+
+    def __lt__(self, other: Any) -> bool:
+        """Compare lexicographically as lists."""
+        return list(self) < list(other)
+
+    def __le__(self, other: Any) -> bool:
+        """Compare lexicographically as lists."""
+        return list(self) <= list(other)
+
+    def __gt__(self, other: Any) -> bool:
+        """Compare lexicographically as lists."""
+        return list(self) > list(other)
+
+    def __ge__(self, other: Any) -> bool:
+        """Compare lexicographically as lists."""
+        return list(self) >= list(other)
+
+    __hash__ = None  # type: ignore
+
+    def _immutable(self, *args: Any, **kwargs: Any) -> Any:
+        """Refuse to modify the lines."""
+        raise TypeError("Lines are immutable")
+
+    append = extend = insert = pop = remove = clear = sort = reverse = _immutable  # type: ignore
+    __setitem__ = __delitem__ = _immutable  # type: ignore
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """Pickle the lines as a tuple so that the rope does not need to be pickled."""
+        return Lines, (tuple(self), )
+
+    def __repr__(self) -> str:
+        """Represent the lines as a list."""
+        return 'Lines({!r})'.format(list(self))
+
+
+class _Bullet:
+    """
+    Represent a view on the lines indented as a bullet point.
+
+    The indented lines are produced on the first iteration and memoized on the viewed lines so that the lines
+    shared among the documented objects (*e.g.*, the inherited contracts) are indented only once.
+    """
+
+    __slots__ = ('lines', )
+
+    def __init__(self, lines: Lines) -> None:
+        """Initialize with the lines to be indented."""
+        self.lines = lines
+
+    def __len__(self) -> int:
+        """Return the number of the lines."""
+        return len(self.lines)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the indented lines."""
+        lines = self.lines
+
+        # See :meth:`Lines._flatten` on the concurrent memoization.
+        bullet = lines._bullet
+        if bullet is None:
+            iterator = iter(lines)
+            first_line = next(iterator, None)
+
+            if first_line is None:
+                bullet = ()
+            else:
+                result = ['    * ' + first_line]
+                result.extend(['      ' + line if line.strip() else '' for line in iterator])
+                bullet = tuple(result)
+
+            lines._bullet = bullet
+
+        return iter(bullet)
+
+
+def make_bullet(lines: Lines) -> Lines:
+    """
+    Indent the lines and put the bullet point in front.
+
+    The indented lines are produced only once the result is iterated over.
+
+    >>> make_bullet(Lines(['x', '', '  y']))
+    Lines(['    * x', '', '        y'])
+    """
+    if lines._bullet is not None:
+        return Lines._of_part(lines._bullet, len(lines._bullet))
+
+    return Lines._of_part(_Bullet(lines=lines), len(lines))
+
+
+_WHITESPACE_PREFIX_RE = re.compile(r'^\s+')
+
+
+def dedent_lines(lines: Sequence[str]) -> List[str]:
+    """
+    Remove the common leading whitespace from the lines.
+
+    The result is the same as if the lines were joined, dedented with :func:`textwrap.dedent` and split again, but
+    the lines are neither joined nor matched with regular expressions. Only spaces and tabs count as the leading
+    whitespace, the lines consisting solely of them are emptied and an empty last line is dropped.
+
+    :param lines: lines without the line endings
+    :return: dedented lines
+    """
+    result = []  # type: List[str]
+    margin = None  # type: Optional[str]
+
+    for line in lines:
+        content = line.lstrip(' \t')
+        if not content:
+            result.append('')
+            continue
+
+        indent = line[:len(line) - len(content)]
+
+        if margin is None:
+            margin = indent
+        elif not indent.startswith(margin):
+            # Spaces and tabs are not equal, so we need the common prefix and not the shortest indent.
+            margin = indent if margin.startswith(indent) else os.path.commonprefix([margin, indent])
+
+        result.append(line)
+
+    if margin:
+        cut = len(margin)
+        result = [line[cut:] for line in result]
+
+    if result and result[-1] == '':
+        result.pop()
+
+    return result
+
+
+def smart_dedent_multi_line_lambda_condition(lines: Sequence[str]) -> Lines:
+    """
+    Try to dedent multi-line lambda condition for better aesthetics.
+
+    The first line is usually not indented, while the following lines are
+    (since we inspect the source code).
+    """
+    if len(lines) == 0:
+        return Lines([])
+
+    # If the first line is already indented, try to dedent it as a block
+    if _WHITESPACE_PREFIX_RE.match(lines[0]):
+        return Lines(dedent_lines(lines))
+
+    return Lines([lines[0]] + dedent_lines(lines[1:]))
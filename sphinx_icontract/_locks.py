@@ -0,0 +1,22 @@
+"""Provide the locks so that the contracts can be rendered from multiple threads."""
+import threading
+from typing import Hashable, Tuple, Any
+
+
+class StripedLocks:
+    """
+    Provide a lock per key (*e.g.*, per source file) from a fixed pool of locks.
+
+    The work on the same key is serialized (*e.g.*, a source file is parsed only once), while the work on
+    the different keys rarely waits for the same lock.
+
+    The locks are re-entrant so that a thread working on two keys sharing a lock does not deadlock itself.
+    """
+
+    def __init__(self, stripes: int = 64) -> None:
+        """Initialize with the given number of the locks."""
+        self._locks = tuple(threading.RLock() for _ in range(stripes))  # type: Tuple[Any, ...]
+
+    def __call__(self, key: Hashable) -> Any:
+        """Retrieve the lock of the key."""
+        return self._locks[hash(key) % len(self._locks)]
@@ -0,0 +1,179 @@
+"""Match the single-line conditions against the patterns which render them more readably."""
+import ast
+import typing
+from typing import Callable, Dict, List, Optional, Tuple
+
+if typing.TYPE_CHECKING:
+    import asttokens
+
+
+def node_text(atok: "asttokens.ASTTokens", node: ast.AST) -> str:
+    """
+    Get the source text of the expression node.
+
+    This is equivalent to ``atok.get_text(node=node)`` for the expressions, but slices the source directly
+    by the offsets of the first and the last token. The conditions are matched against the patterns
+    on every rendering so that the general (and slower) path of asttokens adds up.
+    """
+    return atok.text[node.first_token.startpos:node.last_token.endpos]  # type: ignore
+
+
+# Map type of a comparison operator -> format of the negated comparison given the left and the right text
+_NEGATED_COMPARISONS = {
+    ast.Eq: '{} != {}',
+    ast.NotEq: '{} == {}',
+    ast.Lt: '{} >= {}',
+    ast.LtE: '{} > {}',
+    ast.Gt: '{} <= {}',
+    ast.GtE: '{} < {}',
+    ast.Is: '{} is not {}',
+    ast.IsNot: '{} is {}',
+    ast.In: '{} not in {}',
+    ast.NotIn: '{} in {}'
+}  # type: Dict[type, str]
+
+
+def _negate_compare_text(atok: "asttokens.ASTTokens", node: ast.Compare) -> str:
+    """
+    Generate the text representing the negation of the comparison node.
+
+    :param atok:
+        parsing obtained with ``asttokens`` so that we can access the last tokens of a node.
+
+        The standard ``ast`` module provides only the first token of an AST node. In lack of concrete syntax tree,
+        getting text from first to last token is currently the simplest approach.
+    :param node: AST node representing the comparison in a condition
+    :return: text representation of the node's negation
+    """
+    assert len(node.ops) == 1, "A single comparison expected, but got: {}".format(len(node.ops))
+    assert len(node.comparators) == 1, "A single comparator expected, but got: {}".format(len(node.comparators))
+
+    operator = node.ops[0]
+
+    fmt = _NEGATED_COMPARISONS.get(type(operator), None)
+    if fmt is None:
+        raise NotImplementedError("Unhandled comparison operator: {}".format(operator))
+
+    return fmt.format(node_text(atok=atok, node=node.left), node_text(atok=atok, node=node.comparators[0]))
+
+
+# Negate the given expression node as text, or return None if the node can not be negated
+NegationFunc = Callable[["asttokens.ASTTokens", ast.expr], Optional[str]]
+
+
+def _negate_unary_op(atok: "asttokens.ASTTokens", node: ast.expr) -> Optional[str]:
+    """Negate ``not A`` as ``A``; other unary operations are negated in parentheses."""
+    assert isinstance(node, ast.UnaryOp)
+    if isinstance(node.op, ast.Not):
+        return node_text(atok=atok, node=node.operand)
+
+    return 'not ({})'.format(node_text(atok=atok, node=node))
+
+
+def _negate_in_parentheses(atok: "asttokens.ASTTokens", node: ast.expr) -> Optional[str]:
+    """Negate the expression which needs to be parenthesized (*e.g.*, ``a + b``) as ``not (...)``."""
+    return 'not ({})'.format(node_text(atok=atok, node=node))
+
+
+def _negate_compare(atok: "asttokens.ASTTokens", node: ast.expr) -> Optional[str]:
+    """Negate the single comparison by the inverse operator; the chained comparisons are not negated."""
+    assert isinstance(node, ast.Compare)
+    if len(node.ops) != 1:
+        return None
+
+    return _negate_compare_text(atok=atok, node=node)
+
+
+def _negate_atom(atok: "asttokens.ASTTokens", node: ast.expr) -> Optional[str]:
+    """Negate the expression which binds tighter than ``not`` (*e.g.*, a call) as ``not ...``."""
+    return 'not {}'.format(node_text(atok=atok, node=node))
+
+
+# Map type of the AST node -> function negating it in an implication
+NEGATIONS = {
+    ast.UnaryOp: _negate_unary_op,
+    ast.BinOp: _negate_in_parentheses,
+    ast.GeneratorExp: _negate_in_parentheses,
+    ast.IfExp: _negate_in_parentheses,
+    ast.Compare: _negate_compare,
+    ast.Call: _negate_atom,
+    ast.Attribute: _negate_atom,
+    ast.Name: _negate_atom,
+    ast.Subscript: _negate_atom,
+    ast.Index: _negate_atom,
+    ast.Slice: _negate_atom,
+    ast.ExtSlice: _negate_atom,
+    ast.ListComp: _negate_atom,
+    ast.SetComp: _negate_atom,
+    ast.DictComp: _negate_atom
+}  # type: Dict[type, NegationFunc]
+
+# Format the body of a single-line condition as a reST line, or return None if the pattern does not match
+PatternFunc = Callable[["asttokens.ASTTokens", ast.expr], Optional[str]]
+
+# Match an implication returning the antecedent and the consequent, or None if the node is not an implication
+ImplicationFunc = Callable[["asttokens.ASTTokens", ast.expr], Optional[Tuple[str, str]]]
+
+
+class Implication:
+    """
+    Represent a built-in pattern matching an implication ``A ⇒ B``.
+
+    The antecedent and the consequent are kept separately in the intermediate representation
+    (see :class:`sphinx_icontract._ir.ConditionIR`). Called as a registered pattern, the implication is formatted
+    as reST.
+    """
+
+    __slots__ = ['match']
+
+    def __init__(self, match: ImplicationFunc) -> None:
+        """Initialize with the given value."""
+        self.match = match
+
+    def __call__(self, atok: "asttokens.ASTTokens", node: ast.expr) -> Optional[str]:
+        """Format the matched implication as reST."""
+        implication = self.match(atok, node)
+        if implication is None:
+            return None
+
+        return write_implication(implication=implication)
+
+
+def _implication_from_or(atok: "asttokens.ASTTokens", node: ast.expr) -> Optional[Tuple[str, str]]:
+    """Match ``not A or B`` (and the alike with a negatable ``A``) as ``A ⇒ B``."""
+    assert isinstance(node, ast.BoolOp)
+    if not isinstance(node.op, ast.Or) or len(node.values) != 2:
+        return None
+
+    left, right = node.values
+
+    negate = NEGATIONS.get(type(left), None)
+    if negate is None:
+        return None
+
+    negated = negate(atok, left)
+    if negated is None:
+        return None
+
+    return negated, node_text(atok=atok, node=right)
+
+
+def _implication_from_if_exp(atok: "asttokens.ASTTokens", node: ast.expr) -> Optional[Tuple[str, str]]:
+    """Match ``B if A else True`` as ``A ⇒ B``."""
+    assert isinstance(node, ast.IfExp)
+    if not isinstance(node.orelse, ast.NameConstant) or not node.orelse.value:
+        return None
+
+    return node_text(atok=atok, node=node.test), node_text(atok=atok, node=node.body)
+
+
+# Map type of the condition body -> patterns tried in order on the single-line conditions
+PATTERNS = {
+    ast.BoolOp: [Implication(match=_implication_from_or)],
+    ast.IfExp: [Implication(match=_implication_from_if_exp)]
+}  # type: Dict[type, List[PatternFunc]]
+
+
+def write_implication(implication: Tuple[str, str]) -> str:
+    """Format the implication as a reST line."""
+    return ':code:`{}` ⇒ :code:`{}`'.format(implication[0], implication[1])
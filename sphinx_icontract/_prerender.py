@@ -0,0 +1,252 @@
+"""Render the lambda functions of the contracts ahead of the docstring events grouped by their source files."""
+import collections
+import inspect
+import linecache
+import os
+import typing
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import sphinx_icontract._disk_cache
+import sphinx_icontract._format
+import sphinx_icontract._index
+import sphinx_icontract._render
+import sphinx_icontract._renderings
+
+if typing.TYPE_CHECKING:
+    import icontract
+    import icontract._represent
+
+# Use protected methods from icontract and tightly couple with it (see the note in :mod:`sphinx_icontract`).
+# pylint: disable=protected-access
+
+# Map kind of the rendering -> function rendering the lambda from the inspected decorator
+_RENDER_IN_DECORATOR = {
+    'condition': sphinx_icontract._render.extract_condition_in_decorator,
+    'error': sphinx_icontract._render.error_in_decorator_type_and_message,
+    'capture': sphinx_icontract._render.capture_in_decorator_as_text
+}  # type: Dict[str, Callable[[icontract._represent.DecoratorInspection], Any]]
+
+
+def _contract_lambdas(contract: "icontract._Contract") -> Iterator[Tuple[Callable[..., Any], str]]:
+    """Yield the lambda functions of the contract together with the kind of their rendering."""
+    import icontract._represent  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    if icontract._represent.is_lambda(a_function=contract.condition):
+        yield contract.condition, 'condition'
+
+    if (contract.error is not None and not isinstance(contract.error, type) and callable(contract.error)
+            and icontract._represent.is_lambda(a_function=contract.error)):
+        yield contract.error, 'error'
+
+
+def _function_lambdas(func: Optional[Callable[..., Any]]) -> Iterator[Tuple[Callable[..., Any], str]]:
+    """Yield the lambda functions of the function contracts together with the kind of their rendering."""
+    if func is None:
+        return
+
+    import icontract._represent  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    pps = sphinx_icontract._format.function_contracts(func=func)
+
+    for group in pps.preconditions:
+        for precondition in group:
+            yield from _contract_lambdas(contract=precondition)
+
+    for snapshot in pps.snapshots:
+        if icontract._represent.is_lambda(a_function=snapshot.capture):
+            yield snapshot.capture, 'capture'
+
+    for postcondition in pps.postconditions:
+        yield from _contract_lambdas(contract=postcondition)
+
+
+def class_members(cls: type) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Yield the class and its members which can have contracts.
+
+    :param cls: class to be walked
+    :return: qualified names, what the objects are (as in autodoc, *e.g.*, ``method``) and the objects
+    """
+    qualname = '{}.{}'.format(cls.__module__, cls.__qualname__)
+    yield qualname, 'class', cls
+
+    for name, attribute in list(vars(cls).items()):
+        if isinstance(attribute, (staticmethod, classmethod)):
+            yield '{}.{}'.format(qualname, name), 'method', attribute.__func__
+        elif isinstance(attribute, property):
+            yield '{}.{}'.format(qualname, name), 'attribute', attribute
+        elif inspect.isfunction(attribute):
+            yield '{}.{}'.format(qualname, name), 'method', attribute
+
+
+def module_members(module: Any) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Yield the functions and the classes defined in the module together with the members of the classes.
+
+    :param module: module to be walked
+    :return: qualified names, what the objects are (as in autodoc, *e.g.*, ``function``) and the objects
+    """
+    for name, value in list(vars(module).items()):
+        if getattr(value, '__module__', None) != module.__name__:
+            continue
+
+        if inspect.isfunction(value):
+            yield '{}.{}'.format(module.__name__, name), 'function', value
+
+        elif inspect.isclass(value):
+            yield from class_members(cls=value)
+
+
+def object_lambdas(what: str, obj: Any) -> Iterator[Tuple[Callable[..., Any], str]]:
+    """Yield the lambda functions of the contracts of the object together with the kind of their rendering."""
+    if what == 'class':
+        for invariant in getattr(obj, "__invariants__", []):
+            yield from _contract_lambdas(contract=invariant)
+
+    elif what == 'attribute':
+        for func in [obj.fget, obj.fset, obj.fdel]:
+            yield from _function_lambdas(func=func)
+
+    else:
+        yield from _function_lambdas(func=obj)
+
+
+def module_lambdas(module: Any) -> Iterator[Tuple[Callable[..., Any], str]]:
+    """Yield the lambda functions of the contracts of the functions and classes defined in the module."""
+    for _, what, obj in module_members(module=module):
+        yield from object_lambdas(what=what, obj=obj)
+
+
+def prerender_file(filename: str, keys: List[Tuple[int, str]]) -> List[Tuple[int, str, Any]]:
+    """
+    Render the lambda functions defined in the source file.
+
+    This function is executed in the worker processes of the pre-rendering so it works only on the source code
+    and does not need the lambda functions themselves.
+
+    :param filename: code filename of the lambda functions
+    :param keys: first lines and kinds of the renderings of the lambda functions
+    :return: first lines, kinds and the renderings of the lambda functions (picklable)
+    """
+
+    def index_file() -> sphinx_icontract._index.SourceIndex:
+        """Index the source file from the disk, or from the line cache if there is no source file on the disk."""
+        result = sphinx_icontract._index.open_source_index(filename=filename)
+        if result is None:
+            result = sphinx_icontract._index.SourceIndex(text="".join(linecache.getlines(filename)), filename=filename)
+
+        return result
+
+    index = sphinx_icontract._index.get_source_index(filename=filename, index=index_file)
+
+    result = []  # type: List[Tuple[int, str, Any]]
+    for lineno, kind in keys:
+        decorator_inspection = index.inspect_decorator(lineno=lineno - 1)
+        if decorator_inspection is None and index.atok is None and index.source is not None:
+            # The source file has not been parsed as a whole since it exceeds the memory budget.
+            try:
+                decorator_inspection = sphinx_icontract._index.inspect_decorator_in_window(
+                    source=index.source, lineno=lineno - 1, filename=index.filename)
+            except (SyntaxError, ValueError):
+                decorator_inspection = None
+
+        if decorator_inspection is None:
+            # The lambda is not stated directly in a decorator. Leave it to the rendering on demand.
+            continue
+
+        result.append((lineno, kind, _RENDER_IN_DECORATOR[kind](decorator_inspection)))
+
+    return result
+
+
+def _prerender_file_within_budget(filename: str, keys: List[Tuple[int, str]],
+                                  budget: Optional[int]) -> List[Tuple[int, str, Any]]:
+    """Render the lambda functions in a worker process which does not share the memory budget of the build."""
+    sphinx_icontract._index.SOURCE_INDEXES.budget = budget
+    return prerender_file(filename=filename, keys=keys)
+
+
+def prerendering_keys(lambdas: Iterable[Tuple[Callable[..., Any], str]],
+                      disk_cache: Optional[sphinx_icontract._disk_cache.DiskCache]) -> Dict[str, List[Tuple[int, str]]]:
+    """
+    Collect the lambda functions which have not been rendered yet grouped by their source files.
+
+    :param lambdas: lambda functions of the contracts and the kinds of their renderings
+    :param disk_cache: disk cache of the previous builds, if enabled
+    :return: map code filename -> first lines and kinds of the renderings
+    """
+    keys_by_file = collections.OrderedDict()  # type: Dict[str, List[Tuple[int, str]]]
+
+    visited = set()  # type: Set[Tuple[str, int, str]]
+    for func, kind in lambdas:
+        code = func.__code__
+        key = (code.co_filename, code.co_firstlineno, kind)
+        if key in visited or key in sphinx_icontract._renderings.PRERENDERED:
+            continue
+
+        visited.add(key)
+
+        if disk_cache is not None and disk_cache.contains(path=code.co_filename, lineno=code.co_firstlineno, kind=kind):
+            continue
+
+        keys_by_file.setdefault(code.co_filename, []).append((code.co_firstlineno, kind))
+
+    return keys_by_file
+
+
+def _prerender_files(keys_by_file: Dict[str, List[Tuple[int, str]]],
+                     workers: Optional[int]) -> List[List[Tuple[int, str, Any]]]:
+    """
+    Render the lambda functions of the source files in a process pool.
+
+    :param keys_by_file: map code filename -> first lines and kinds of the renderings
+    :param workers: maximum number of the worker processes, or None to use as many as there are CPUs
+    :return: renderings of the lambda functions per source file, in the order of ``keys_by_file``
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1 or len(keys_by_file) == 1:
+        # Spare the overhead of the process pool if there is nothing to parallelize.
+        return [prerender_file(filename=filename, keys=keys) for filename, keys in keys_by_file.items()]
+
+    import concurrent.futures  # pylint: disable=import-outside-toplevel
+
+    budgets = [sphinx_icontract._index.SOURCE_INDEXES.budget] * len(keys_by_file)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_prerender_file_within_budget, keys_by_file.keys(), keys_by_file.values(), budgets))
+
+
+def prerender(modules: Sequence[Any], workers: Optional[int]) -> int:
+    """
+    Render the lambda functions of the contracts in the modules in a process pool ahead of the docstring events.
+
+    The lambda functions are grouped by their source files so that each source file is parsed only in one worker.
+    The lambda functions which have been already rendered in the previous builds (see :mod:`_disk_cache`) are
+    skipped.
+
+    :param modules: modules whose functions and classes are documented
+    :param workers: maximum number of the worker processes, or None to use as many as there are CPUs
+    :return: number of the pre-rendered lambda functions
+    """
+    disk_cache = sphinx_icontract._renderings.get_disk_cache()
+
+    lambdas = (pair for module in modules for pair in module_lambdas(module=module))
+    keys_by_file = prerendering_keys(lambdas=lambdas, disk_cache=disk_cache)
+    if not keys_by_file:
+        return 0
+
+    results = _prerender_files(keys_by_file=keys_by_file, workers=workers)
+
+    count = 0
+    for filename, renderings in zip(keys_by_file.keys(), results):
+        for lineno, kind, value in renderings:
+            sphinx_icontract._renderings.PRERENDERED[(filename, lineno, kind)] = value
+
+            if disk_cache is not None:
+                disk_cache.put(
+                    path=filename, lineno=lineno, kind=kind, value=sphinx_icontract._renderings.to_jsonable(value))
+
+            count += 1
+
+    return count
@@ -0,0 +1,55 @@
+"""Build the archive pre-warming the disk cache of the documentation builds."""
+import collections
+import os
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+import sphinx_icontract._disk_cache
+import sphinx_icontract._export
+import sphinx_icontract._index
+import sphinx_icontract._prerender
+import sphinx_icontract._renderings
+
+# We rely on the same protected functions as the rendering for Sphinx.
+# pylint: disable=protected-access
+
+
+def build_archive(names: Iterable[str]) -> sphinx_icontract._disk_cache.Archive:
+    """
+    Render the lambda functions of the contracts in the packages and collect them keyed by their source files.
+
+    The source files are parsed one at a time. The lambda functions which are not stated directly in a decorator
+    are left to the rendering on demand, as in the pre-rendering.
+
+    :param names: fully qualified names of the modules or packages (including their submodules)
+    :return: archive to be loaded by the documentation builds
+    """
+    # Map code filename -> first lines and kinds of the renderings
+    keys_by_file = collections.OrderedDict()  # type: Dict[str, List[Tuple[int, str]]]
+
+    visited = set()  # type: Set[Tuple[str, int, str]]
+    for module in sphinx_icontract._export.iterate_modules(names=names):
+        for func, kind in sphinx_icontract._prerender.module_lambdas(module=module):
+            code = func.__code__
+            key = (code.co_filename, code.co_firstlineno, kind)
+            if key in visited:
+                continue
+
+            visited.add(key)
+            keys_by_file.setdefault(code.co_filename, []).append((code.co_firstlineno, kind))
+
+    files = dict()  # type: Dict[str, Dict[str, Any]]
+    for filename, keys in keys_by_file.items():
+        if not os.path.isfile(filename):
+            # The source file is not available in the documentation builds either (*e.g.*, ``<string>``).
+            continue
+
+        entries = files.setdefault(sphinx_icontract._disk_cache._digest(path=filename), dict())
+        for lineno, kind, value in sphinx_icontract._prerender.prerender_file(filename=filename, keys=keys):
+            entries['{}:{}'.format(lineno, kind)] = sphinx_icontract._renderings.to_jsonable(value)
+
+        # Free the parsed source file as it is not needed any more.
+        index = sphinx_icontract._index.SOURCE_INDEXES.pop(filename, None)
+        if index is not None:
+            index.close()
+
+    return sphinx_icontract._disk_cache.Archive(version=sphinx_icontract._renderings.version(), files=files)
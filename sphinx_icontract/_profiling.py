@@ -0,0 +1,297 @@
+"""Measure how much time the rendering of the contracts takes."""
+import collections
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, MutableMapping, Optional, Tuple, TypeVar, cast
+
+# Phases of the rendering in the order of the report
+SOURCE_LOOKUP = 'source_lookup'
+DECORATOR_INSPECTION = 'decorator_inspection'
+AST_MATCHING = 'ast_matching'
+REST_ASSEMBLY = 'rest_assembly'
+
+PHASES = [SOURCE_LOOKUP, DECORATOR_INSPECTION, AST_MATCHING, REST_ASSEMBLY]
+
+_PHASE_LABELS = {
+    SOURCE_LOOKUP: 'source lookup',
+    DECORATOR_INSPECTION: 'decorator inspection',
+    AST_MATCHING: 'AST pattern matching',
+    REST_ASSEMBLY: 'reST assembly'
+}
+
+
+class _ObjectTiming:
+    """Represent the time spent on the docstring events of a single documented object."""
+
+    def __init__(self, what: str) -> None:
+        """Initialize with zero time."""
+        self.what = what
+        self.seconds = 0.0
+        self.events = 0
+
+
+class Checkpoint:
+    """Represent the state of a profiler at a point in time."""
+
+    def __init__(self, phase_seconds: Mapping[str, float], phase_calls: Mapping[str, int],
+                 cache_counters: Mapping[str, Tuple[int, int]]) -> None:
+        """Initialize with the given values."""
+        self.phase_seconds = dict(phase_seconds)
+        self.phase_calls = dict(phase_calls)
+        self.cache_counters = dict(cache_counters)
+
+
+class DocumentProfile:
+    """
+    Represent the measurements of the docstring events of a single document.
+
+    The document profiles are stored in the build environment so that the measurements of the documents read in
+    the parallel processes can be merged into the profiler of the main process.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with zero measurements."""
+        self.phase_seconds = collections.OrderedDict((phase, 0.0) for phase in PHASES)  # type: Dict[str, float]
+        self.phase_calls = collections.OrderedDict((phase, 0) for phase in PHASES)  # type: Dict[str, int]
+        self.objects = dict()  # type: Dict[str, _ObjectTiming]
+
+        # Map name of the cache -> [hits, misses]
+        self.cache_counters = dict()  # type: Dict[str, List[int]]
+
+    def add_event(self, what: str, name: str, seconds: float, since: Checkpoint, until: Checkpoint) -> None:
+        """
+        Add the measurements of a docstring event.
+
+        :param what: what has been documented (*e.g.*, ``function``)
+        :param name: name of the documented object
+        :param seconds: time spent on the docstring event
+        :param since: state of the profiler before the event
+        :param until: state of the profiler after the event
+        """
+        for phase in PHASES:
+            self.phase_seconds[phase] += until.phase_seconds[phase] - since.phase_seconds[phase]
+            self.phase_calls[phase] += until.phase_calls[phase] - since.phase_calls[phase]
+
+        timing = self.objects.get(name, None)
+        if timing is None:
+            timing = _ObjectTiming(what=what)
+            self.objects[name] = timing
+
+        timing.seconds += seconds
+        timing.events += 1
+
+        for cache_name, (hits, misses) in until.cache_counters.items():
+            since_hits, since_misses = since.cache_counters.get(cache_name, (0, 0))
+
+            counters = self.cache_counters.setdefault(cache_name, [0, 0])
+            counters[0] += hits - since_hits
+            counters[1] += misses - since_misses
+
+
+class Profiler:
+    """
+    Record the time spent in the phases of the rendering and on the individual documented objects.
+
+    The phases nest (*e.g.*, the source lookup happens during a decorator inspection). The time of a phase
+    is exclusive, *i.e.*, it does not include the time of the phases nested in it, so that the times of all
+    the phases sum up to the total time.
+
+    The phases are nested per thread if the contracts are rendered from multiple threads.
+    """
+
+    def __init__(self, cache_counters: Mapping[str, Tuple[int, int]]) -> None:
+        """
+        Initialize the profiler at the start of a build.
+
+        :param cache_counters:
+            hits and misses of the caches at the start of the build so that only this build is reported
+        """
+        self.phase_seconds = collections.OrderedDict((phase, 0.0) for phase in PHASES)  # type: Dict[str, float]
+        self.phase_calls = collections.OrderedDict((phase, 0) for phase in PHASES)  # type: Dict[str, int]
+
+        # Map name of the object -> time spent on it
+        self.objects = dict()  # type: Dict[str, _ObjectTiming]
+
+        self._initial_cache_counters = dict(cache_counters)
+
+        # Map name of the cache -> [hits, misses] merged from the document profiles of the other processes
+        self._merged_cache_counters = dict()  # type: Dict[str, List[int]]
+
+        # Stack of the active phases of the thread as [phase, start, time of the nested phases]
+        self._local = threading.local()
+
+        # Lock of the measurements shared among the threads
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[List[Any]]:
+        """Retrieve the stack of the active phases of the current thread."""
+        stack = getattr(self._local, 'stack', None)  # type: Optional[List[List[Any]]]
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+
+        return stack
+
+    def enter(self, phase: str) -> None:
+        """Start measuring the phase."""
+        self._stack().append([phase, time.perf_counter(), 0.0])
+
+    def exit(self) -> float:
+        """
+        Stop measuring the last entered phase.
+
+        :return: time spent in the phase including the nested phases
+        """
+        end = time.perf_counter()
+        stack = self._stack()
+        phase, start, nested = stack.pop()
+
+        elapsed = end - start
+        with self._lock:
+            self.phase_seconds[phase] += elapsed - nested
+            self.phase_calls[phase] += 1
+
+        if stack:
+            stack[-1][2] += elapsed
+
+        return elapsed
+
+    def record_object(self, what: str, name: str, seconds: float) -> None:
+        """Add the time of a docstring event to the total of the object."""
+        with self._lock:
+            timing = self.objects.get(name, None)
+            if timing is None:
+                timing = _ObjectTiming(what=what)
+                self.objects[name] = timing
+
+            timing.seconds += seconds
+            timing.events += 1
+
+    def checkpoint(self, cache_counters: Mapping[str, Tuple[int, int]]) -> Checkpoint:
+        """Capture the current state of the profiler together with the current counters of the caches."""
+        with self._lock:
+            return Checkpoint(
+                phase_seconds=self.phase_seconds, phase_calls=self.phase_calls, cache_counters=cache_counters)
+
+    def merge(self, document_profile: DocumentProfile) -> None:
+        """Add the measurements of a document read in another process."""
+        for phase in PHASES:
+            self.phase_seconds[phase] += document_profile.phase_seconds[phase]
+            self.phase_calls[phase] += document_profile.phase_calls[phase]
+
+        for name, other_timing in document_profile.objects.items():
+            timing = self.objects.get(name, None)
+            if timing is None:
+                timing = _ObjectTiming(what=other_timing.what)
+                self.objects[name] = timing
+
+            timing.seconds += other_timing.seconds
+            timing.events += other_timing.events
+
+        for cache_name, (hits, misses) in document_profile.cache_counters.items():
+            counters = self._merged_cache_counters.setdefault(cache_name, [0, 0])
+            counters[0] += hits
+            counters[1] += misses
+
+    def to_jsonable(self, cache_counters: Mapping[str, Tuple[int, int]]) -> MutableMapping[str, Any]:
+        """
+        Represent the measurements as a JSON-able object.
+
+        :param cache_counters: hits and misses of the caches at the end of the build
+        :return: JSON-able representation with the objects sorted from the slowest
+        """
+        caches = collections.OrderedDict()  # type: MutableMapping[str, Any]
+        for name in sorted(set(cache_counters.keys()).union(self._merged_cache_counters.keys())):
+            hits, misses = cache_counters.get(name, (0, 0))
+            initial_hits, initial_misses = self._initial_cache_counters.get(name, (0, 0))
+            merged_hits, merged_misses = self._merged_cache_counters.get(name, [0, 0])
+
+            hits += merged_hits - initial_hits
+            misses += merged_misses - initial_misses
+
+            caches[name] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': hits / (hits + misses) if hits + misses > 0 else None
+            }
+
+        phases = collections.OrderedDict()  # type: MutableMapping[str, Any]
+        for phase in PHASES:
+            phases[phase] = {'seconds': self.phase_seconds[phase], 'calls': self.phase_calls[phase]}
+
+        objects = [{
+            'name': name,
+            'what': timing.what,
+            'seconds': timing.seconds,
+            'events': timing.events
+        } for name, timing in sorted(self.objects.items(), key=lambda item: item[1].seconds, reverse=True)]
+
+        return {
+            'total_seconds': sum(self.phase_seconds.values()),
+            'phases': phases,
+            'objects': objects,
+            'caches': caches
+        }
+
+
+def format_summary(jsonable: Mapping[str, Any], top: int) -> str:
+    """
+    Format the measurements as a human-readable table.
+
+    :param jsonable: measurements as obtained from :meth:`Profiler.to_jsonable`
+    :param top: number of the slowest objects to list
+    :return: text of the table
+    """
+    lines = [
+        'sphinx-icontract profile: {} object(s), {:.3f} s in total'.format(
+            len(jsonable['objects']), jsonable['total_seconds'])
+    ]
+
+    lines.append('')
+    lines.append('{:<24} {:>10} {:>10}'.format('Phase', 'Calls', 'Seconds'))
+    for phase, measurement in jsonable['phases'].items():
+        lines.append('{:<24} {:>10} {:>10.3f}'.format(_PHASE_LABELS[phase], measurement['calls'],
+                                                      measurement['seconds']))
+
+    if jsonable['objects'] and top > 0:
+        lines.append('')
+        lines.append('{:<58} {:>10} {:>10}'.format('Slowest objects', 'Events', 'Seconds'))
+        for obj in jsonable['objects'][:top]:
+            lines.append('{:<58} {:>10} {:>10.3f}'.format(obj['name'], obj['events'], obj['seconds']))
+
+    if jsonable['caches']:
+        lines.append('')
+        lines.append('{:<24} {:>10} {:>10} {:>10}'.format('Cache', 'Hits', 'Misses', 'Hit ratio'))
+        for name, cache in jsonable['caches'].items():
+            hit_ratio = '-' if cache['hit_ratio'] is None else '{:.1%}'.format(cache['hit_ratio'])
+            lines.append('{:<24} {:>10} {:>10} {:>10}'.format(name, cache['hits'], cache['misses'], hit_ratio))
+
+    return '\n'.join(lines)
+
+
+CallableT = TypeVar('CallableT', bound=Callable[..., Any])
+
+# Profiler of the current build; set up when the builder is initialized if the profiling is enabled
+PROFILER = None  # type: Optional[Profiler]
+
+
+def profiled(phase: str) -> Callable[[CallableT], CallableT]:
+    """Measure the time spent in the decorated function as the given phase if the profiling is enabled."""
+
+    def decorator(func: CallableT) -> CallableT:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):  # type: ignore
+            profiler = PROFILER
+            if profiler is None:
+                return func(*args, **kwargs)
+
+            profiler.enter(phase)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.exit()
+
+        return cast(CallableT, wrapper)
+
+    return decorator
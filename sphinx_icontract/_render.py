@@ -0,0 +1,515 @@
+"""Render the contracts as reST through their intermediate representation."""
+import ast
+import inspect
+import typing
+from typing import Any, Callable, Optional, Tuple
+
+import sphinx_icontract._index
+import sphinx_icontract._ir
+import sphinx_icontract._lines
+import sphinx_icontract._patterns
+import sphinx_icontract._profiling
+import sphinx_icontract._render_cache
+import sphinx_icontract._renderings
+import sphinx_icontract._statistics
+
+if typing.TYPE_CHECKING:
+    import asttokens
+    import icontract
+    import icontract._represent
+
+# Use protected methods from icontract and tightly couple with it (see the note in :mod:`sphinx_icontract`).
+# pylint: disable=protected-access
+
+# Rendered lines of the contracts together with the rendering paths of their conditions (see :func:`_rendering_path`)
+CONTRACT_CACHE = sphinx_icontract._render_cache.RenderCache(
+    maxsize=sphinx_icontract._render_cache.CACHE_MAXSIZE
+)  # type: sphinx_icontract._render_cache.RenderCache[Tuple[sphinx_icontract._lines.Lines, str]]
+
+# Rendered lines of the snapshot capture functions
+CAPTURE_CACHE = sphinx_icontract._render_cache.RenderCache(
+    maxsize=sphinx_icontract._render_cache.CACHE_MAXSIZE
+)  # type: sphinx_icontract._render_cache.RenderCache[sphinx_icontract._lines.Lines]
+
+# Inferred error types and messages of the error lambdas; the errors are often shared among many contracts
+ERROR_CACHE = sphinx_icontract._render_cache.RenderCache(
+    maxsize=sphinx_icontract._render_cache.CACHE_MAXSIZE
+)  # type: sphinx_icontract._render_cache.RenderCache[Tuple[Optional[str], Optional[str]]]
+
+# Inferred error types and messages of the error lambdas per their code objects so that the error lambdas created
+# by the same decorator (*e.g.*, in a class factory) are inferred only once
+ERROR_CODE_CACHE = sphinx_icontract._render_cache.RenderCache(
+    maxsize=sphinx_icontract._render_cache.CACHE_MAXSIZE
+)  # type: sphinx_icontract._render_cache.RenderCache[Tuple[Optional[str], Optional[str]]]
+
+
+def _extract_condition(
+        lambda_inspection: "icontract._represent.ConditionLambdaInspection") -> sphinx_icontract._ir.ConditionIR:
+    """Extract the condition lambda function into the intermediate representation."""
+    lambda_ast_node = lambda_inspection.node
+    assert isinstance(lambda_ast_node, ast.Lambda)
+
+    body_node = lambda_ast_node.body
+
+    if '\n' in lambda_inspection.text:
+        dedented_body_lines = sphinx_icontract._lines.smart_dedent_multi_line_lambda_condition(
+            lambda_inspection.text.splitlines())
+        return sphinx_icontract._ir.ConditionIR(lines=tuple(dedented_body_lines))
+
+    atok = lambda_inspection.atok
+    text = sphinx_icontract._patterns.node_text(atok=atok, node=body_node)
+
+    # Match single-line implications and the conditions matched by the registered patterns
+    patterns = sphinx_icontract._patterns.PATTERNS.get(type(body_node), None)
+    if patterns is not None:
+        for pattern in patterns:
+            if isinstance(pattern, sphinx_icontract._patterns.Implication):
+                implication = pattern.match(atok, body_node)
+                if implication is not None:
+                    return sphinx_icontract._ir.ConditionIR(lines=(text, ), implication=implication)
+            else:
+                rest = pattern(atok, body_node)
+                if rest is not None:
+                    return sphinx_icontract._ir.ConditionIR(lines=(text, ), rest=rest)
+
+    return sphinx_icontract._ir.ConditionIR(lines=(text, ))
+
+
+def write_condition(condition: sphinx_icontract._ir.ConditionIR) -> sphinx_icontract._lines.Lines:
+    """Write the condition as reST lines."""
+    if condition.function is not None:
+        return sphinx_icontract._lines.Lines([':py:func:`{}`'.format(condition.function)])
+
+    if condition.rest is not None:
+        return sphinx_icontract._lines.Lines([condition.rest])
+
+    if condition.implication is not None:
+        return sphinx_icontract._lines.Lines(
+            [sphinx_icontract._patterns.write_implication(implication=condition.implication)])
+
+    assert condition.lines is not None, "Expected the lines of the condition if it is not a function"
+
+    if len(condition.lines) == 1:
+        return sphinx_icontract._lines.Lines([':code:`{}`'.format(condition.lines[0])])
+
+    result = ['.. code-block:: python', '']
+
+    for line in condition.lines:
+        result.append('  {}'.format(line))
+
+    result.append('')
+
+    return sphinx_icontract._lines.Lines(result)
+
+
+def condition_as_text(
+        lambda_inspection: "icontract._represent.ConditionLambdaInspection") -> sphinx_icontract._lines.Lines:
+    """Format condition lambda function as reST lines."""
+    return write_condition(condition=_extract_condition(lambda_inspection=lambda_inspection))
+
+
+def _error_type_and_message(
+        decorator_inspection: "icontract._represent.DecoratorInspection") -> Tuple[Optional[str], Optional[str]]:
+    """
+    Inspect the error argument of a contract and infer the error type and the message if the error is given as a lambda.
+
+    If the error argument is not given or if it is not given as a lambda function, return immediately.
+
+    The error message is inferred as the single string-literal argument to a single call in the lambda body.
+
+    :param decorator_inspection: inspection of a contract decorator
+    :return: error type (None if not inferrable), error message (None if not inferrable)
+    """
+    call_node = decorator_inspection.node
+
+    error_arg_node = None  # type: Optional[ast.AST]
+    for keyword in call_node.keywords:
+        if keyword.arg == 'error':
+            error_arg_node = keyword.value
+
+    if error_arg_node is None and len(call_node.args) == 5:
+        error_arg_node = call_node.args[4]
+
+    if not isinstance(error_arg_node, ast.Lambda):
+        return None, None
+
+    return error_node_type_and_message(atok=decorator_inspection.atok, node=error_arg_node)
+
+
+def error_node_type_and_message(atok: "asttokens.ASTTokens", node: ast.Lambda) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Infer the error type and the message from the node of the error lambda.
+
+    :param atok: parsing of the source code containing the node obtained with ``asttokens``
+    :param node: node of the error lambda
+    :return: error type (None if not inferrable), error message (None if not inferrable)
+    """
+    body_node = node.body
+
+    # The body of the error lambda needs to be a callable, since it needs to return an instance of Exception
+    if not isinstance(body_node, ast.Call):
+        return None, None
+
+    error_type = atok.get_text(node=body_node.func)
+
+    error_message = None  # type: Optional[str]
+    if len(body_node.args) == 1 and len(body_node.keywords) == 0:
+        if isinstance(body_node.args[0], ast.Str):
+            error_message = body_node.args[0].s
+
+    elif len(body_node.args) == 0 and len(body_node.keywords) == 1:
+        if isinstance(body_node.keywords[0].value, ast.Str):
+            error_message = body_node.keywords[0].value.s
+
+    else:
+        # The error message could not be inferred.
+        pass
+
+    return error_type, error_message
+
+
+def _rendering_path(condition: sphinx_icontract._ir.ConditionIR) -> str:
+    """Determine the path through which the condition is rendered (*e.g.*, as an implication)."""
+    if condition.function is not None:
+        return sphinx_icontract._statistics.FUNCTION
+
+    if condition.rest is not None:
+        return sphinx_icontract._statistics.PATTERN
+
+    if condition.implication is not None:
+        return sphinx_icontract._statistics.IMPLICATION
+
+    if condition.lines is not None and len(condition.lines) > 1:
+        return sphinx_icontract._statistics.MULTI_LINE
+
+    return sphinx_icontract._statistics.PLAIN
+
+
+def render_contract(contract: "icontract._Contract", kind: str) -> Tuple[sphinx_icontract._lines.Lines, str]:
+    """
+    Render the contract as reST and determine the rendering path of its condition.
+
+    The inherited contracts are shared among the classes and the overriding functions so that
+    each contract is rendered only once and looked up afterwards.
+
+    :param contract: contract to be rendered
+    :param kind: ``precondition``, ``postcondition`` or ``invariant``
+    :return: reST lines, rendering path
+    """
+    result = CONTRACT_CACHE.get(contract)
+    if result is None:
+        contract_ir = extract_contract(contract=contract, kind=kind)
+        result = (write_contract(contract=contract_ir), _rendering_path(condition=contract_ir.condition))
+        CONTRACT_CACHE.put(contract, result)
+
+    return result
+
+
+def format_contract(contract: "icontract._Contract", kind: str) -> sphinx_icontract._lines.Lines:
+    """
+    Format the contract as reST.
+
+    :param contract: contract to be formatted
+    :param kind: ``precondition``, ``postcondition`` or ``invariant``
+    :return: reST lines
+    """
+    return render_contract(contract=contract, kind=kind)[0]
+
+
+def _extract_condition_lambda(condition: Callable[..., Any]) -> sphinx_icontract._ir.ConditionIR:
+    """Extract the condition given as a lambda function into the intermediate representation."""
+    # We need to extract the source code corresponding to the decorator since inspect.getsource() is broken with
+    # lambdas.
+    return extract_condition_in_decorator(
+        decorator_inspection=sphinx_icontract._index.inspect_decorator(func=condition))
+
+
+@sphinx_icontract._profiling.profiled(phase=sphinx_icontract._profiling.AST_MATCHING)
+def extract_condition_in_decorator(
+        decorator_inspection: "icontract._represent.DecoratorInspection") -> sphinx_icontract._ir.ConditionIR:
+    """Extract the condition lambda given as an argument to the inspected decorator."""
+    import icontract._represent  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    lambda_inspection = icontract._represent.find_lambda_condition(decorator_inspection=decorator_inspection)
+    assert lambda_inspection is not None, \
+        "Expected non-None lambda inspection with the condition in the decorator: {}".format(
+            decorator_inspection.atok.get_text(decorator_inspection.node))
+
+    return _extract_condition(lambda_inspection=lambda_inspection)
+
+
+def _error_lambda_type_and_message(error: Callable[..., Any]) -> Tuple[Optional[str], Optional[str]]:
+    """Infer the error type and the message of the error given as a lambda function."""
+    lineno = error.__code__.co_firstlineno - 1
+
+    index = sphinx_icontract._index.source_index(func=error)
+    if index.atok is None and index.source is not None:
+        # The source file has not been parsed as a whole since it exceeds the memory budget. We parse only
+        # the statement around the error lambda as the lambda is not necessarily given in a decorator.
+        window = sphinx_icontract._index.index_window(source=index.source, lineno=lineno, filename=index.filename)
+        if window is None:
+            return None, None
+
+        first, index = window
+        lineno -= first
+
+        decorator_inspection = index.inspect_decorator(lineno=lineno)
+        if decorator_inspection is not None:
+            return error_in_decorator_type_and_message(decorator_inspection=decorator_inspection)
+
+        return _error_outside_decorator_type_and_message(index=index, lineno=lineno)
+
+    if index.atok is not None and index.decorator(lineno=lineno) is None:
+        # The error lambda is not given directly in a decorator (*e.g.*, it is defined on the module level and
+        # shared among many contracts).
+        return _error_outside_decorator_type_and_message(index=index, lineno=lineno)
+
+    return error_in_decorator_type_and_message(
+        decorator_inspection=sphinx_icontract._index.inspect_decorator(func=error))
+
+
+@sphinx_icontract._profiling.profiled(phase=sphinx_icontract._profiling.AST_MATCHING)
+def _error_outside_decorator_type_and_message(index: sphinx_icontract._index.SourceIndex,
+                                              lineno: int) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Infer the error type and the message of the error lambda defined outside of a decorator.
+
+    :param index: index of the source file in which the error lambda has been defined
+    :param lineno: line index (starting with 0) of the error lambda
+    :return: error type (None if not inferrable), error message (None if not inferrable)
+    """
+    assert index.atok is not None, "Expected the source file to be parsed"
+
+    nodes = index.lambdas(lineno=lineno)
+    if len(nodes) != 1:
+        # We can not tell which lambda is the error.
+        return None, None
+
+    return error_node_type_and_message(atok=index.atok, node=nodes[0])
+
+
+@sphinx_icontract._profiling.profiled(phase=sphinx_icontract._profiling.AST_MATCHING)
+def error_in_decorator_type_and_message(
+        decorator_inspection: "icontract._represent.DecoratorInspection") -> Tuple[Optional[str], Optional[str]]:
+    """Infer the error type and the message of the error lambda given as an argument to the inspected decorator."""
+    return _error_type_and_message(decorator_inspection=decorator_inspection)
+
+
+def _infer_error_lambda(error: Callable[..., Any],
+                        condition_inspection: Optional["icontract._represent.DecoratorInspection"]
+                        ) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Infer the error type and the message of the error lambda, reusing the inference if the error has been seen.
+
+    :param error: error lambda of a contract
+    :param condition_inspection:
+        inspection of the decorator of the condition if the condition has just been inspected;
+        if the error is given in the same decorator call, the decorator is not inspected again.
+    :return: error type (None if not inferrable), error message (None if not inferrable)
+    """
+    result = ERROR_CACHE.get(error)
+    if result is not None:
+        return result
+
+    code = error.__code__
+
+    result = ERROR_CODE_CACHE.get(code)
+    if result is None:
+        if condition_inspection is not None:
+            index = sphinx_icontract._index.SOURCE_INDEXES.get(code.co_filename, None)
+            if index is not None and index.decorator(lineno=code.co_firstlineno - 1) is condition_inspection.node:
+                # The error lambda is given in the decorator call which has just been inspected for the condition.
+                def render(_: Callable[..., Any]) -> Tuple[Optional[str], Optional[str]]:
+                    """Infer the error from the inspection of the condition."""
+                    assert condition_inspection is not None
+                    return error_in_decorator_type_and_message(decorator_inspection=condition_inspection)
+
+                result = sphinx_icontract._renderings.persisted(func=error, kind='error', render=render)
+
+        if result is None:
+            result = sphinx_icontract._renderings.persisted(
+                func=error, kind='error', render=_error_lambda_type_and_message)
+
+        assert result is not None
+        ERROR_CODE_CACHE.put(code, result)
+
+    ERROR_CACHE.put(error, result)
+    return result
+
+
+def extract_contract(contract: "icontract._Contract", kind: str) -> sphinx_icontract._ir.ContractIR:
+    """Extract the contract into the intermediate representation without consulting the cache."""
+    import icontract._represent  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    ##
+    # Parse condition
+    ##
+
+    # Inspection of the decorator of the condition, if the condition needed to be inspected, so that
+    # the error lambda given in the same decorator does not need to be inspected again
+    condition_inspection = None  # type: Optional[icontract._represent.DecoratorInspection]
+
+    def extract_condition_lambda(condition: Callable[..., Any]) -> sphinx_icontract._ir.ConditionIR:
+        """Inspect the decorator of the condition lambda and extract the condition."""
+        nonlocal condition_inspection
+        condition_inspection = sphinx_icontract._index.inspect_decorator(func=condition)
+        return extract_condition_in_decorator(decorator_inspection=condition_inspection)
+
+    if not icontract._represent.is_lambda(a_function=contract.condition):
+        condition = sphinx_icontract._ir.ConditionIR(function=contract.condition.__name__)
+    else:
+        condition = sphinx_icontract._renderings.persisted(
+            func=contract.condition, kind='condition', render=extract_condition_lambda)
+
+    ##
+    # Parse error
+    ##
+
+    error_type = None  # type: Optional[str]
+
+    # Error message is set only for an error of a contract given as a lambda that takes no arguments and returns
+    # a result of a call on a string literal (*e.g.*, ``error=ValueError("some message")``.
+    error_msg = None  # type: Optional[str]
+
+    if contract.error is not None:
+        if isinstance(contract.error, type):
+            error_type = contract.error.__qualname__
+        elif callable(contract.error) and icontract._represent.is_lambda(a_function=contract.error):
+            error_type, error_msg = _infer_error_lambda(error=contract.error, condition_inspection=condition_inspection)
+        else:
+            # Error type could not be inferred
+            pass
+
+    return sphinx_icontract._ir.ContractIR(
+        kind=kind,
+        condition=condition,
+        error_type=error_type,
+        error_message=error_msg,
+        description=contract.description if contract.description else None)
+
+
+def write_contract(contract: sphinx_icontract._ir.ContractIR) -> sphinx_icontract._lines.Lines:
+    """Write the contract as reST lines."""
+    condition_lines = write_condition(condition=contract.condition)
+
+    description = None  # type: Optional[str]
+    if contract.description:
+        description = contract.description
+    elif contract.error_message is not None:
+        description = contract.error_message
+    else:
+        # Description could not be inferred.
+        pass
+
+    error_type = contract.error_type
+
+    doc = None  # type: Optional[str]
+    if description and error_type:
+        if description.strip()[-1] in [".", "!", "?"]:
+            doc = "{} Raise :py:class:`{}`".format(description, error_type)
+        elif description.strip()[-1] in [",", ";"]:
+            doc = "{} raise :py:class:`{}`".format(description, error_type)
+        else:
+            doc = "{}; raise :py:class:`{}`".format(description, error_type)
+
+    elif not description and error_type:
+        doc = "Raise :py:class:`{}`".format(error_type)
+
+    elif description and not error_type:
+        doc = description
+
+    else:
+        # No extra documentation can be generated since the error type could not be inferred and
+        # no contract description was given.
+        doc = None
+
+    if doc is not None:
+        result = condition_lines + sphinx_icontract._lines.Lines(["", "({})".format(doc)])
+    else:
+        result = condition_lines
+
+    return result
+
+
+def _capture_as_text(capture: Callable[..., Any]) -> sphinx_icontract._lines.Lines:
+    """Convert the capture function into its text representation, reusing the text if already converted."""
+    result = CAPTURE_CACHE.get(capture)
+    if result is None:
+        result = _render_capture(capture=capture)
+        CAPTURE_CACHE.put(capture, result)
+
+    return result
+
+
+def _render_capture(capture: Callable[..., Any]) -> sphinx_icontract._lines.Lines:
+    """Convert the capture function into its text representation by parsing the source code of the decorator."""
+    import icontract._represent  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    if not icontract._represent.is_lambda(a_function=capture):
+        signature = inspect.signature(capture)
+        param_names = list(signature.parameters.keys())
+
+        return sphinx_icontract._lines.Lines(["{}({})".format(capture.__qualname__, ", ".join(param_names))])
+
+    return sphinx_icontract._lines.Lines(
+        sphinx_icontract._renderings.persisted(func=capture, kind='capture', render=_capture_lambda_as_text))
+
+
+def _capture_lambda_as_text(capture: Callable[..., Any]) -> sphinx_icontract._lines.Lines:
+    """Convert the capture given as a lambda function into its text representation."""
+    return capture_in_decorator_as_text(decorator_inspection=sphinx_icontract._index.inspect_decorator(func=capture))
+
+
+@sphinx_icontract._profiling.profiled(phase=sphinx_icontract._profiling.AST_MATCHING)
+def capture_in_decorator_as_text(
+        decorator_inspection: "icontract._represent.DecoratorInspection") -> sphinx_icontract._lines.Lines:
+    """Convert the capture lambda given as an argument to the inspected snapshot decorator into its text."""
+    call_node = decorator_inspection.node
+
+    capture_node = None  # type: Optional[ast.Lambda]
+
+    if len(call_node.args) > 0:
+        assert isinstance(call_node.args[0], ast.Lambda), \
+            ("Expected the first argument to the snapshot decorator to be a condition as lambda AST node, "
+             "but got: {}").format(type(call_node.args[0]))
+
+        capture_node = call_node.args[0]
+
+    elif len(call_node.keywords) > 0:
+        for keyword in call_node.keywords:
+            if keyword.arg == "capture":
+                assert isinstance(keyword.value, ast.Lambda), \
+                    "Expected lambda node as value of the 'capture' argument to the decorator."
+
+                capture_node = keyword.value
+                break
+
+        assert capture_node is not None, "Expected to find a keyword AST node with 'capture' arg, but found none"
+    else:
+        raise AssertionError(
+            "Expected a call AST node of a snapshot decorator to have either args or keywords, but got: {}".format(
+                ast.dump(call_node)))
+
+    capture_text = decorator_inspection.atok.get_text(capture_node.body)
+
+    dedented_capture = sphinx_icontract._lines.smart_dedent_multi_line_lambda_condition(capture_text.splitlines())
+
+    return dedented_capture
+
+
+def extract_snapshot(snapshot: "icontract._Snapshot") -> sphinx_icontract._ir.SnapshotIR:
+    """Extract the snapshot into the intermediate representation."""
+    return sphinx_icontract._ir.SnapshotIR(
+        name=snapshot.name, capture=tuple(_capture_as_text(capture=snapshot.capture)))
+
+
+def write_snapshot(snapshot: sphinx_icontract._ir.SnapshotIR) -> sphinx_icontract._lines.Lines:
+    """Write the snapshot as a bullet point in reST."""
+    if len(snapshot.capture) == 1:
+        return sphinx_icontract._lines.Lines(
+            ["    * :code:`.{}` = :code:`{}`".format(snapshot.name, snapshot.capture[0])])
+
+    capture_point = sphinx_icontract._lines.Lines(
+        [':code:`.{}` ='.format(snapshot.name), '', '.. code-block: python', ''] + list(snapshot.capture) + [''])
+
+    return sphinx_icontract._lines.make_bullet(capture_point)
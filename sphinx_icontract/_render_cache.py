@@ -0,0 +1,100 @@
+"""Memoize the renderings per object in memory."""
+import collections
+import threading
+import weakref
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
+
+ValueT = TypeVar('ValueT')
+
+
+class RenderCache(Generic[ValueT]):
+    """
+    Memoize the renderings per object (*e.g.*, the lines of a contract or of a capture function).
+
+    The objects are referenced only weakly so that the cache does not keep them alive. The cache is bounded and
+    the least recently used entries are evicted first.
+
+    The cache can be shared among the threads. Its operations take constant time so a single lock suffices, while
+    the expensive work per source file is serialized per file (see :func:`sphinx_icontract._index.source_index`).
+    If two threads render the same object at the same time, both renderings are equal and either of them is kept.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """Initialize an empty cache holding at most ``maxsize`` entries."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        # Map id of the object -> (weak reference to the object, rendering)
+        self._entries = collections.OrderedDict()  # type: collections.OrderedDict[int, Tuple[weakref.ref, ValueT]]
+
+        # Entries whose objects have been garbage-collected as (id of the object, weak reference). The garbage
+        # collector can run at any point (even while the lock is held), so the entries are removed only on
+        # the next access.
+        self._pending_removals = []  # type: List[Tuple[int, weakref.ref]]
+
+        self._lock = threading.Lock()
+
+    def _remove_pending(self) -> None:
+        """Remove the entries of the garbage-collected objects; the lock needs to be held."""
+        while self._pending_removals:
+            key, ref = self._pending_removals.pop()
+            entry = self._entries.get(key, None)
+            if entry is not None and entry[0] is ref:
+                del self._entries[key]
+
+    def get(self, obj: Any) -> Optional[ValueT]:
+        """Retrieve the rendering of the ``obj``, or None if it has not been cached."""
+        key = id(obj)
+
+        with self._lock:
+            self._remove_pending()
+
+            entry = self._entries.get(key, None)
+            if entry is None or entry[0]() is not obj:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, obj: Any, value: ValueT) -> None:
+        """Cache the rendering of the ``obj``; objects which can not be weakly referenced are ignored."""
+        key = id(obj)
+        pending_removals = self._pending_removals
+
+        def remove(ref: weakref.ref) -> None:
+            """Mark the entry for the removal once the object has been garbage-collected."""
+            pending_removals.append((key, ref))
+
+        try:
+            ref = weakref.ref(obj, remove)
+        except TypeError:
+            return
+
+        with self._lock:
+            self._remove_pending()
+
+            entries = self._entries
+            entries[key] = (ref, value)
+            entries.move_to_end(key)
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all the entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            del self._pending_removals[:]
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        with self._lock:
+            self._remove_pending()
+            return len(self._entries)
+
+
+CACHE_MAXSIZE = 8192
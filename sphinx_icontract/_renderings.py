@@ -0,0 +1,145 @@
+"""Keep the renderings of the lambda functions across the builds, in the pre-rendering and in the batches."""
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import sphinx_icontract_meta
+import sphinx_icontract._disk_cache
+import sphinx_icontract._ir
+import sphinx_icontract._lines
+
+# We rely on the private modules of sphinx-icontract.
+# pylint: disable=protected-access
+
+# Qualified names of the patterns and negations registered by the clients; they need to be part of the version
+# of the disk cache since they change the renderings.
+REGISTERED = []  # type: List[str]
+
+# Renderings persisted across the builds; created on the first access (see :func:`get_disk_cache`)
+DISK_CACHE = None  # type: Optional[sphinx_icontract._disk_cache.DiskCache]
+
+# Directory of the disk cache set when the builder is initialized, or None if the disk cache is disabled
+DISK_CACHE_DIRECTORY = None  # type: Optional[str]
+
+# Archive pre-warming the disk cache if it has been configured and built for the same version of the renderings.
+# Set when the builder is initialized.
+PREWARMED = None  # type: Optional[sphinx_icontract._disk_cache.Archive]
+
+# Lock so that the disk cache is created only once if the contracts are rendered from multiple threads
+_DISK_CACHE_LOCK = threading.Lock()
+
+
+def get_disk_cache() -> Optional[sphinx_icontract._disk_cache.DiskCache]:
+    """
+    Retrieve the disk cache, creating it on the first access if it is enabled.
+
+    The disk cache is created lazily since its version depends on the version of icontract, which we do not want
+    to import before the first contract is rendered.
+    """
+    # pylint: disable=global-statement
+    global DISK_CACHE
+
+    if DISK_CACHE is None and DISK_CACHE_DIRECTORY is not None:
+        with _DISK_CACHE_LOCK:
+            if DISK_CACHE is None and DISK_CACHE_DIRECTORY is not None:
+                DISK_CACHE = sphinx_icontract._disk_cache.DiskCache(
+                    directory=DISK_CACHE_DIRECTORY,
+                    version=version(),
+                    prewarmed=None if PREWARMED is None else PREWARMED.files)
+
+    return DISK_CACHE
+
+
+def register(name: str) -> None:
+    """
+    Record the registered pattern or negation and drop the renderings made without it.
+
+    :param name: qualified name of the registered function
+    """
+    # pylint: disable=global-statement
+    global REGISTERED
+    global DISK_CACHE
+    global PREWARMED
+
+    REGISTERED = REGISTERED + [name]
+
+    PRERENDERED.clear()
+
+    # The disk cache keeps the version it has been created with, so it needs to be re-created with the new version.
+    # The pre-warmed renderings have been made without the registered function as well.
+    with _DISK_CACHE_LOCK:
+        DISK_CACHE = None
+        PREWARMED = None
+
+
+def version() -> str:
+    """Determine the version of the persisted renderings (see :mod:`sphinx_icontract._disk_cache`)."""
+    import icontract  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    return '/'.join([sphinx_icontract_meta.__version__, icontract.__version__, _IR_VERSION] + REGISTERED)
+
+
+# Version of the intermediate representation of the renderings; it needs to be bumped whenever their format
+# changes so that the disk cache is invalidated.
+_IR_VERSION = '2'
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert the rendering of a lambda function to a JSON-able value (*e.g.*, for the disk cache)."""
+    if isinstance(value, sphinx_icontract._ir.ConditionIR):
+        return value.to_jsonable()
+
+    if isinstance(value, sphinx_icontract._lines.Lines):
+        return list(value)
+
+    return value
+
+
+# Map kind of the rendering -> function restoring the rendering from its JSON-able representation
+_FROM_JSONABLE = {
+    'condition': sphinx_icontract._ir.ConditionIR.from_jsonable,
+    'error': tuple,
+    'capture': sphinx_icontract._lines.Lines
+}  # type: Dict[str, Callable[[Any], Any]]
+
+# Map (code filename, first line of the lambda, kind of the rendering) -> rendering obtained in the pre-rendering
+PRERENDERED = dict()  # type: Dict[Tuple[str, int, str], Any]
+
+# Renderings of the batch rendered in the current thread (see :mod:`sphinx_icontract._batch`). They are kept per
+# thread so that the concurrent batches neither see nor discard each other's renderings.
+BATCH = threading.local()
+
+
+def persisted(func: Callable[..., Any], kind: str, render: Callable[[Callable[..., Any]], Any]) -> Any:
+    """
+    Render the lambda function, or retrieve the rendering from the disk cache if it has been already rendered.
+
+    :param func: lambda function to be rendered
+    :param kind: kind of the rendering (*e.g.*, ``condition``)
+    :param render: function rendering the lambda (see :func:`to_jsonable` for the supported renderings)
+    :return: rendering
+    """
+    code = func.__code__
+
+    batch = getattr(BATCH, 'renderings', None)  # type: Optional[Dict[Tuple[str, int, str], Any]]
+    if batch:
+        value = batch.get((code.co_filename, code.co_firstlineno, kind), None)
+        if value is not None:
+            return value
+
+    if PRERENDERED:
+        value = PRERENDERED.get((code.co_filename, code.co_firstlineno, kind), None)
+        if value is not None:
+            return value
+
+    disk_cache = get_disk_cache()
+    if disk_cache is None:
+        return render(func)
+
+    value = disk_cache.get(path=code.co_filename, lineno=code.co_firstlineno, kind=kind)
+    if value is not None:
+        return _FROM_JSONABLE[kind](value)
+
+    value = render(func)
+    disk_cache.put(path=code.co_filename, lineno=code.co_firstlineno, kind=kind, value=to_jsonable(value))
+
+    return value
@@ -0,0 +1,36 @@
+"""Apply the contracts of sphinx-icontract itself only in the slow mode."""
+import os
+from typing import Any, Callable, TypeVar, cast
+
+# The contracts of sphinx-icontract itself run on every docstring event. They are enabled only in the slow mode
+# (*e.g.*, in the tests) by setting the environment variable ``ICONTRACT_SLOW`` so that the documentation builds
+# do not pay for them. Since the decorators of icontract would import icontract at the start, we apply the
+# contracts through the following functions which import icontract only in the slow mode.
+
+# Equivalent to icontract.SLOW
+SLOW = __debug__ and os.environ.get("ICONTRACT_SLOW", "") != ""
+
+CallableT = TypeVar('CallableT', bound=Callable[..., Any])
+
+
+def _unchanged(func: CallableT) -> CallableT:
+    """Return the function as-is."""
+    return func
+
+
+def require(condition: Callable[..., Any]) -> Callable[[CallableT], CallableT]:
+    """Add the precondition to the function of sphinx-icontract in the slow mode."""
+    if not SLOW:
+        return _unchanged
+
+    import icontract  # pylint: disable=import-outside-toplevel,redefined-outer-name
+    return cast(Callable[[CallableT], CallableT], icontract.require(condition))
+
+
+def ensure(condition: Callable[..., Any]) -> Callable[[CallableT], CallableT]:
+    """Add the postcondition to the function of sphinx-icontract in the slow mode."""
+    if not SLOW:
+        return _unchanged
+
+    import icontract  # pylint: disable=import-outside-toplevel,redefined-outer-name
+    return cast(Callable[[CallableT], CallableT], icontract.ensure(condition))
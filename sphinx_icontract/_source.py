@@ -0,0 +1,159 @@
+"""Provide the source code of the documented modules from the memory-mapped source files."""
+import array
+import mmap
+import os
+import re
+import threading
+import tokenize
+from typing import List, Optional, Union
+
+_NEWLINE_RE = re.compile(b'\n')
+
+# Carriage return which does not start a Windows line ending; Python would split the lines there as well
+_LONE_CARRIAGE_RETURN_RE = re.compile(b'\r(?!\n)')
+
+
+class SourceFile:
+    r"""
+    Provide the lines of a source file.
+
+    The file is memory-mapped only once and the offsets of the lines are precomputed so that a range of lines
+    (*e.g.*, around a decorator) can be sliced without reading and splitting the whole file for every lookup.
+
+    The lines are given with the line endings normalized to ``\n`` as they would be given by :mod:`linecache`.
+
+    The memory map holds a file descriptor open and is released by :meth:`close`. If the lines are sliced afterwards
+    (*e.g.*, by another thread still holding the source file), the file is mapped only for the slicing as long as
+    its size did not change so that no file descriptor is held open.
+    """
+
+    def __init__(self, path: str, data: Union[mmap.mmap, bytes], encoding: str) -> None:
+        """
+        Initialize with the given values and compute the offsets of the lines.
+
+        :param path: path to the source file
+        :param data: content of the source file
+        :param encoding: encoding of the source file
+        """
+        self.path = path
+        self.encoding = encoding
+        self._data = data  # type: Optional[Union[mmap.mmap, bytes]]
+        self._size = len(data)
+
+        # Lock guarding the memory map so that it is not closed while the lines are sliced
+        self._lock = threading.Lock()
+
+        # Offsets of the line starts, stored compactly since huge generated modules have many lines
+        offsets = array.array('q', [0])
+        offsets.extend(mtch.end() for mtch in _NEWLINE_RE.finditer(data))
+
+        # There is no line after the last line ending.
+        if offsets[-1] == len(data):
+            offsets.pop()
+
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        """Return the number of the lines."""
+        return len(self._offsets)
+
+    def size(self) -> int:
+        """Return the size of the source file in bytes."""
+        return self._size
+
+    def memory(self) -> int:
+        """Estimate the memory of the line offsets in bytes; the content is memory-mapped and not counted."""
+        return len(self._offsets) * self._offsets.itemsize
+
+    def lines(self, start: int, end: int) -> List[str]:
+        """
+        Slice the lines.
+
+        :param start: index of the first line (starting with 0)
+        :param end: index of the line after the last line, exclusive
+        :return: lines including their line endings
+        """
+        start = max(0, start)
+        end = min(len(self._offsets), end)
+        if start >= end:
+            return []
+
+        end_offset = self._offsets[end] if end < len(self._offsets) else self._size
+
+        with self._lock:
+            if self._data is not None:
+                chunk = self._data[self._offsets[start]:end_offset]
+            else:
+                data = _map(path=self.path)
+                if data is None or len(data) != self._size:
+                    raise ValueError("The source file changed since it has been memory-mapped: {}".format(self.path))
+
+                try:
+                    chunk = data[self._offsets[start]:end_offset]
+                finally:
+                    if isinstance(data, mmap.mmap):
+                        data.close()
+
+        # The byte order mark, if any, is stripped by the decoding as the encoding is detected as "utf-8-sig".
+        text = chunk.decode(self.encoding)
+
+        # We split only by the line feeds as the file objects do (and not by, *e.g.*, the form feeds as
+        # str.splitlines does). Linecache terminates the last line even if the file does not end with a line ending.
+        parts = text.replace('\r\n', '\n').split('\n')
+        if parts[-1] == '':
+            parts.pop()
+
+        return [part + '\n' for part in parts]
+
+    def text(self) -> str:
+        """Decode the whole source file."""
+        return ''.join(self.lines(start=0, end=len(self._offsets)))
+
+    def close(self) -> None:
+        """Release the memory map of the source file."""
+        with self._lock:
+            if isinstance(self._data, mmap.mmap):
+                self._data.close()
+
+            self._data = None
+
+
+def _map(path: str) -> Optional[Union[mmap.mmap, bytes]]:
+    """Memory-map the file, or return None if it can not be opened."""
+    try:
+        with open(path, 'rb') as fid:
+            if os.fstat(fid.fileno()).st_size == 0:
+                # Empty files can not be memory-mapped.
+                return b''
+
+            return mmap.mmap(fid.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+
+def open_source(path: str) -> Optional[SourceFile]:
+    """
+    Memory-map the source file.
+
+    :param path: path to the source file (*e.g.*, the file name of a code object)
+    :return:
+        the source file, or None if the path does not refer to a regular file (*e.g.*, ``<string>``) or
+        the file can not be sliced by the line feeds
+    """
+    if not os.path.isfile(path):
+        return None
+
+    try:
+        with open(path, 'rb') as fid:
+            encoding, _ = tokenize.detect_encoding(fid.readline)
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+    data = _map(path=path)
+    if data is None:
+        return None
+
+    if _LONE_CARRIAGE_RETURN_RE.search(data):
+        return None
+
+    return SourceFile(path=path, data=data, encoding=encoding)
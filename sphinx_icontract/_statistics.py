@@ -0,0 +1,149 @@
+"""Count the contracts of the documented objects."""
+import collections
+import typing
+from typing import Any, Dict, Iterable, Mapping, MutableMapping, Optional, Tuple
+
+# Kinds of the contracts as rendered in the directives, in the order of the report
+REQUIRES = 'requires'
+REQUIRES_ELSE = 'requires else'
+OLD = 'OLD'
+ENSURES = 'ensures'
+ESTABLISHES = 'establishes'
+
+KINDS = [REQUIRES, REQUIRES_ELSE, OLD, ENSURES, ESTABLISHES]
+
+# Paths through which the conditions are rendered, in the order of the report
+PLAIN = 'plain'
+IMPLICATION = 'implication'
+MULTI_LINE = 'multi-line'
+PATTERN = 'pattern'
+FUNCTION = 'function'
+
+PATHS = [PLAIN, IMPLICATION, MULTI_LINE, PATTERN, FUNCTION]
+
+
+class ObjectStatistics:
+    """
+    Represent the counts of the contracts of a single documented object.
+
+    The statistics are stored in the build environment together with the rendered contracts of a document so that
+    the report covers all the documents, including those not re-read in an incremental build.
+    """
+
+    def __init__(self, what: str, module: Optional[str]) -> None:
+        """
+        Initialize with zero counts.
+
+        :param what: what has been documented (*e.g.*, ``function``)
+        :param module: name of the module in which the object has been defined, if known
+        """
+        self.what = what
+        self.module = module
+
+        # Map kind of the contract -> number of the contracts
+        self.kinds = collections.Counter()  # type: typing.Counter[str]
+
+        # Map rendering path -> number of the conditions
+        self.paths = collections.Counter()  # type: typing.Counter[str]
+
+    def contracts(self) -> int:
+        """Count all the contracts of the object."""
+        return sum(self.kinds.values())
+
+
+class _ModuleCounts:
+    """Represent the aggregated counts of a module."""
+
+    def __init__(self) -> None:
+        """Initialize with zero counts."""
+        self.objects = 0
+        self.with_contracts = 0
+        self.kinds = collections.Counter()  # type: typing.Counter[str]
+
+
+def to_jsonable(objects: Iterable[Tuple[str, ObjectStatistics]]) -> MutableMapping[str, Any]:
+    """
+    Aggregate the statistics of the documented objects as a JSON-able object.
+
+    :param objects:
+        names and statistics of the documented objects; if an object has been documented multiple times,
+        only its last statistics are counted
+    :return: JSON-able representation with the modules sorted by name
+    """
+    by_name = collections.OrderedDict()  # type: Dict[str, ObjectStatistics]
+    for name, statistics in objects:
+        by_name[name] = statistics
+
+    kinds = collections.Counter()  # type: typing.Counter[str]
+    paths = collections.Counter()  # type: typing.Counter[str]
+    modules = dict()  # type: Dict[str, _ModuleCounts]
+
+    with_contracts = 0
+    for statistics in by_name.values():
+        kinds.update(statistics.kinds)
+        paths.update(statistics.paths)
+
+        module_counts = modules.get(statistics.module or '', None)
+        if module_counts is None:
+            module_counts = _ModuleCounts()
+            modules[statistics.module or ''] = module_counts
+
+        module_counts.objects += 1
+        module_counts.kinds.update(statistics.kinds)
+
+        if statistics.contracts() > 0:
+            with_contracts += 1
+            module_counts.with_contracts += 1
+
+    modules_jsonable = collections.OrderedDict()  # type: MutableMapping[str, Any]
+    for module, module_counts in sorted(modules.items()):
+        modules_jsonable[module] = {
+            'objects': module_counts.objects,
+            'with_contracts': module_counts.with_contracts,
+            'coverage': module_counts.with_contracts / module_counts.objects,
+            'contracts': sum(module_counts.kinds.values()),
+            'kinds': collections.OrderedDict((kind, module_counts.kinds[kind]) for kind in KINDS)
+        }
+
+    return {
+        'objects': len(by_name),
+        'with_contracts': with_contracts,
+        'contracts': sum(kinds.values()),
+        'kinds': collections.OrderedDict((kind, kinds[kind]) for kind in KINDS),
+        'paths': collections.OrderedDict((path, paths[path]) for path in PATHS),
+        'modules': modules_jsonable
+    }
+
+
+def format_summary(jsonable: Mapping[str, Any]) -> str:
+    """
+    Format the statistics as a human-readable table.
+
+    :param jsonable: statistics as obtained from :func:`to_jsonable`
+    :return: text of the table
+    """
+    lines = [
+        'sphinx-icontract statistics: {} of {} documented object(s) with contracts, {} contract(s)'.format(
+            jsonable['with_contracts'], jsonable['objects'], jsonable['contracts'])
+    ]
+
+    lines.append('')
+    lines.append('{:<24} {:>10}'.format('Kind', 'Contracts'))
+    for kind, count in jsonable['kinds'].items():
+        lines.append('{:<24} {:>10}'.format(kind, count))
+
+    lines.append('')
+    lines.append('{:<24} {:>10}'.format('Rendering path', 'Conditions'))
+    for path, count in jsonable['paths'].items():
+        lines.append('{:<24} {:>10}'.format(path, count))
+
+    if jsonable['modules']:
+        lines.append('')
+        row = '{:<46} {:>10} {:>10} {:>10} {:>10}'
+        lines.append(row.format('Module', 'Objects', 'Contracted', 'Coverage', 'Contracts'))
+        for module, counts in jsonable['modules'].items():
+            coverage = '{:.1%}'.format(counts['coverage'])
+            lines.append(
+                row.format(module or '-', counts['objects'], counts['with_contracts'], coverage, counts['contracts']))
+
+    return '\n'.join(lines)
@@ -0,0 +1,57 @@
+"""Provide the helper shared among the tests which need the contracts defined in the source files."""
+import importlib
+import pathlib
+import sys
+import tempfile
+import textwrap
+import unittest
+from typing import Any, Optional
+
+
+def _unload(name: str) -> None:
+    """Remove the module, its top-level package and all their submodules from ``sys.modules``."""
+    top_level = name.split('.')[0]
+    for key in [key for key in sys.modules if key == top_level or key.startswith(top_level + '.')]:
+        del sys.modules[key]
+
+
+def import_source(test_case: unittest.TestCase, name: str, text: str, directory: Optional[pathlib.Path] = None) -> Any:
+    """
+    Write the source code of the module and import it anew for the duration of the test.
+
+    The missing packages of the fully qualified name are created with a docstring as their only content. The directory
+    stays in ``sys.path`` until the end of the test so that the submodules can be imported lazily. The module, its
+    top-level package and all their submodules are unloaded after the test.
+
+    :param test_case: test which the clean-ups are registered with
+    :param name: fully qualified name of the module
+    :param text: source code of the module, dedented before it is written
+    :param directory: where the module is written; if None, a temporary directory is removed after the test
+    :return: imported module
+    """
+    if directory is None:
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        test_case.addCleanup(tmp_dir.cleanup)
+        directory = pathlib.Path(tmp_dir.name)
+
+    parts = name.split('.')
+
+    package_dir = directory
+    for part in parts[:-1]:
+        package_dir = package_dir / part
+        package_dir.mkdir(exist_ok=True)
+
+        init_path = package_dir / '__init__.py'
+        if not init_path.exists():
+            init_path.write_text('"""Provide some contracts."""\n', encoding='utf-8')
+
+    path = package_dir / '{}.py'.format(parts[-1])
+    path.write_text(textwrap.dedent(text), encoding='utf-8')
+
+    _unload(name)
+
+    sys.path.insert(0, str(directory))
+    test_case.addCleanup(sys.path.remove, str(directory))
+    test_case.addCleanup(_unload, name)
+
+    return importlib.import_module(name)
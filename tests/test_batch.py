@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._batch."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+# pylint: disable=no-member
+# pylint: disable=unused-argument
+import asyncio
+import concurrent.futures
+import pathlib
+import sys
+import threading
+import unittest
+import unittest.mock
+from typing import List, Any
+
+import icontract
+
+import sphinx_icontract
+
+import tests.common
+
+
+class TestRenderModule(unittest.TestCase):
+    def setUp(self) -> None:
+        self.module = tests.common.import_source(
+            self,
+            name='rendered_module',
+            text='''\
+            import icontract
+
+
+            @icontract.require(lambda x: x > 0)
+            def some_func(x: int) -> None:
+                pass
+
+
+            def another_func(x: int) -> None:
+                pass
+
+
+            @icontract.invariant(lambda self: self.count > 0)
+            class SomeClass(icontract.DBC):
+                def __init__(self) -> None:
+                    self.count = 1
+
+                @icontract.ensure(lambda result: result > 0)
+                def some_method(self) -> int:
+                    return self.count
+
+                @staticmethod
+                @icontract.require(lambda y: y < 0, error=lambda: ValueError("y negative"))
+                def some_static(y: int) -> None:
+                    pass
+
+                @property
+                @icontract.ensure(lambda result: result >= 0)
+                def some_prop(self) -> int:
+                    return self.count
+            ''')
+
+        sphinx_icontract._render.CONTRACT_CACHE.clear()
+        sphinx_icontract._index.SOURCE_INDEXES.clear()
+
+    def test_render_module(self):
+        # The lambdas are rendered grouped by the source file and not inspected one by one.
+        with unittest.mock.patch.object(
+                sphinx_icontract._index, 'inspect_decorator', side_effect=AssertionError("Unexpected inspection")):
+            rendered = sphinx_icontract.render_module(module=self.module)
+
+        # yapf: disable
+        self.assertDictEqual(
+            {
+                'rendered_module.some_func': [':requires:', '    * :code:`x > 0`'],
+                'rendered_module.SomeClass': [':establishes:', '    * :code:`self.count > 0`'],
+                'rendered_module.SomeClass.some_method': [':ensures:', '    * :code:`result > 0`'],
+                'rendered_module.SomeClass.some_static': [
+                    ':requires:',
+                    '    * :code:`y < 0`',
+                    '',
+                    '      (y negative; raise :py:class:`ValueError`)'
+                ],
+                'rendered_module.SomeClass.some_prop': [':get ensures:', '    * :code:`result >= 0`']
+            },
+            {qualname: list(lines) for qualname, lines in rendered.items()})
+        # yapf: enable
+
+        self.assertEqual(1, len(sphinx_icontract._index.SOURCE_INDEXES))
+
+        # The renderings do not outlive the call.
+        self.assertDictEqual({}, sphinx_icontract._renderings.PRERENDERED)
+        self.assertIsNone(getattr(sphinx_icontract._renderings.BATCH, 'renderings', None))
+
+    def test_renderings_not_shared_between_threads(self):
+        seen_in_other_thread = []  # type: List[Any]
+
+        def format_contracts(what: str, obj: Any) -> sphinx_icontract.Lines:
+            # The renderings of the batch are neither published in the global map nor visible in other threads.
+            self.assertDictEqual({}, sphinx_icontract._renderings.PRERENDERED)
+
+            thread = threading.Thread(
+                target=
+                lambda: seen_in_other_thread.append(getattr(sphinx_icontract._renderings.BATCH, 'renderings', None)))
+            thread.start()
+            thread.join()
+
+            return original_format_contracts(what=what, obj=obj)
+
+        original_format_contracts = sphinx_icontract._format.format_contracts
+        with unittest.mock.patch.object(sphinx_icontract._format, 'format_contracts', side_effect=format_contracts):
+            rendered = sphinx_icontract.render_class(cls=self.module.SomeClass)
+
+        self.assertEqual(4, len(rendered))
+        self.assertGreater(len(seen_in_other_thread), 0)
+        self.assertTrue(all(renderings is None for renderings in seen_in_other_thread))
+
+    def test_render_class(self):
+        rendered = sphinx_icontract.render_class(cls=self.module.SomeClass)
+
+        self.assertListEqual([
+            'rendered_module.SomeClass', 'rendered_module.SomeClass.some_method',
+            'rendered_module.SomeClass.some_static', 'rendered_module.SomeClass.some_prop'
+        ], list(rendered.keys()))
+
+
+class TestRenderAsync(unittest.TestCase):
+    def setUp(self) -> None:
+        @icontract.require(lambda x: x > 0)
+        def some_func(x: int) -> None:
+            pass
+
+        @icontract.invariant(lambda self: self.x > 0)
+        class SomeClass(icontract.DBC):
+            def __init__(self) -> None:
+                self.x = 1
+
+            @property
+            @icontract.ensure(lambda result: result > 0)
+            def some_prop(self) -> int:
+                return self.x
+
+        self.some_func = some_func
+        self.some_class = SomeClass
+
+        sphinx_icontract._render.CONTRACT_CACHE.clear()
+        sphinx_icontract._index.SOURCE_INDEXES.clear()
+
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def test_same_as_format_contracts(self):
+        # yapf: disable
+        objects = [
+            ('function', self.some_func),
+            ('class', self.some_class),
+            ('attribute', self.some_class.some_prop),
+            ('method', self.some_class.__init__)
+        ]
+        # yapf: enable
+
+        for what, obj in objects:
+            got = self.loop.run_until_complete(sphinx_icontract.render_async(what=what, obj=obj))
+            self.assertListEqual(sphinx_icontract._format.format_contracts(what=what, obj=obj), list(got))
+
+        self.assertDictEqual({}, sphinx_icontract._batch.IN_FLIGHT[self.loop])
+
+    def test_concurrent_requests_coalesced(self):
+        format_contracts = sphinx_icontract._format.format_contracts
+        released = threading.Event()
+        rendered = []  # type: List[Any]
+
+        def blocking_format_contracts(what: str, obj: Any) -> sphinx_icontract.Lines:
+            released.wait()
+            rendered.append(obj)
+            return format_contracts(what=what, obj=obj)
+
+        async def request_all() -> List[sphinx_icontract.Lines]:
+            tasks = [
+                self.loop.create_task(sphinx_icontract.render_async(what='function', obj=self.some_func))
+                for _ in range(5)
+            ]
+            tasks.append(self.loop.create_task(sphinx_icontract.render_async(what='class', obj=self.some_class)))
+
+            # Let all the requests start before the renderings finish.
+            await asyncio.sleep(0)
+            released.set()
+
+            return await asyncio.gather(*tasks)
+
+        with unittest.mock.patch.object(sphinx_icontract._format, 'format_contracts', blocking_format_contracts):
+            results = self.loop.run_until_complete(request_all())
+
+        self.assertEqual(2, len(rendered))
+        for lines in results[:5]:
+            self.assertListEqual([':requires:', '    * :code:`x > 0`'], list(lines))
+        self.assertListEqual([':establishes:', '    * :code:`self.x > 0`'], list(results[5]))
+
+        self.assertDictEqual({}, sphinx_icontract._batch.IN_FLIGHT[self.loop])
+
+        # The finished renderings are not coalesced with the later requests.
+        self.loop.run_until_complete(sphinx_icontract.render_async(what='function', obj=self.some_func))
+        self.assertEqual(2, len(rendered))
+
+    def test_cancelled_request(self):
+        format_contracts = sphinx_icontract._format.format_contracts
+        released = threading.Event()
+
+        def blocking_format_contracts(what: str, obj: Any) -> sphinx_icontract.Lines:
+            released.wait()
+            return format_contracts(what=what, obj=obj)
+
+        async def cancel_one() -> sphinx_icontract.Lines:
+            cancelled = self.loop.create_task(sphinx_icontract.render_async(what='function', obj=self.some_func))
+            another = self.loop.create_task(sphinx_icontract.render_async(what='function', obj=self.some_func))
+            await asyncio.sleep(0)
+
+            cancelled.cancel()
+            released.set()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await cancelled
+
+            return await another
+
+        with unittest.mock.patch.object(sphinx_icontract._format, 'format_contracts', blocking_format_contracts):
+            lines = self.loop.run_until_complete(cancel_one())
+
+        self.assertListEqual([':requires:', '    * :code:`x > 0`'], list(lines))
+
+    def test_error(self):
+        with unittest.mock.patch.object(
+                sphinx_icontract._format, 'format_contracts', side_effect=ValueError("some error")):
+            with self.assertRaises(ValueError):
+                self.loop.run_until_complete(sphinx_icontract.render_async(what='function', obj=self.some_func))
+
+        self.assertDictEqual({}, sphinx_icontract._batch.IN_FLIGHT[self.loop])
+
+
+class TestThreadSafety(unittest.TestCase):
+    def setUp(self) -> None:
+        self.module = tests.common.import_source(
+            self,
+            name='threaded_module',
+            text='''\
+            from typing import List
+
+            import icontract
+
+
+            def is_positive(x: int) -> bool:
+                return x > 0
+
+
+            SHARED_ERROR = lambda: ValueError("shared")
+
+
+            @icontract.invariant(lambda self: self.x > 0)
+            class SomeBase(icontract.DBC):
+                def __init__(self) -> None:
+                    self.x = 1
+
+                @icontract.require(lambda x: not (x > 0) or x % 2 == 0, error=SHARED_ERROR)
+                @icontract.require(is_positive)
+                @icontract.snapshot(lambda lst: lst[:])
+                @icontract.ensure(lambda OLD, lst: OLD.lst == lst, error=lambda: ValueError("lst unchanged"))
+                def some_method(self, x: int, lst: List[int]) -> None:
+                    pass
+
+                @property
+                @icontract.ensure(lambda result: result > 0)
+                def some_prop(self) -> int:
+                    return self.x
+
+
+            @icontract.invariant(lambda self: self.x < 100, "x small")
+            class SomeClass(SomeBase):
+                @icontract.require(
+                    lambda x:
+                    x > -10 and
+                    x < 10
+                )
+                def some_method(self, x: int, lst: List[int]) -> None:
+                    pass
+
+                @staticmethod
+                @icontract.require(lambda y: y if y > 0 else True, error=SHARED_ERROR)
+                def some_static(y: int) -> None:
+                    pass
+            ''')
+
+    def test_concurrent_rendering(self):
+        members = list(sphinx_icontract._prerender.module_members(module=self.module))
+        classes = [self.module.SomeBase, self.module.SomeClass]
+
+        sphinx_icontract._reset_caches()
+        expected_members = [sphinx_icontract._format.format_contracts(what=what, obj=obj) for _, what, obj in members]
+        expected_classes = [{
+            qualname: list(lines)
+            for qualname, lines in sphinx_icontract.render_class(cls=cls).items()
+        } for cls in classes]
+
+        def render(i: int) -> None:
+            if i % 5 == 0:
+                j = i % len(classes)
+                rendered = {
+                    qualname: list(lines)
+                    for qualname, lines in sphinx_icontract.render_class(cls=classes[j]).items()
+                }
+                self.assertDictEqual(expected_classes[j], rendered)
+            else:
+                j = i % len(members)
+                _, what, obj = members[j]
+                self.assertListEqual(expected_members[j], sphinx_icontract._format.format_contracts(what=what, obj=obj))
+
+            if i % 50 == 0:
+                # Start over so that the sources are parsed concurrently again.
+                sphinx_icontract._reset_caches()
+
+        switch_interval = sys.getswitchinterval()
+
+        # Use small caches so that the entries are evicted while being rendered in the other threads.
+        patchers = [
+            unittest.mock.patch.object(
+                sphinx_icontract._render, name, sphinx_icontract._render_cache.RenderCache(maxsize=2))
+            for name in ['CONTRACT_CACHE', 'CAPTURE_CACHE', 'ERROR_CACHE', 'ERROR_CODE_CACHE']
+        ]
+        patchers.append(
+            unittest.mock.patch.object(
+                sphinx_icontract._format, 'CHECKER_CACHE', sphinx_icontract._render_cache.RenderCache(maxsize=2)))
+
+        try:
+            # Switch the threads as often as possible to provoke the races.
+            sys.setswitchinterval(1e-6)
+            sphinx_icontract._renderings.DISK_CACHE_DIRECTORY = str(pathlib.Path(self.module.__file__).parent / 'cache')
+            sphinx_icontract._renderings.DISK_CACHE = None
+
+            for patcher in patchers:
+                patcher.start()
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
+                for future in [executor.submit(render, i) for i in range(1000)]:
+                    future.result()
+
+            assert sphinx_icontract._renderings.DISK_CACHE is not None
+            sphinx_icontract._renderings.DISK_CACHE.flush()
+        finally:
+            for patcher in patchers:
+                patcher.stop()
+
+            sys.setswitchinterval(switch_interval)
+            sphinx_icontract._renderings.DISK_CACHE_DIRECTORY = None
+            sphinx_icontract._renderings.DISK_CACHE = None
+
+            sphinx_icontract._reset_caches()
+
+
+if __name__ == '__main__':
+    unittest.main()
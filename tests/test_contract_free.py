@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Test the contract-free modules in sphinx_icontract."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+# pylint: disable=unused-argument
+import functools
+import sys
+import types
+import unittest
+import unittest.mock
+from typing import List
+
+import icontract
+
+import sphinx_icontract
+
+import tests.common
+
+
+class TestContractFreeModules(unittest.TestCase):
+    def setUp(self) -> None:
+        sphinx_icontract._CONTRACT_FREE_MODULES.clear()
+        self.addCleanup(sphinx_icontract._CONTRACT_FREE_MODULES.clear)
+
+    def test_short_circuited(self):
+        module = tests.common.import_source(
+            self,
+            name='contract_free_module',
+            text='''\
+            import icontract
+
+
+            def some_func(x: int) -> None:
+                pass
+
+
+            class SomeClass:
+                def some_method(self) -> None:
+                    pass
+
+                @property
+                def some_prop(self) -> int:
+                    return 1
+
+                class Nested:
+                    def nested_method(self) -> None:
+                        pass
+            ''')
+
+        env = types.SimpleNamespace(temp_data={'docname': 'some_doc'})
+        app = types.SimpleNamespace(env=env)
+
+        # yapf: disable
+        events = [
+            ('module', module),
+            ('function', module.some_func),
+            ('class', module.SomeClass),
+            ('method', module.SomeClass.some_method),
+            ('attribute', vars(module.SomeClass)['some_prop']),
+            ('method', module.SomeClass.Nested.nested_method)
+        ]
+        # yapf: enable
+
+        with unittest.mock.patch.object(sphinx_icontract._format, 'format_contracts') as format_contracts:
+            for what, obj in events:
+                lines = []  # type: List[str]
+                sphinx_icontract.process_docstring(
+                    app=app, what=what, name='some_name', obj=obj, options=None, lines=lines)
+                self.assertListEqual([], lines)
+
+        format_contracts.assert_not_called()
+        self.assertDictEqual({'contract_free_module': True}, sphinx_icontract._CONTRACT_FREE_MODULES)
+        self.assertEqual(len(events), env.icontract_documents['some_doc'].short_circuited)
+
+        try:
+            sphinx_icontract._env.SHORT_CIRCUITED = 0
+            sphinx_icontract._env.updated(app=app, env=env)
+
+            self.assertEqual(len(events), sphinx_icontract._env.SHORT_CIRCUITED)
+            self.assertEqual(0, env.icontract_documents['some_doc'].short_circuited)
+
+            app.config = types.SimpleNamespace(icontract_profile_json=None)
+            with self.assertLogs('sphinx.sphinx_icontract', level='INFO') as logs:
+                sphinx_icontract._build_finished(app=app, exception=None)
+
+            self.assertIn('{} docstring event(s) short-circuited'.format(len(events)), '\n'.join(logs.output))
+        finally:
+            sphinx_icontract._env.SHORT_CIRCUITED = 0
+
+    def test_contracts_anywhere_in_module(self):
+        tests.common.import_source(
+            self,
+            name='module_with_base',
+            text='''\
+            import icontract
+
+
+            class SomeBase(icontract.DBC):
+                @icontract.require(lambda x: x > 0)
+                def some_method(self, x: int) -> None:
+                    pass
+            ''')
+
+        # yapf: disable
+        texts = [
+            # Contracts in a nested class
+            '''\
+            import icontract
+
+
+            def some_func(x: int) -> None:
+                pass
+
+
+            class SomeClass:
+                class Nested:
+                    @icontract.require(lambda x: x > 0)
+                    def nested_method(self, x: int) -> None:
+                        pass
+            ''',
+            # Contracts inherited from another module which is not imported as icontract
+            '''\
+            import module_with_base
+
+
+            def some_func(x: int) -> None:
+                pass
+
+
+            class SomeClass(module_with_base.SomeBase):
+                def some_method(self, x: int) -> None:
+                    pass
+            '''
+        ]
+        # yapf: enable
+
+        for i, text in enumerate(texts):
+            module = tests.common.import_source(self, name='module_with_contracts_{}'.format(i), text=text)
+
+            # The function has no contracts itself, but its module has.
+            self.assertFalse(sphinx_icontract._contract_free(what='function', obj=module.some_func))
+
+        module = sys.modules['module_with_contracts_1']
+        lines = []  # type: List[str]
+        sphinx_icontract.process_docstring(
+            app=None, what='method', name='some_method', obj=module.SomeClass.some_method, options=None, lines=lines)
+        self.assertListEqual([':requires:', '    * :code:`x > 0`'], lines)
+
+    def test_local_objects_not_short_circuited(self):
+        # The module of this test has no contracts at the top level, but the scan can not see the local objects.
+        @icontract.require(lambda x: x > 0)
+        def some_func(x: int) -> None:
+            pass
+
+        self.assertFalse(sphinx_icontract._contract_free(what='function', obj=some_func))
+
+    def test_wrapper_from_contract_free_module(self):
+        module = tests.common.import_source(
+            self,
+            name='wrapped_module',
+            text='''\
+            def some_func(x: int) -> None:
+                pass
+            ''')
+
+        # The wrapper takes over the module and the qualified name of the wrapped function which has no contracts.
+        @icontract.require(lambda x: x > 0)
+        @functools.wraps(module.some_func)
+        def wrapper(x: int) -> None:
+            module.some_func(x)
+
+        self.assertEqual('wrapped_module', wrapper.__module__)
+        self.assertFalse(sphinx_icontract._contract_free(what='function', obj=wrapper))
+        self.assertTrue(sphinx_icontract._contract_free(what='function', obj=module.some_func))
+
+        lines = []  # type: List[str]
+        sphinx_icontract.process_docstring(
+            app=None, what='function', name='some_func', obj=wrapper, options=None, lines=lines)
+        self.assertListEqual([':requires:', '    * :code:`x > 0`'], lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
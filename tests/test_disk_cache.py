@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._disk_cache."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+# pylint: disable=unused-argument
+import os
+import pathlib
+import tempfile
+import unittest
+import unittest.mock
+from typing import List
+
+import icontract
+
+import sphinx_icontract
+import sphinx_icontract._disk_cache
+
+
+class TestDiskCache(unittest.TestCase):
+    def test_put_flush_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = pathlib.Path(tmp_dir) / 'some_module.py'
+            source.write_text('x = 1\n')
+
+            cache_dir = os.path.join(tmp_dir, 'cache')
+
+            cache = sphinx_icontract._disk_cache.DiskCache(directory=cache_dir, version='1')
+            self.assertIsNone(cache.get(path=str(source), lineno=1, kind='condition'))
+            cache.put(path=str(source), lineno=1, kind='condition', value=[':code:`x > 0`'])
+            cache.flush()
+
+            cache = sphinx_icontract._disk_cache.DiskCache(directory=cache_dir, version='1')
+            self.assertListEqual([':code:`x > 0`'], cache.get(path=str(source), lineno=1, kind='condition'))
+            self.assertIsNone(cache.get(path=str(source), lineno=1, kind='error'))
+            self.assertEqual(1, cache.hits)
+            self.assertEqual(1, cache.misses)
+
+    def test_invalidated_on_version_change(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = pathlib.Path(tmp_dir) / 'some_module.py'
+            source.write_text('x = 1\n')
+
+            cache_dir = os.path.join(tmp_dir, 'cache')
+
+            cache = sphinx_icontract._disk_cache.DiskCache(directory=cache_dir, version='1')
+            cache.put(path=str(source), lineno=1, kind='condition', value=[':code:`x > 0`'])
+            cache.flush()
+
+            cache = sphinx_icontract._disk_cache.DiskCache(directory=cache_dir, version='2')
+            self.assertIsNone(cache.get(path=str(source), lineno=1, kind='condition'))
+
+    def test_invalidated_on_content_change(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = pathlib.Path(tmp_dir) / 'some_module.py'
+            source.write_text('x = 1\n')
+
+            cache_dir = os.path.join(tmp_dir, 'cache')
+
+            cache = sphinx_icontract._disk_cache.DiskCache(directory=cache_dir, version='1')
+            cache.put(path=str(source), lineno=1, kind='condition', value=[':code:`x > 0`'])
+            cache.flush()
+
+            source.write_text('x = 2\n')
+
+            cache = sphinx_icontract._disk_cache.DiskCache(directory=cache_dir, version='1')
+            self.assertIsNone(cache.get(path=str(source), lineno=1, kind='condition'))
+
+    def test_valid_on_touch_without_content_change(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = pathlib.Path(tmp_dir) / 'some_module.py'
+            source.write_text('x = 1\n')
+
+            cache_dir = os.path.join(tmp_dir, 'cache')
+
+            cache = sphinx_icontract._disk_cache.DiskCache(directory=cache_dir, version='1')
+            cache.put(path=str(source), lineno=1, kind='condition', value=[':code:`x > 0`'])
+            cache.flush()
+
+            stat = source.stat()
+            os.utime(str(source), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+            cache = sphinx_icontract._disk_cache.DiskCache(directory=cache_dir, version='1')
+            self.assertListEqual([':code:`x > 0`'], cache.get(path=str(source), lineno=1, kind='condition'))
+
+    def test_missing_source_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = sphinx_icontract._disk_cache.DiskCache(directory=tmp_dir, version='1')
+
+            path = os.path.join(tmp_dir, 'non_existing.py')
+            cache.put(path=path, lineno=1, kind='condition', value=[':code:`x > 0`'])
+            self.assertIsNone(cache.get(path=path, lineno=1, kind='condition'))
+
+            cache.flush()
+            self.assertListEqual([], os.listdir(tmp_dir))
+
+    def test_take_new_entries(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = pathlib.Path(tmp_dir) / 'some_module.py'
+            source.write_text('x = 1\n')
+
+            cache = sphinx_icontract._disk_cache.DiskCache(directory=os.path.join(tmp_dir, 'cache'), version='1')
+            cache.put(path=str(source), lineno=1, kind='condition', value=[':code:`x > 0`'])
+
+            self.assertListEqual([(str(source), 1, 'condition', [':code:`x > 0`'])], cache.take_new_entries())
+            self.assertListEqual([], cache.take_new_entries())
+
+
+class TestRenderingWithDiskCache(unittest.TestCase):
+    def test_warm_rendering_skips_inspection(self):
+        @icontract.require(lambda x: x > 0, error=lambda: ValueError("x positive"))
+        @icontract.snapshot(lambda lst: lst[:])
+        @icontract.ensure(lambda OLD, lst: OLD.lst == lst)
+        def some_func(x: int, lst: List[int]) -> None:
+            pass
+
+        expected = [
+            ':requires:', '    * :code:`x > 0`', '', '      (x positive; raise :py:class:`ValueError`)', ':OLD:',
+            '    * :code:`.lst` = :code:`lst[:]`', ':ensures:', '    * :code:`OLD.lst == lst`'
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            try:
+                sphinx_icontract._renderings.DISK_CACHE = sphinx_icontract._disk_cache.DiskCache(
+                    directory=tmp_dir, version='1')
+                sphinx_icontract._reset_caches()
+
+                lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
+                self.assertListEqual(expected, lines)
+                sphinx_icontract._renderings.DISK_CACHE.flush()
+
+                # Simulate a new build.
+                sphinx_icontract._renderings.DISK_CACHE = sphinx_icontract._disk_cache.DiskCache(
+                    directory=tmp_dir, version='1')
+                sphinx_icontract._reset_caches()
+
+                with unittest.mock.patch.object(
+                        sphinx_icontract._index, 'inspect_decorator',
+                        side_effect=AssertionError("Unexpected inspection")):
+                    lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
+
+                self.assertListEqual(expected, lines)
+                self.assertEqual(4, sphinx_icontract._renderings.DISK_CACHE.hits)
+                self.assertEqual(0, sphinx_icontract._renderings.DISK_CACHE.misses)
+            finally:
+                sphinx_icontract._renderings.DISK_CACHE = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._env."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+# pylint: disable=unused-argument
+import tempfile
+import types
+import unittest
+from typing import List
+
+import icontract
+import icontract._checkers
+
+import sphinx_icontract
+
+
+class TestEnvironment(unittest.TestCase):
+    def test_document_data_recorded_and_purged(self):
+        @icontract.require(lambda x: x > 0)
+        def some_func(x: int) -> None:
+            pass
+
+        def another_func(x: int) -> None:
+            pass
+
+        env = types.SimpleNamespace(temp_data={'docname': 'some_doc'})
+        app = types.SimpleNamespace(env=env)
+
+        for _ in range(2):
+            lines = []  # type: List[str]
+            sphinx_icontract.process_docstring(
+                app=app, what='function', name='some_func', obj=some_func, options=None, lines=lines)
+            self.assertListEqual([':requires:', '    * :code:`x > 0`'], lines)
+
+        sphinx_icontract.process_docstring(
+            app=app, what='function', name='another_func', obj=another_func, options=None, lines=[])
+
+        data = env.icontract_documents['some_doc']
+        self.assertDictEqual({'some_func': [':requires:', '    * :code:`x > 0`']}, data.blocks)
+        self.assertDictEqual({'function': 1}, dict(data.counts))
+
+        sphinx_icontract._env.purge_doc(app=app, env=env, docname='some_doc')
+        self.assertDictEqual(dict(), env.icontract_documents)
+
+    def test_merge(self):
+        @icontract.require(lambda x: x > 0)
+        def some_func(x: int) -> None:
+            pass
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            try:
+                sphinx_icontract._renderings.DISK_CACHE = sphinx_icontract._disk_cache.DiskCache(
+                    directory=tmp_dir, version='1')
+                sphinx_icontract._profiling.PROFILER = sphinx_icontract._profiling.Profiler(
+                    cache_counters=sphinx_icontract._cache_counters())
+                sphinx_icontract._render.CONTRACT_CACHE.clear()
+
+                # Simulate reading a document in another process.
+                other = types.SimpleNamespace(temp_data={'docname': 'some_doc'})
+                sphinx_icontract.process_docstring(
+                    app=types.SimpleNamespace(env=other),
+                    what='function',
+                    name='some_func',
+                    obj=some_func,
+                    options=None,
+                    lines=[])
+
+                # Simulate the main process which read no documents.
+                sphinx_icontract._renderings.DISK_CACHE = sphinx_icontract._disk_cache.DiskCache(
+                    directory=tmp_dir, version='1')
+                sphinx_icontract._profiling.PROFILER = sphinx_icontract._profiling.Profiler(
+                    cache_counters=sphinx_icontract._cache_counters())
+
+                env = types.SimpleNamespace(temp_data=dict())
+                sphinx_icontract._env.merge_info(app=None, env=env, docnames=['some_doc'], other=other)
+
+                self.assertDictEqual({
+                    'some_func': [':requires:', '    * :code:`x > 0`']
+                }, env.icontract_documents['some_doc'].blocks)
+
+                checker = icontract._checkers.find_checker(func=some_func)
+                code = checker.__preconditions__[0][0].condition.__code__  # type: ignore
+                self.assertTrue(
+                    sphinx_icontract._renderings.DISK_CACHE.contains(
+                        path=code.co_filename, lineno=code.co_firstlineno, kind='condition'))
+
+                jsonable = sphinx_icontract._profiling.PROFILER.to_jsonable(
+                    cache_counters=sphinx_icontract._cache_counters())
+                self.assertListEqual(['some_func'], [obj['name'] for obj in jsonable['objects']])
+                self.assertEqual(1, jsonable['phases'][sphinx_icontract._profiling.AST_MATCHING]['calls'])
+                self.assertDictEqual({'hits': 0, 'misses': 1, 'hit_ratio': 0.0}, jsonable['caches']['contracts'])
+
+                # The merged data need not be pickled with the environment.
+                sphinx_icontract._env.updated(app=None, env=env)
+                self.assertListEqual([], env.icontract_documents['some_doc'].renderings)
+                self.assertIsNone(env.icontract_documents['some_doc'].profile)
+            finally:
+                sphinx_icontract._renderings.DISK_CACHE = None
+                sphinx_icontract._profiling.PROFILER = None
+
+
+if __name__ == '__main__':
+    unittest.main()
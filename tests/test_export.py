@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._export and the command-line interface."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+import io
+import json
+import pathlib
+import sys
+import tempfile
+import textwrap
+import unittest
+
+import sphinx_icontract.__main__
+import sphinx_icontract._export
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+
+        # Only the package is imported so that the lazy import of the submodules can be tested.
+        package_dir = pathlib.Path(tmp_dir.name) / 'exported_package'
+        package_dir.mkdir()
+        (package_dir / '__init__.py').write_text('"""Provide some contracts."""\n', encoding='utf-8')
+
+        path = package_dir / 'some_module.py'
+        path.write_text(
+            textwrap.dedent('''\
+            from typing import List
+
+            import icontract
+
+
+            def is_positive(x: int) -> bool:
+                return x > 0
+
+
+            @icontract.require(lambda x: not (x > 0) or x % 2 == 0, "even if positive")
+            @icontract.require(is_positive, error=ValueError)
+            @icontract.snapshot(lambda lst: lst[:])
+            @icontract.ensure(lambda OLD, lst: OLD.lst == lst, error=lambda: ValueError("lst unchanged"))
+            def some_func(x: int, lst: List[int]) -> None:
+                pass
+
+
+            @icontract.invariant(lambda self: self.x > 0)
+            class SomeClass(icontract.DBC):
+                def __init__(self) -> None:
+                    self.x = 1
+
+                @property
+                @icontract.ensure(lambda result: result > 0)
+                def some_prop(self) -> int:
+                    return self.x
+            '''),
+            encoding='utf-8')
+
+        sys.path.insert(0, tmp_dir.name)
+        self.addCleanup(sys.path.remove, tmp_dir.name)
+        self.addCleanup(self.unload)
+
+        self.path = str(path)
+
+    @staticmethod
+    def unload() -> None:
+        for name in [name for name in sys.modules if name.split('.')[0] == 'exported_package']:
+            del sys.modules[name]
+
+    def test_records(self):
+        stdout = io.StringIO()
+        self.assertEqual(0, sphinx_icontract.__main__.main(argv=['export', 'exported_package'], stdout=stdout))
+
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+        self.assertListEqual([('exported_package.some_module.some_func', 'precondition'),
+                              ('exported_package.some_module.some_func', 'precondition'),
+                              ('exported_package.some_module.some_func', 'snapshot'),
+                              ('exported_package.some_module.some_func', 'postcondition'),
+                              ('exported_package.some_module.SomeClass', 'invariant'),
+                              ('exported_package.some_module.SomeClass.some_prop', 'postcondition')],
+                             [(record['name'], record['kind']) for record in records])
+
+        function_condition, implication, snapshot, postcondition, invariant, prop = records
+
+        self.assertEqual('not (x > 0) or x % 2 == 0', implication['condition'])
+        self.assertDictEqual({'antecedent': 'x > 0', 'consequent': 'x % 2 == 0'}, implication['implication'])
+        self.assertEqual('even if positive', implication['description'])
+        self.assertEqual(self.path, implication['path'])
+        self.assertEqual(10, implication['lineno'])
+
+        self.assertEqual('is_positive', function_condition['condition'])
+        self.assertIsNone(function_condition['implication'])
+        self.assertEqual('ValueError', function_condition['error_type'])
+        self.assertListEqual([0, 0], [implication['group'], function_condition['group']])
+
+        self.assertEqual('lst', snapshot['snapshot_name'])
+        self.assertEqual('lst[:]', snapshot['capture'])
+
+        self.assertEqual(['OLD.lst == lst'], [postcondition['condition']])
+        self.assertEqual('ValueError', postcondition['error_type'])
+        self.assertEqual('lst unchanged', postcondition['error_message'])
+
+        self.assertEqual('self.x > 0', invariant['condition'])
+        self.assertEqual(['get'], [prop['accessor']])
+
+    def test_output_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = pathlib.Path(tmp_dir) / 'contracts.jsonl'
+
+            self.assertEqual(
+                0,
+                sphinx_icontract.__main__.main(argv=['export', 'exported_package.some_module', '--output',
+                                                     str(output)]))
+
+            self.assertEqual(6, len(output.read_text(encoding='utf-8').splitlines()))
+
+    def test_records_streamed(self):
+        modules = sphinx_icontract._export.iterate_modules(names=['exported_package'])
+        self.assertEqual('exported_package', next(modules).__name__)
+
+        # The submodules are imported only once they are consumed.
+        self.assertNotIn('exported_package.some_module', sys.modules)
+
+        records = sphinx_icontract._export.contract_records(module=next(modules))
+        self.assertEqual('precondition', next(records)['kind'])
+
+
+if __name__ == '__main__':
+    unittest.main()
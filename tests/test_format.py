@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._format."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+import unittest
+import unittest.mock
+
+import sphinx_icontract
+
+import tests.common
+
+
+class TestInheritedAsReference(unittest.TestCase):
+    def setUp(self) -> None:
+        # The classes are defined in a module since the defining classes of the local functions can not be resolved.
+        self.module = tests.common.import_source(
+            self,
+            name='inherited_module',
+            text='''\
+            from typing import List
+
+            import icontract
+
+
+            @icontract.invariant(lambda self: self.value > 0)
+            class SomeBase(icontract.DBC):
+                def __init__(self) -> None:
+                    self.value = 1
+
+                @icontract.require(lambda x: x > 0)
+                @icontract.snapshot(lambda lst: lst[:])
+                @icontract.ensure(lambda OLD, lst: OLD.lst == lst)
+                def some_method(self, x: int, lst: List[int]) -> None:
+                    pass
+
+                @property
+                @icontract.ensure(lambda result: result > 0)
+                def some_prop(self) -> int:
+                    return self.value
+
+
+            @icontract.invariant(lambda self: self.value < 100)
+            class SomeClass(SomeBase):
+                @icontract.require(lambda x: x > -10)
+                @icontract.ensure(lambda result: result is None)
+                def some_method(self, x: int, lst: List[int]) -> None:
+                    pass
+
+                @property
+                def some_prop(self) -> int:
+                    return self.value
+
+
+            class AnotherClass(SomeClass):
+                def some_method(self, x: int, lst: List[int]) -> None:
+                    pass
+            ''')
+
+        patcher = unittest.mock.patch.object(sphinx_icontract._format, 'INHERITED_AS_REFERENCE', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_method(self):
+        lines = sphinx_icontract._format.format_contracts(what='method', obj=self.module.SomeClass.some_method)
+
+        # yapf: disable
+        self.assertListEqual([
+            ':inherits contracts from: :py:meth:`inherited_module.SomeBase.some_method`',
+            ':requires else:',
+            '    * :code:`x > -10`',
+            ':ensures:',
+            '    * :code:`result is None`'
+        ], lines)
+        # yapf: enable
+
+        # Only the contracts of the direct base are referenced.
+        lines = sphinx_icontract._format.format_contracts(what='method', obj=self.module.AnotherClass.some_method)
+        self.assertListEqual([':inherits contracts from: :py:meth:`inherited_module.SomeClass.some_method`'], lines)
+
+        # Nothing is inherited in the base.
+        lines = sphinx_icontract._format.format_contracts(what='method', obj=self.module.SomeBase.some_method)
+        self.assertEqual(':requires:', lines[0])
+        self.assertEqual(6, len(lines))
+
+    def test_property(self):
+        lines = sphinx_icontract._format.format_contracts(
+            what='attribute', obj=vars(self.module.SomeClass)['some_prop'])
+        self.assertListEqual([':get inherits contracts from: :py:attr:`inherited_module.SomeBase.some_prop`'], lines)
+
+    def test_invariants(self):
+        lines = sphinx_icontract._format.format_contracts(what='class', obj=self.module.SomeClass)
+
+        # yapf: disable
+        self.assertListEqual([
+            ':inherits invariants from: :py:class:`inherited_module.SomeBase`',
+            ':establishes:',
+            '    * :code:`self.value < 100`'
+        ], lines)
+        # yapf: enable
+
+    def test_inline_by_default(self):
+        with unittest.mock.patch.object(sphinx_icontract._format, 'INHERITED_AS_REFERENCE', False):
+            lines = sphinx_icontract._format.format_contracts(what='method', obj=self.module.AnotherClass.some_method)
+
+        # yapf: disable
+        self.assertListEqual([
+            ':requires:',
+            '    * :code:`x > 0`',
+            ':requires else:',
+            '    * :code:`x > -10`',
+            ':OLD:',
+            '    * :code:`.lst` = :code:`lst[:]`',
+            ':ensures:',
+            '    * :code:`OLD.lst == lst`',
+            '    * :code:`result is None`'
+        ], lines)
+        # yapf: enable
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._index."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+import textwrap
+import unittest
+
+import icontract
+import icontract._checkers
+
+import sphinx_icontract
+
+
+class TestSourceIndex(unittest.TestCase):
+    def test_file_tokenized_once(self):
+        @icontract.require(lambda x: x >= 0)
+        @icontract.ensure(lambda result: result > 0, error=lambda: ValueError("result positive"))
+        def some_func(x: int) -> int:
+            return x
+
+        sphinx_icontract._index.SOURCE_INDEXES.clear()
+
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
+
+        # yapf: disable
+        self.assertListEqual(
+            [
+                ':requires:',
+                '    * :code:`x >= 0`',
+                ':ensures:',
+                '    * :code:`result > 0`',
+                '',
+                '      (result positive; raise :py:class:`ValueError`)'
+            ],
+            lines)
+        # yapf: enable
+
+        self.assertListEqual([__file__], list(sphinx_icontract._index.SOURCE_INDEXES.keys()))
+
+        checker = icontract._checkers.find_checker(func=some_func)
+        precondition = checker.__preconditions__[0][0]  # type: ignore
+        postcondition = checker.__postconditions__[0]  # type: ignore
+
+        pre_inspection = sphinx_icontract._index.inspect_decorator(func=precondition.condition)
+        post_inspection = sphinx_icontract._index.inspect_decorator(func=postcondition.condition)
+        error_inspection = sphinx_icontract._index.inspect_decorator(func=postcondition.error)
+
+        self.assertIs(pre_inspection.atok, post_inspection.atok)
+        self.assertIsNot(pre_inspection.node, post_inspection.node)
+        self.assertIs(post_inspection.node, error_inspection.node)
+
+    def test_lookup_by_line(self):
+        text = textwrap.dedent('''\
+            some_decorator = icontract.require(lambda x: x > 0)
+
+            class SomeClass:
+                @icontract.require(
+                    lambda x:
+                    x > 0
+                )
+                @some_decorator
+                def some_func(self, x: int) -> None:
+                    pass
+            ''')
+
+        index = sphinx_icontract._index.SourceIndex(text=text, filename='<some file>')
+
+        self.assertIsNone(index.inspect_decorator(lineno=0))
+
+        for lineno in [3, 4, 5, 6]:
+            decorator_inspection = index.inspect_decorator(lineno=lineno)
+            assert decorator_inspection is not None
+            self.assertEqual('icontract.require(\n        lambda x:\n        x > 0\n    )',
+                             decorator_inspection.atok.get_text(decorator_inspection.node))
+
+        self.assertIsNone(index.inspect_decorator(lineno=7))
+
+    def test_unparsable_source(self):
+        index = sphinx_icontract._index.SourceIndex(text='@icontract.require(lambda x: x > 0\n', filename='<some file>')
+        self.assertIsNone(index.inspect_decorator(lineno=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
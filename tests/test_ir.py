@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._ir."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+# pylint: disable=unused-argument
+import json
+import pickle
+import unittest
+from typing import List
+
+import icontract
+import icontract._checkers
+
+import sphinx_icontract
+
+
+class TestIntermediateRepresentation(unittest.TestCase):
+    def test_extract_and_write(self):
+        # yapf: disable
+        @icontract.require(lambda x: not (x > 0) or x < 100, "x small if positive")
+        @icontract.require(
+            lambda x: -100 < x <
+                      200)
+        @icontract.snapshot(lambda lst: lst[:])
+        @icontract.ensure(lambda OLD, lst: OLD.lst == lst, error=lambda: ValueError("lst unchanged"))
+        def some_func(x: int, lst: List[int]) -> None:
+            pass
+        # yapf: enable
+
+        checker = icontract._checkers.find_checker(func=some_func)
+        pps = sphinx_icontract._format.preconditions_snapshots_postconditions(checker=checker)
+
+        multi_line, implication = [
+            sphinx_icontract._render.extract_contract(contract=contract, kind='precondition')
+            for contract in pps.preconditions[0]
+        ]
+
+        self.assertEqual(('x > 0', 'x < 100'), implication.condition.implication)
+        self.assertEqual(('not (x > 0) or x < 100', ), implication.condition.lines)
+        self.assertEqual('x small if positive', implication.description)
+        self.assertEqual(('-100 < x <', '200'), multi_line.condition.lines)
+
+        postcondition = sphinx_icontract._render.extract_contract(contract=pps.postconditions[0], kind='postcondition')
+        self.assertEqual(('ValueError', 'lst unchanged'), (postcondition.error_type, postcondition.error_message))
+
+        snapshot = sphinx_icontract._render.extract_snapshot(snapshot=pps.snapshots[0])
+        self.assertEqual(('lst', ('lst[:]', )), (snapshot.name, snapshot.capture))
+
+        # The IR can be shipped between the processes and stored in the disk cache.
+        for contract in [implication, multi_line, postcondition]:
+            restored = pickle.loads(pickle.dumps(contract))
+            self.assertEqual(contract.condition, restored.condition)
+            self.assertListEqual(
+                list(sphinx_icontract._render.write_contract(contract=contract)),
+                list(sphinx_icontract._render.write_contract(contract=restored)))
+
+            self.assertEqual(contract.condition,
+                             sphinx_icontract._ir.ConditionIR.from_jsonable(
+                                 json.loads(json.dumps(contract.condition.to_jsonable()))))
+
+        self.assertListEqual(
+            [':code:`x > 0` ⇒ :code:`x < 100`', '', '(x small if positive)'],
+            list(sphinx_icontract._render.write_contract(contract=implication)))
+
+        # The IR is slotted to keep it compact.
+        with self.assertRaises(AttributeError):
+            implication.some_attribute = 1  # type: ignore
+
+
+if __name__ == '__main__':
+    unittest.main()
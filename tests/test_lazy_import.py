@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Test the lazy import of icontract in sphinx_icontract."""
+
+# pylint: disable=missing-docstring
+import os
+import pathlib
+import subprocess
+import sys
+import textwrap
+import unittest
+
+
+class TestLazyImport(unittest.TestCase):
+    def test_icontract_not_imported_without_contracts(self):
+        script = textwrap.dedent('''\
+            import sys
+
+            import sphinx_icontract
+
+            def some_func(x: int) -> None:
+                pass
+
+            lines = []
+            sphinx_icontract.process_docstring(
+                app=None, what='function', name='some_func', obj=some_func, options=None, lines=lines)
+            assert lines == [], lines
+
+            print(sorted(name for name in ['icontract', 'asttokens'] if name in sys.modules))
+            ''')
+
+        env = os.environ.copy()
+        env['PYTHONPATH'] = os.pathsep.join([str(pathlib.Path(__file__).parent.parent), env.get('PYTHONPATH', '')])
+
+        # The self-checks import icontract in the slow mode.
+        env.pop('ICONTRACT_SLOW', None)
+
+        output = subprocess.check_output([sys.executable, '-c', script], env=env, universal_newlines=True)
+        self.assertEqual('[]', output.strip())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._lines."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+import random
+import re
+import textwrap
+import unittest
+from typing import List
+
+import sphinx_icontract
+
+
+class TestLines(unittest.TestCase):
+    def test_concatenate(self):
+        lines = sphinx_icontract.Lines(['a', 'b']) + sphinx_icontract.Lines([]) + sphinx_icontract.Lines(['c'])
+
+        self.assertEqual(3, len(lines))
+        self.assertListEqual(['a', 'b', 'c'], list(lines))
+        self.assertEqual('b', lines[1])
+        self.assertEqual('c', lines[-1])
+        self.assertListEqual(['b', 'c'], list(lines[1:]))
+        self.assertEqual(['a', 'b', 'c'], lines)
+        self.assertNotEqual(['a', 'b'], lines)
+
+        # Iteration after indexing uses the flattened lines.
+        self.assertListEqual(['a', 'b', 'c'], list(lines))
+
+    def test_list_compatible(self):
+        lines = sphinx_icontract.Lines(['a']) + sphinx_icontract.Lines(['b', 'c'])
+
+        self.assertIsInstance(lines, list)
+        self.assertListEqual(['a', 'b', 'c'], lines)
+        self.assertIn('b', lines)
+        self.assertEqual(1, lines.index('b'))
+        self.assertListEqual(['x', 'a', 'b', 'c'], ['x'] + lines)
+        self.assertListEqual(['a', 'b', 'c', 'x'], lines + ['x'])
+        self.assertEqual('a\nb\nc', '\n'.join(lines))
+
+        with self.assertRaises(TypeError):
+            lines.append('d')
+
+        self.assertListEqual(['a', 'b', 'c'], lines)
+
+    def test_long_chain_of_concatenations(self):
+        lines = sphinx_icontract.Lines([])
+        for i in range(10000):
+            lines = lines + sphinx_icontract.Lines([str(i)])
+
+        self.assertEqual(10000, len(lines))
+        self.assertListEqual([str(i) for i in range(10000)], list(lines))
+
+    def test_bullet_is_indented_on_iteration(self):
+        lines = sphinx_icontract._lines.make_bullet(sphinx_icontract.Lines(['x', '', '  y']))
+        nested = sphinx_icontract._lines.make_bullet(sphinx_icontract.Lines(['z']) + lines)
+
+        self.assertEqual(3, len(lines))
+        self.assertListEqual(['    * x', '', '        y'], list(lines))
+        self.assertListEqual(['    * z', '          * x', '', '              y'], list(nested))
+
+    def test_bullet_memoized_on_shared_lines(self):
+        shared = sphinx_icontract.Lines(['x', 'y'])
+
+        first = sphinx_icontract._lines.make_bullet(shared)
+        self.assertListEqual(['    * x', '      y'], list(first))
+
+        # The second bullet reuses the indented lines.
+        second = sphinx_icontract._lines.make_bullet(shared)
+        self.assertIs(shared._bullet, second._parts[0])
+        self.assertListEqual(['    * x', '      y'], list(second))
+
+
+def textwrap_smart_dedent(lines: List[str]) -> List[str]:
+    """Dedent the lines as the original implementation of _smart_dedent_multi_line_lambda_condition did."""
+    if len(lines) == 0:
+        return lines
+
+    if re.match(r'^\s+', lines[0]):
+        return textwrap.dedent('\n'.join(lines)).splitlines()
+
+    return [lines[0]] + textwrap.dedent('\n'.join(lines[1:])).splitlines()
+
+
+class TestDedent(unittest.TestCase):
+    def test_against_textwrap_on_examples(self):
+        # yapf: disable
+        examples = [
+            [],
+            [''],
+            ['', ''],
+            ['x > 0'],
+            ['    x > 0'],
+            ['x > 0 and', '    y > 0'],
+            ['x > 0 and', '        y > 0 and', '    z > 0'],
+            ['x > 0 and', '\ty > 0 and', '    z > 0'],
+            ['x > 0 and', '  \ty > 0', '  \t z > 0'],
+            ['x > 0 and', '    y > 0', '  ', '    z > 0', ''],
+            ['x > 0 and', '    y > 0', '', ''],
+            ['x > 0 and', '    y > 0', '\t'],
+            [' x > 0', '  y > 0'],
+            ['    x > 0 and', '        y > 0']
+        ]
+        # yapf: enable
+
+        for lines in examples:
+            self.assertListEqual(
+                textwrap_smart_dedent(lines),
+                list(sphinx_icontract._lines.smart_dedent_multi_line_lambda_condition(lines)),
+                'lines: {!r}'.format(lines))
+
+    def test_against_textwrap_on_generated_lines(self):
+        # The non-breaking space is whitespace, but not a space or a tab. The line boundaries (such as form feeds)
+        # are left out since the lines are given as split.
+        alphabet = [' ', '\u00a0', 'x', '>', '0']
+
+        rng = random.Random(1984)
+        for _ in range(5000):
+            lines = []  # type: List[str]
+            for _ in range(rng.randint(0, 6)):
+                indent = ''.join(rng.choice(' \t') for _ in range(rng.randint(0, 4)))
+                rest = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 4)))
+                lines.append(indent + rest)
+
+            self.assertListEqual(
+                textwrap_smart_dedent(lines),
+                list(sphinx_icontract._lines.smart_dedent_multi_line_lambda_condition(lines)),
+                'lines: {!r}'.format(lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._patterns."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+# pylint: disable=unused-argument
+import ast
+import tempfile
+import unittest
+import unittest.mock
+from typing import List, Any, Optional
+
+import asttokens
+import icontract
+
+import sphinx_icontract
+
+
+class TestRegister(unittest.TestCase):
+    def setUp(self) -> None:
+        # Restore the patterns and the negations after each test.
+        patchers = [
+            unittest.mock.patch.dict(sphinx_icontract._patterns.PATTERNS),
+            unittest.mock.patch.dict(sphinx_icontract._patterns.NEGATIONS),
+            unittest.mock.patch.object(sphinx_icontract._renderings, 'REGISTERED', []),
+            unittest.mock.patch.object(sphinx_icontract._renderings, 'DISK_CACHE', None),
+            unittest.mock.patch.object(sphinx_icontract._renderings, 'DISK_CACHE_DIRECTORY', None)
+        ]  # type: List[Any]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.addCleanup(sphinx_icontract._render.CONTRACT_CACHE.clear)
+
+    def test_quantifier_pattern(self):
+        def render_all(atok: asttokens.ASTTokens, node: ast.expr) -> Optional[str]:
+            assert isinstance(node, ast.Call)
+            if not (isinstance(node.func, ast.Name) and node.func.id == 'all' and len(node.args) == 1
+                    and isinstance(node.args[0], ast.GeneratorExp) and len(node.args[0].generators) == 1):
+                return None
+
+            generator = node.args[0].generators[0]
+            return ':code:`∀ {} ∈ {}: {}`'.format(
+                atok.get_text(generator.target), atok.get_text(generator.iter), atok.get_text(node.args[0].elt))
+
+        @icontract.require(lambda lst: all(item > 0 for item in lst))
+        @icontract.require(lambda lst: any(item > 0 for item in lst))
+        def some_func(lst: List[int]) -> None:
+            pass
+
+        # Render before the registration so that the cached renderings need to be invalidated.
+        lines = sphinx_icontract._format.format_function_contracts(func=some_func)
+        self.assertEqual('    * :code:`all(item > 0 for item in lst)`', lines[-1])
+
+        sphinx_icontract.register_pattern(node_type=ast.Call, pattern=render_all)
+
+        lines = sphinx_icontract._format.format_function_contracts(func=some_func)
+
+        # yapf: disable
+        self.assertListEqual(
+            [
+                ':requires:',
+                '    * :code:`any(item > 0 for item in lst)`',
+                '    * :code:`∀ item ∈ lst: item > 0`'
+            ], lines)
+        # yapf: enable
+
+        self.assertEqual(1, len(sphinx_icontract._renderings.REGISTERED))
+        self.assertTrue(sphinx_icontract._renderings.REGISTERED[0].endswith('render_all'))
+
+    def test_pattern_order(self):
+        def render_first(atok: asttokens.ASTTokens, node: ast.expr) -> Optional[str]:
+            return ':code:`first`'
+
+        def render_second(atok: asttokens.ASTTokens, node: ast.expr) -> Optional[str]:
+            return ':code:`second`'
+
+        @icontract.require(lambda x: not x or x > 0)
+        def some_func(x: int) -> None:
+            pass
+
+        sphinx_icontract.register_pattern(node_type=ast.BoolOp, pattern=render_second)
+        lines = sphinx_icontract._format.format_function_contracts(func=some_func)
+        self.assertListEqual([':requires:', '    * :code:`x` ⇒ :code:`x > 0`'], lines)
+
+        sphinx_icontract.register_pattern(node_type=ast.BoolOp, pattern=render_first, first=True)
+        lines = sphinx_icontract._format.format_function_contracts(func=some_func)
+        self.assertListEqual([':requires:', '    * :code:`first`'], lines)
+
+    def test_negation(self):
+        def negate_list(atok: asttokens.ASTTokens, node: ast.expr) -> Optional[str]:
+            return 'len({}) == 0'.format(atok.get_text(node))
+
+        @icontract.require(lambda x: [x] or x > 0)
+        def some_func(x: int) -> None:
+            pass
+
+        lines = sphinx_icontract._format.format_function_contracts(func=some_func)
+        self.assertListEqual([':requires:', '    * :code:`[x] or x > 0`'], lines)
+
+        sphinx_icontract.register_negation(node_type=ast.List, negation=negate_list)
+        lines = sphinx_icontract._format.format_function_contracts(func=some_func)
+        self.assertListEqual([':requires:', '    * :code:`len([x]) == 0` ⇒ :code:`x > 0`'], lines)
+
+    def test_disk_cache_invalidated(self):
+        def render_first(atok: asttokens.ASTTokens, node: ast.expr) -> Optional[str]:
+            return ':code:`first`'
+
+        @icontract.require(lambda x: not x or x > 0)
+        def some_func(x: int) -> None:
+            pass
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            sphinx_icontract._renderings.DISK_CACHE_DIRECTORY = cache_dir
+
+            lines = sphinx_icontract._format.format_function_contracts(func=some_func)
+            self.assertListEqual([':requires:', '    * :code:`x` ⇒ :code:`x > 0`'], lines)
+
+            disk_cache = sphinx_icontract._renderings.get_disk_cache()
+            assert disk_cache is not None
+            disk_cache.flush()
+
+            sphinx_icontract.register_pattern(node_type=ast.BoolOp, pattern=render_first, first=True)
+
+            # The renderings persisted without the pattern are not served any more.
+            lines = sphinx_icontract._format.format_function_contracts(func=some_func)
+            self.assertListEqual([':requires:', '    * :code:`first`'], lines)
+
+            another_disk_cache = sphinx_icontract._renderings.get_disk_cache()
+            assert another_disk_cache is not None
+            self.assertIsNot(disk_cache, another_disk_cache)
+            self.assertNotEqual(disk_cache.version, another_disk_cache.version)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._prerender."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+import textwrap
+import unittest
+import unittest.mock
+
+import sphinx_icontract
+
+import tests.common
+
+
+class TestPrerender(unittest.TestCase):
+    def test_prerendered_in_process_pool(self):
+        module_text = textwrap.dedent('''\
+            from typing import List
+
+            import icontract
+
+
+            @icontract.require(lambda x: x > 0, error=lambda: ValueError("x positive"))
+            @icontract.snapshot(lambda lst: lst[:])
+            @icontract.ensure(lambda OLD, lst: OLD.lst == lst)
+            def some_func(x: int, lst: List[int]) -> None:
+                pass
+
+
+            @icontract.invariant(lambda self: self.y > 0)
+            class SomeClass(icontract.DBC):
+                def __init__(self) -> None:
+                    self.y = 1
+
+                @property
+                @icontract.ensure(lambda result: result > 0)
+                def some_prop(self) -> int:
+                    return self.y
+            ''')
+
+        # yapf: disable
+        expected_func_lines = [
+            ':requires:',
+            '    * :code:`x > 0`',
+            '',
+            '      (x positive; raise :py:class:`ValueError`)',
+            ':OLD:',
+            '    * :code:`.lst` = :code:`lst[:]`',
+            ':ensures:',
+            '    * :code:`OLD.lst == lst`'
+        ]
+        # yapf: enable
+
+        modules = [
+            tests.common.import_source(self, name=name, text=module_text)
+            for name in ['prerendered_module_a', 'prerendered_module_b']
+        ]
+
+        sphinx_icontract._renderings.PRERENDERED.clear()
+        self.addCleanup(sphinx_icontract._renderings.PRERENDERED.clear)
+
+        sphinx_icontract._render.CONTRACT_CACHE.clear()
+        sphinx_icontract._render.CAPTURE_CACHE.clear()
+
+        count = sphinx_icontract._prerender.prerender(modules=modules, workers=2)
+        self.assertEqual(2 * 6, count)
+
+        # The docstring events only look up the pre-rendered contracts.
+        with unittest.mock.patch.object(
+                sphinx_icontract._index, 'inspect_decorator', side_effect=AssertionError("Unexpected inspection")):
+            for module in modules:
+                self.assertListEqual(expected_func_lines,
+                                     sphinx_icontract._format.format_contracts(what='function', obj=module.some_func))
+
+                self.assertListEqual([':establishes:', '    * :code:`self.y > 0`'],
+                                     sphinx_icontract._format.format_contracts(what='class', obj=module.SomeClass))
+
+                self.assertListEqual([':get ensures:', '    * :code:`result > 0`'],
+                                     sphinx_icontract._format.format_contracts(
+                                         what='attribute', obj=module.SomeClass.some_prop))
+
+        # Nothing is left to be pre-rendered.
+        self.assertEqual(0, sphinx_icontract._prerender.prerender(modules=modules, workers=2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._prewarm and loading of the pre-warmed cache."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+import pathlib
+import tempfile
+import unittest
+import unittest.mock
+from typing import Any, List
+
+import sphinx_icontract
+import sphinx_icontract.__main__
+import sphinx_icontract._disk_cache
+import sphinx_icontract._prewarm
+
+import tests.common
+
+
+class TestPrewarm(unittest.TestCase):
+    SOME_MODULE = '''\
+    from typing import List
+
+    import icontract
+
+
+    @icontract.require(lambda x: x > 0, error=lambda: ValueError("x positive"))
+    @icontract.snapshot(lambda lst: lst[:])
+    @icontract.ensure(
+        lambda OLD, lst:
+        OLD.lst == lst and
+        len(lst) > 0
+    )
+    def some_func(x: int, lst: List[int]) -> None:
+        pass
+
+
+    @icontract.invariant(lambda self: len(self.items) >= 0)
+    class SomeClass(icontract.DBC):
+        def __init__(self) -> None:
+            self.items = []  # type: List[int]
+    '''
+
+    def setUp(self) -> None:
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = pathlib.Path(tmp_dir.name)
+
+        # The package is built in one directory and documented in another one.
+        self.build_dir = self.tmp_dir / 'build'
+        self.docs_dir = self.tmp_dir / 'docs'
+        self.build_dir.mkdir()
+        self.docs_dir.mkdir()
+
+        sphinx_icontract._reset_caches()
+
+    def import_module(self, directory: pathlib.Path) -> Any:
+        return tests.common.import_source(
+            self, name='prewarmed_package.some_module', text=TestPrewarm.SOME_MODULE, directory=directory)
+
+    def test_archive_keyed_by_content(self):
+        self.import_module(directory=self.build_dir)
+
+        archive_path = self.tmp_dir / 'prewarmed' / 'contracts.json'
+        exit_code = sphinx_icontract.__main__.main(argv=['prewarm', 'prewarmed_package', '--output', str(archive_path)])
+        self.assertEqual(0, exit_code)
+
+        archive = sphinx_icontract._disk_cache.read_archive(path=str(archive_path))
+        self.assertEqual(sphinx_icontract._renderings.version(), archive.version)
+
+        digest = sphinx_icontract._disk_cache._digest(path=str(self.build_dir / 'prewarmed_package' / 'some_module.py'))
+        self.assertListEqual([digest], list(archive.files.keys()))
+        self.assertListEqual(['6:condition', '6:error', '7:capture', '9:condition', '17:condition'],
+                             sorted(archive.files[digest].keys(), key=lambda key: int(key.split(':')[0])))
+
+        # The parsed source files are not kept after the archive has been built.
+        self.assertEqual(0, len(sphinx_icontract._index.SOURCE_INDEXES))
+
+    def test_rendering_without_inspection(self):
+        self.import_module(directory=self.build_dir)
+        archive = sphinx_icontract._prewarm.build_archive(names=['prewarmed_package'])
+
+        module = self.import_module(directory=self.docs_dir)
+
+        expected_func = [
+            ':requires:', '    * :code:`x > 0`', '', '      (x positive; raise :py:class:`ValueError`)', ':OLD:',
+            '    * :code:`.lst` = :code:`lst[:]`', ':ensures:', '    * .. code-block:: python', '',
+            '        OLD.lst == lst and', '        len(lst) > 0', ''
+        ]
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            try:
+                sphinx_icontract._renderings.DISK_CACHE = sphinx_icontract._disk_cache.DiskCache(
+                    directory=cache_dir, version=archive.version, prewarmed=archive.files)
+
+                with unittest.mock.patch.object(
+                        sphinx_icontract._index, 'inspect_decorator',
+                        side_effect=AssertionError("Unexpected inspection")):
+                    func_lines = sphinx_icontract._format.format_contracts(what='function', obj=module.some_func)
+                    class_lines = sphinx_icontract._format.format_contracts(what='class', obj=module.SomeClass)
+
+                self.assertListEqual(expected_func, func_lines)
+                self.assertListEqual([':establishes:', '    * :code:`len(self.items) >= 0`'], class_lines)
+                self.assertEqual(0, sphinx_icontract._renderings.DISK_CACHE.misses)
+
+                # The pre-warmed renderings are persisted for the incremental builds.
+                sphinx_icontract._renderings.DISK_CACHE.flush()
+
+                cache = sphinx_icontract._disk_cache.DiskCache(directory=cache_dir, version=archive.version)
+                self.assertTrue(
+                    cache.contains(
+                        path=str(self.docs_dir / 'prewarmed_package' / 'some_module.py'), lineno=17, kind='condition'))
+            finally:
+                sphinx_icontract._renderings.DISK_CACHE = None
+
+
+class TestLoadPrewarmed(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = pathlib.Path(tmp_dir.name)
+
+    def load(self, path: pathlib.Path) -> Any:
+        warnings = []  # type: List[str]
+        with unittest.mock.patch('sphinx.util.logging.getLogger') as get_logger:
+            get_logger.return_value.warning.side_effect = warnings.append
+            archive = sphinx_icontract._load_prewarmed(path=str(path))
+
+        return archive, warnings
+
+    def test_loaded(self):
+        path = self.tmp_dir / 'contracts.json'
+        files = {'some_digest': {'1:condition': ['some_func', None, None, None]}}
+        sphinx_icontract._disk_cache.write_archive(
+            archive=sphinx_icontract._disk_cache.Archive(version=sphinx_icontract._renderings.version(), files=files),
+            path=str(path))
+
+        archive, warnings = self.load(path=path)
+        self.assertListEqual([], warnings)
+        self.assertDictEqual(files, archive.files)
+
+    def test_other_version_ignored(self):
+        path = self.tmp_dir / 'contracts.json'
+        sphinx_icontract._disk_cache.write_archive(
+            archive=sphinx_icontract._disk_cache.Archive(version='some-version', files=dict()), path=str(path))
+
+        archive, warnings = self.load(path=path)
+        self.assertIsNone(archive)
+        self.assertEqual(1, len(warnings))
+        self.assertIn("'some-version'", warnings[0])
+
+    def test_missing_or_corrupt_ignored(self):
+        corrupt_path = self.tmp_dir / 'corrupt.json'
+        corrupt_path.write_text('[]')
+
+        for path in [self.tmp_dir / 'non_existing.json', corrupt_path]:
+            archive, warnings = self.load(path=path)
+            self.assertIsNone(archive)
+            self.assertEqual(1, len(warnings))
+            self.assertIn('could not be loaded', warnings[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
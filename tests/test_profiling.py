@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._profiling."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+# pylint: disable=unused-argument
+import json
+import unittest
+import unittest.mock
+from typing import List
+
+import icontract
+
+import sphinx_icontract
+import sphinx_icontract._profiling
+
+
+class TestProfiler(unittest.TestCase):
+    def test_nested_phases_exclusive(self):
+        profiler = sphinx_icontract._profiling.Profiler(cache_counters=dict())
+
+        with unittest.mock.patch('time.perf_counter', side_effect=[0.0, 1.0, 3.0, 10.0]):
+            profiler.enter(sphinx_icontract._profiling.REST_ASSEMBLY)
+            profiler.enter(sphinx_icontract._profiling.DECORATOR_INSPECTION)
+            self.assertEqual(2.0, profiler.exit())
+            self.assertEqual(10.0, profiler.exit())
+
+        self.assertEqual(2.0, profiler.phase_seconds[sphinx_icontract._profiling.DECORATOR_INSPECTION])
+        self.assertEqual(8.0, profiler.phase_seconds[sphinx_icontract._profiling.REST_ASSEMBLY])
+
+        jsonable = profiler.to_jsonable(cache_counters=dict())
+        self.assertEqual(10.0, jsonable['total_seconds'])
+
+    def test_objects_sorted_and_cache_counters_relative_to_start(self):
+        profiler = sphinx_icontract._profiling.Profiler(cache_counters={'contracts': (10, 5)})
+        profiler.record_object(what='function', name='fast', seconds=1.0)
+        profiler.record_object(what='class', name='slow', seconds=2.0)
+        profiler.record_object(what='function', name='fast', seconds=0.5)
+
+        jsonable = profiler.to_jsonable(cache_counters={'contracts': (13, 6), 'disk': (0, 0)})
+
+        self.assertListEqual([('slow', 2.0, 1), ('fast', 1.5, 2)],
+                             [(obj['name'], obj['seconds'], obj['events']) for obj in jsonable['objects']])
+
+        self.assertDictEqual({'hits': 3, 'misses': 1, 'hit_ratio': 0.75}, jsonable['caches']['contracts'])
+        self.assertIsNone(jsonable['caches']['disk']['hit_ratio'])
+
+        # The measurements need to be dumpable for the trend tracking.
+        json.dumps(jsonable)
+
+        summary = sphinx_icontract._profiling.format_summary(jsonable=jsonable, top=1)
+        self.assertIn('2 object(s)', summary)
+        self.assertIn('slow', summary)
+        self.assertNotIn('fast', summary)
+        self.assertIn('75.0%', summary)
+
+
+class TestProfiledRendering(unittest.TestCase):
+    def test_phases_and_objects_recorded(self):
+        @icontract.require(lambda x: x > 0, error=lambda: ValueError("x positive"))
+        @icontract.snapshot(lambda lst: lst[:])
+        @icontract.ensure(lambda OLD, lst: OLD.lst == lst)
+        def some_func(x: int, lst: List[int]) -> None:
+            pass
+
+        sphinx_icontract._reset_caches()
+
+        profiler = sphinx_icontract._profiling.Profiler(cache_counters=sphinx_icontract._cache_counters())
+        try:
+            sphinx_icontract._profiling.PROFILER = profiler
+
+            for _ in range(2):
+                lines = []  # type: List[str]
+                sphinx_icontract.process_docstring(
+                    app=None, what='function', name='some_func', obj=some_func, options=None, lines=lines)
+                self.assertEqual(8, len(lines))
+        finally:
+            sphinx_icontract._profiling.PROFILER = None
+
+        jsonable = profiler.to_jsonable(cache_counters=sphinx_icontract._cache_counters())
+
+        # The source file is looked up only once and the error lambda is inferred from the inspection of
+        # the condition in the same decorator.
+        expected_calls = {
+            sphinx_icontract._profiling.SOURCE_LOOKUP: 1,
+            sphinx_icontract._profiling.DECORATOR_INSPECTION: 3,
+            sphinx_icontract._profiling.AST_MATCHING: 4,
+            sphinx_icontract._profiling.REST_ASSEMBLY: 2
+        }
+
+        calls = {phase: measurement['calls'] for phase, measurement in jsonable['phases'].items()}
+        self.assertDictEqual(expected_calls, calls)
+
+        self.assertEqual(1, len(jsonable['objects']))
+        self.assertEqual('some_func', jsonable['objects'][0]['name'])
+        self.assertEqual(2, jsonable['objects'][0]['events'])
+        self.assertAlmostEqual(jsonable['total_seconds'], jsonable['objects'][0]['seconds'])
+
+        self.assertDictEqual({'hits': 2, 'misses': 2, 'hit_ratio': 0.5}, jsonable['caches']['contracts'])
+        self.assertDictEqual({'hits': 1, 'misses': 1, 'hit_ratio': 0.5}, jsonable['caches']['captures'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._render."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+# pylint: disable=unused-argument
+import unittest
+import unittest.mock
+from typing import Any
+
+import icontract
+
+import sphinx_icontract
+
+
+class TestErrorInference(unittest.TestCase):
+    def setUp(self) -> None:
+        sphinx_icontract._render.CONTRACT_CACHE.clear()
+        sphinx_icontract._render.ERROR_CACHE.clear()
+        sphinx_icontract._render.ERROR_CODE_CACHE.clear()
+
+    def test_shared_error_inferred_once(self):
+        error = lambda: ValueError("x positive")  # pylint: disable=unnecessary-lambda-assignment
+
+        @icontract.require(lambda x: x > 0, error=error)
+        def some_func(x: int) -> None:
+            pass
+
+        @icontract.require(lambda x: x > 1, error=error)
+        def another_func(x: int) -> None:
+            pass
+
+        with unittest.mock.patch.object(
+                sphinx_icontract._render,
+                'error_node_type_and_message',
+                wraps=sphinx_icontract._render.error_node_type_and_message) as error_node_type_and_message:
+            for func, condition in [(some_func, 'x > 0'), (another_func, 'x > 1')]:
+                self.assertListEqual(
+                    [
+                        ':requires:', '    * :code:`{}`'.format(condition), '',
+                        '      (x positive; raise :py:class:`ValueError`)'
+                    ],
+                    sphinx_icontract._format.format_function_contracts(func=func))
+
+        self.assertEqual(1, error_node_type_and_message.call_count)
+        self.assertEqual((1, 1),
+                         (sphinx_icontract._render.ERROR_CACHE.hits, sphinx_icontract._render.ERROR_CACHE.misses))
+
+    def test_decorator_inspected_once_for_condition_and_error(self):
+        @icontract.require(lambda x: x > 0, error=lambda: ValueError("x positive"))
+        def some_func(x: int) -> None:
+            pass
+
+        with unittest.mock.patch.object(
+                sphinx_icontract._index, 'inspect_decorator',
+                wraps=sphinx_icontract._index.inspect_decorator) as inspect_decorator:
+            lines = sphinx_icontract._format.format_function_contracts(func=some_func)
+
+        self.assertListEqual(
+            [':requires:', '    * :code:`x > 0`', '', '      (x positive; raise :py:class:`ValueError`)'], lines)
+        self.assertEqual(1, inspect_decorator.call_count)
+
+    def test_error_lambdas_of_the_same_decorator_inferred_once(self):
+        def make_func() -> Any:
+            @icontract.require(lambda x: x > 0, error=lambda: ValueError("x positive"))
+            def some_func(x: int) -> None:
+                pass
+
+            return some_func
+
+        funcs = [make_func() for _ in range(3)]
+
+        for func in funcs:
+            sphinx_icontract._format.format_function_contracts(func=func)
+
+        # Each error lambda is a different object, but all of them share the code.
+        self.assertEqual(3, sphinx_icontract._render.ERROR_CACHE.misses)
+        self.assertEqual(
+            (2, 1), (sphinx_icontract._render.ERROR_CODE_CACHE.hits, sphinx_icontract._render.ERROR_CODE_CACHE.misses))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._render_cache."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+# pylint: disable=no-member
+# pylint: disable=unused-argument
+import gc
+import unittest
+import unittest.mock
+from typing import List
+
+import icontract
+import icontract._checkers
+
+import sphinx_icontract
+
+
+class TestRenderCache(unittest.TestCase):
+    def test_inherited_contracts_rendered_once(self):
+        @icontract.invariant(lambda self: self.some_getter() > 0)
+        class SomeBase(icontract.DBC):
+            def some_getter(self) -> int:
+                return 1
+
+            @icontract.require(lambda x: x > 0)
+            def some_func(self, x: int) -> None:
+                pass
+
+        class SomeClass(SomeBase):
+            def some_func(self, x: int) -> None:
+                pass
+
+        class AnotherClass(SomeClass):
+            def some_func(self, x: int) -> None:
+                pass
+
+        hits = sphinx_icontract._render.CONTRACT_CACHE.hits
+        misses = sphinx_icontract._render.CONTRACT_CACHE.misses
+
+        for cls in [SomeBase, SomeClass, AnotherClass]:
+            lines = sphinx_icontract._format.format_contracts(what='class', obj=cls)
+            self.assertListEqual([':establishes:', '    * :code:`self.some_getter() > 0`'], lines)
+
+            lines = sphinx_icontract._format.format_contracts(what='method', obj=cls.some_func)
+            self.assertListEqual([':requires:', '    * :code:`x > 0`'], lines)
+
+        self.assertEqual(2, sphinx_icontract._render.CONTRACT_CACHE.misses - misses)
+        self.assertEqual(4, sphinx_icontract._render.CONTRACT_CACHE.hits - hits)
+
+    def test_snapshot_capture_rendered_once(self):
+        class SomeBase(icontract.DBC):
+            @icontract.snapshot(lambda lst: lst[:])
+            @icontract.ensure(lambda OLD, lst: OLD.lst == lst)
+            def some_func(self, lst: List[int]) -> None:
+                pass
+
+        class SomeClass(SomeBase):
+            def some_func(self, lst: List[int]) -> None:
+                pass
+
+        hits = sphinx_icontract._render.CAPTURE_CACHE.hits
+
+        for cls in [SomeBase, SomeClass]:
+            lines = sphinx_icontract._format.format_contracts(what='method', obj=cls.some_func)
+            self.assertListEqual(
+                [':OLD:', '    * :code:`.lst` = :code:`lst[:]`', ':ensures:', '    * :code:`OLD.lst == lst`'], lines)
+
+        self.assertEqual(1, sphinx_icontract._render.CAPTURE_CACHE.hits - hits)
+
+    def test_reset(self):
+        @icontract.require(lambda x: x > 0, error=lambda: ValueError("x positive"))
+        @icontract.snapshot(lambda lst: lst[:])
+        @icontract.ensure(lambda OLD, lst: OLD.lst == lst)
+        def some_func(x: int, lst: List[int]) -> None:
+            pass
+
+        sphinx_icontract._format.format_contracts(what='function', obj=some_func)
+
+        caches = [
+            sphinx_icontract._render.CONTRACT_CACHE, sphinx_icontract._render.CAPTURE_CACHE,
+            sphinx_icontract._render.ERROR_CACHE, sphinx_icontract._format.CHECKER_CACHE
+        ]
+        self.assertTrue(all(len(cache) > 0 for cache in caches))
+
+        sphinx_icontract._reset_caches()
+        self.assertListEqual([0, 0, 0, 0], [len(cache) for cache in caches])
+
+    def test_checker_looked_up_once(self):
+        def plain_func(x: int) -> None:
+            pass
+
+        @icontract.require(lambda x: x > 0)
+        def some_func(x: int) -> None:
+            pass
+
+        class SomeClass:
+            @property
+            def some_prop(self) -> int:
+                return 1
+
+            @some_prop.setter
+            @icontract.require(lambda value: value > 0)
+            def some_prop(self, value: int) -> None:
+                pass
+
+            @classmethod
+            def some_class_method(cls) -> None:
+                pass
+
+        some_prop = vars(SomeClass)['some_prop']
+
+        with unittest.mock.patch.object(
+                icontract._checkers, 'find_checker', wraps=icontract._checkers.find_checker) as find_checker:
+            for _ in range(3):
+                lines = sphinx_icontract._format.format_contracts(what='function', obj=plain_func)
+                self.assertListEqual([], lines)
+
+                lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
+                self.assertListEqual([':requires:', '    * :code:`x > 0`'], lines)
+
+                lines = sphinx_icontract._format.format_contracts(what='attribute', obj=some_prop)
+                self.assertListEqual([':set requires:', '    * :code:`value > 0`'], lines)
+
+                # The bound method is created anew on each access.
+                lines = sphinx_icontract._format.format_contracts(what='method', obj=SomeClass.some_class_method)
+                self.assertListEqual([], lines)
+
+        # Plain function, function with contracts, getter and setter of the property and the class method
+        self.assertEqual(5, find_checker.call_count)
+
+    def test_bounded(self):
+        cache = sphinx_icontract._render_cache.RenderCache(maxsize=2)
+
+        def some_func() -> None:
+            pass
+
+        def another_func() -> None:
+            pass
+
+        def yet_another_func() -> None:
+            pass
+
+        cache.put(some_func, sphinx_icontract.Lines(['some']))
+        cache.put(another_func, sphinx_icontract.Lines(['another']))
+
+        # Mark some_func as recently used so that another_func is evicted.
+        self.assertListEqual(['some'], cache.get(some_func))
+
+        cache.put(yet_another_func, sphinx_icontract.Lines(['yet another']))
+
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get(another_func))
+        self.assertListEqual(['some'], cache.get(some_func))
+        self.assertListEqual(['yet another'], cache.get(yet_another_func))
+        self.assertEqual(3, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+    def test_weak_references(self):
+        cache = sphinx_icontract._render_cache.RenderCache(maxsize=2)
+
+        def some_func() -> None:
+            pass
+
+        cache.put(some_func, sphinx_icontract.Lines(['some']))
+        self.assertEqual(1, len(cache))
+
+        del some_func
+        gc.collect()
+
+        self.assertEqual(0, len(cache))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._source."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+import linecache
+import os
+import pathlib
+import tempfile
+import unittest
+import unittest.mock
+
+import sphinx_icontract
+import sphinx_icontract._source
+
+import tests.common
+
+
+class TestSourceFile(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = pathlib.Path(tmp_dir.name)
+
+    def test_lines_as_in_linecache(self):
+        # yapf: disable
+        contents = [
+            b'',
+            b'\n',
+            b'x = 1',
+            b'x = 1\ny = 2\n',
+            b'x = 1\r\ny = 2\r\n',
+            b'x = 1\n\n\ny = 2',
+            b'\xef\xbb\xbfx = "\xc3\xa4"\n',
+            b'# -*- coding: latin-1 -*-\nx = "\xe4"\n',
+            b'x = 1\x0c\ny = "\xe2\x80\xa8"\n',
+        ]
+        # yapf: enable
+
+        for i, content in enumerate(contents):
+            path = self.tmp_dir / 'some_module_{}.py'.format(i)
+            path.write_bytes(content)
+
+            source = sphinx_icontract._source.open_source(path=str(path))
+            assert source is not None
+
+            expected = linecache.getlines(str(path))
+            self.assertEqual(expected, source.lines(start=0, end=len(source)), 'content: {!r}'.format(content))
+            self.assertEqual(len(expected), len(source))
+            self.assertEqual(''.join(expected), source.text())
+
+            for start in range(len(expected) + 1):
+                for end in range(start, len(expected) + 2):
+                    self.assertEqual(expected[start:end], source.lines(start=start, end=end))
+
+    def test_no_file(self):
+        self.assertIsNone(sphinx_icontract._source.open_source(path='<string>'))
+        self.assertIsNone(sphinx_icontract._source.open_source(path=str(self.tmp_dir / 'non_existing.py')))
+        self.assertIsNone(sphinx_icontract._source.open_source(path=str(self.tmp_dir)))
+
+    def test_lone_carriage_return(self):
+        path = self.tmp_dir / 'some_module.py'
+        path.write_bytes(b'x = 1\ry = 2\n')
+
+        self.assertIsNone(sphinx_icontract._source.open_source(path=str(path)))
+
+    def test_size_and_memory(self):
+        path = self.tmp_dir / 'some_module.py'
+        path.write_bytes(b'x = 1\ny = 2\nz = 3\n')
+
+        source = sphinx_icontract._source.open_source(path=str(path))
+        assert source is not None
+
+        self.assertEqual(18, source.size())
+        self.assertEqual(3 * 8, source.memory())
+
+    def test_close(self):
+        path = self.tmp_dir / 'some_module.py'
+        path.write_bytes(b'x = 1\ny = 2\n')
+
+        source = sphinx_icontract._source.open_source(path=str(path))
+        assert source is not None
+
+        source.close()
+        self.assertIsNone(source._data)
+        self.assertEqual(12, source.size())
+
+        # The file is mapped again on access.
+        self.assertEqual(['y = 2\n'], source.lines(start=1, end=2))
+
+        source.close()
+        path.write_bytes(b'x = 1\n')
+        with self.assertRaises(ValueError):
+            source.lines(start=0, end=1)
+
+    def test_closed_on_eviction(self):
+        sources = []
+        indexes = sphinx_icontract._index.SourceIndexes()
+        indexes.budget = 1
+
+        for i in range(2):
+            path = self.tmp_dir / 'some_module_{}.py'.format(i)
+            path.write_bytes(b'x = 1\n')
+
+            source = sphinx_icontract._source.open_source(path=str(path))
+            assert source is not None
+            sources.append(source)
+
+            indexes.put(
+                filename=str(path),
+                index=sphinx_icontract._index.SourceIndex(text=None, filename=str(path), source=source))
+
+        self.assertIsNone(sources[0]._data)
+        self.assertIsNotNone(sources[1]._data)
+
+        indexes.clear()
+        self.assertIsNone(sources[1]._data)
+
+    def test_parsed_released(self):
+        path = self.tmp_dir / 'some_module.py'
+        path.write_bytes(b'x = 1\ny = 2\n')
+
+        source = sphinx_icontract._source.open_source(path=str(path))
+        assert source is not None
+
+        index = sphinx_icontract._index.SourceIndex(text=source.text(), filename=str(path), source=source)
+        self.assertIsNotNone(index.atok)
+        self.assertIsNone(source._data)
+
+        # The lines are still sliced from the file mapped only for the slicing.
+        self.assertListEqual(['y = 2\n'], source.lines(start=1, end=2))
+        self.assertIsNone(source._data)
+
+
+class TestInspectDecoratorInWindow(unittest.TestCase):
+    def setUp(self) -> None:
+        sphinx_icontract._index.SOURCE_INDEXES.clear()
+        self.addCleanup(sphinx_icontract._index.SOURCE_INDEXES.clear)
+
+    def test_unparsable_file(self):
+        module = tests.common.import_source(
+            self,
+            name='windowed_module',
+            text='''\
+            import icontract
+
+
+            @icontract.require(
+                lambda x:
+                x > 0
+            )
+            def some_func(x: int) -> None:
+                pass
+            ''')
+
+        condition = module.some_func.__preconditions__[0][0].condition
+
+        # The file changed after the import so that it can not be parsed as a whole any more.
+        with pathlib.Path(module.__file__).open('at', encoding='utf-8') as fid:
+            fid.write('def broken(:\n')
+
+        for window in [64, 1]:
+            sphinx_icontract._index.SOURCE_INDEXES.clear()
+
+            with unittest.mock.patch.object(sphinx_icontract._index, 'DECORATOR_WINDOW', window):
+                decorator_inspection = sphinx_icontract._index.inspect_decorator(func=condition)
+
+            self.assertEqual('icontract.require(\n    lambda x:\n    x > 0\n)',
+                             decorator_inspection.atok.get_text(decorator_inspection.node))
+
+
+class TestMemoryBudget(unittest.TestCase):
+    def setUp(self) -> None:
+        self.module, self.another_module = [
+            tests.common.import_source(
+                self,
+                name=name,
+                text='''\
+                import icontract
+
+
+                @icontract.require(lambda y: y > 0)
+                def another_func(y: int) -> None:
+                    pass
+
+
+                SHARED_ERROR = lambda: ValueError("x positive")
+
+
+                @icontract.require(lambda x: x > 0, error=SHARED_ERROR)
+                @icontract.ensure(
+                    lambda result:
+                    result > 0 and
+                    result < 100
+                )
+                @icontract.ensure(lambda result: result != 42, error=lambda: ValueError("not the answer"))
+                def some_func(x: int) -> int:
+                    return x
+                ''') for name in ['budgeted_module', 'another_budgeted_module']
+        ]
+
+        sphinx_icontract._render.CONTRACT_CACHE.clear()
+        self.addCleanup(sphinx_icontract._render.CONTRACT_CACHE.clear)
+
+        sphinx_icontract._render.ERROR_CACHE.clear()
+        self.addCleanup(sphinx_icontract._render.ERROR_CACHE.clear)
+
+        sphinx_icontract._render.ERROR_CODE_CACHE.clear()
+        self.addCleanup(sphinx_icontract._render.ERROR_CODE_CACHE.clear)
+
+        sphinx_icontract._index.SOURCE_INDEXES.clear()
+        self.addCleanup(sphinx_icontract._index.SOURCE_INDEXES.clear)
+        self.addCleanup(setattr, sphinx_icontract._index.SOURCE_INDEXES, 'budget', None)
+
+    def test_least_recently_used_evicted(self):
+        some_path = self.module.__file__
+        another_path = self.another_module.__file__
+
+        # The budget fits the parse state of a single file, but not of both.
+        sphinx_icontract._index.SOURCE_INDEXES.budget = int(
+            1.5 * (len(pathlib.Path(some_path).read_text(
+                encoding='utf-8')) * sphinx_icontract._index.PARSE_STATE_PER_CHARACTER))
+
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=self.module.some_func)
+        self.assertListEqual([some_path], sphinx_icontract._index.SOURCE_INDEXES.keys())
+        self.assertIsNotNone(sphinx_icontract._index.SOURCE_INDEXES.get(some_path).atok)  # type: ignore
+
+        another_lines = sphinx_icontract._format.format_contracts(what='function', obj=self.another_module.some_func)
+        self.assertListEqual(lines, another_lines)
+
+        self.assertListEqual([another_path], sphinx_icontract._index.SOURCE_INDEXES.keys())
+        self.assertEqual(1, sphinx_icontract._index.SOURCE_INDEXES.evictions)
+        self.assertLessEqual(sphinx_icontract._index.SOURCE_INDEXES.size, sphinx_icontract._index.SOURCE_INDEXES.budget)
+
+        # The evicted file is indexed again on the next access.
+        sphinx_icontract._render.CONTRACT_CACHE.clear()
+        self.assertListEqual(lines, sphinx_icontract._format.format_contracts(
+            what='function', obj=self.module.some_func))
+        self.assertListEqual([some_path], sphinx_icontract._index.SOURCE_INDEXES.keys())
+        self.assertEqual(2, sphinx_icontract._index.SOURCE_INDEXES.evictions)
+
+    def test_file_over_budget_not_parsed_as_a_whole(self):
+        expected = sphinx_icontract._format.format_contracts(what='function', obj=self.module.some_func)
+
+        # The shared error lambda is defined outside of the decorators.
+        self.assertIn('      (x positive; raise :py:class:`ValueError`)', expected)
+        self.assertIn('      (not the answer; raise :py:class:`ValueError`)', expected)
+
+        sphinx_icontract._render.CONTRACT_CACHE.clear()
+        sphinx_icontract._index.SOURCE_INDEXES.clear()
+        sphinx_icontract._index.SOURCE_INDEXES.budget = 1
+
+        for window in [64, 1]:
+            sphinx_icontract._render.CONTRACT_CACHE.clear()
+            sphinx_icontract._render.ERROR_CACHE.clear()
+            sphinx_icontract._render.ERROR_CODE_CACHE.clear()
+            sphinx_icontract._index.SOURCE_INDEXES.clear()
+
+            with unittest.mock.patch.object(sphinx_icontract._index, 'DECORATOR_WINDOW', window):
+                lines = sphinx_icontract._format.format_contracts(what='function', obj=self.module.some_func)
+
+            self.assertListEqual(expected, lines)
+
+            index = sphinx_icontract._index.SOURCE_INDEXES.get(self.module.__file__)
+            assert index is not None
+            self.assertIsNone(index.atok)
+            self.assertEqual(index.source.memory(), index.size)  # type: ignore
+
+        # The pre-rendering inspects the decorators in the windows as well.
+        sphinx_icontract._index.SOURCE_INDEXES.clear()
+        condition = self.module.some_func.__preconditions__[0][0].condition
+        prerendered = sphinx_icontract._prerender.prerender_file(
+            filename=condition.__code__.co_filename, keys=[(condition.__code__.co_firstlineno, 'condition')])
+        self.assertEqual(1, len(prerendered))
+
+
+@unittest.skipIf(not os.path.isdir('/proc/self/fd'), "The open file descriptors can not be listed")
+class TestOpenFiles(unittest.TestCase):
+    def setUp(self) -> None:
+        sphinx_icontract._reset_caches()
+        self.addCleanup(sphinx_icontract._reset_caches)
+
+    def test_no_file_descriptors_left_open(self):
+        modules = [
+            tests.common.import_source(
+                self,
+                name='open_files_module_{}'.format(i),
+                text='''\
+                import icontract
+
+
+                @icontract.require(lambda x: x > 0)
+                def some_func(x: int) -> None:
+                    pass
+                ''') for i in range(100)
+        ]
+
+        before = len(os.listdir('/proc/self/fd'))
+
+        for module in modules:
+            sphinx_icontract.render_module(module=module)
+
+        self.assertEqual(len(modules), len(sphinx_icontract._index.SOURCE_INDEXES))
+        self.assertEqual(before, len(os.listdir('/proc/self/fd')))
+
+
+if __name__ == '__main__':
+    unittest.main()
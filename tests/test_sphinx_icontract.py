@@ -9,9 +9,11 @@
 # pylint: disable=unused-argument
 import pathlib
 import unittest
+import unittest.mock
 from typing import List, Any
 
 import icontract
+import icontract._checkers
 
 import sphinx_icontract
 
@@ -22,7 +24,7 @@ class TestFormatCondition(unittest.TestCase):
         def some_func(x: int) -> bool:
             return True
 
-        lines = sphinx_icontract._format_function_contracts(func=some_func)
+        lines = sphinx_icontract._format.format_function_contracts(func=some_func)
         self.assertListEqual([':requires:', '    * :code:`x > 0`'], lines)
 
     def test_implies_with_not_or(self):
@@ -30,7 +32,7 @@ class TestFormatCondition(unittest.TestCase):
         def some_func(x: int) -> bool:
             return True
 
-        lines = sphinx_icontract._format_function_contracts(func=some_func)
+        lines = sphinx_icontract._format.format_function_contracts(func=some_func)
         self.assertListEqual([':requires:', '    * :code:`x > 0` ⇒ :code:`x < 100`'], lines)
 
     def test_implies_with_comparison_or(self):
@@ -46,7 +48,7 @@ class TestFormatCondition(unittest.TestCase):
         def some_func(x: int) -> bool:
             return True
 
-        lines = sphinx_icontract._format_function_contracts(func=some_func)
+        lines = sphinx_icontract._format.format_function_contracts(func=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -71,7 +73,7 @@ class TestFormatCondition(unittest.TestCase):
         def another_func(x: int, y: int) -> None:
             return
 
-        lines = sphinx_icontract._format_function_contracts(func=another_func)
+        lines = sphinx_icontract._format.format_function_contracts(func=another_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -94,7 +96,7 @@ class TestFormatCondition(unittest.TestCase):
         def some_func(x: Any, y: int) -> None:
             return
 
-        lines = sphinx_icontract._format_function_contracts(func=some_func)
+        lines = sphinx_icontract._format.format_function_contracts(func=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -116,7 +118,7 @@ class TestFormatCondition(unittest.TestCase):
         def some_func(x: int) -> bool:
             return True
 
-        lines = sphinx_icontract._format_function_contracts(func=some_func)
+        lines = sphinx_icontract._format.format_function_contracts(func=some_func)
         self.assertListEqual([':requires:', '    * :code:`x > 0` ⇒ :code:`x < 100 and x % 3 == 0`'], lines)
 
     def test_implies_with_if_else_true(self):
@@ -124,7 +126,7 @@ class TestFormatCondition(unittest.TestCase):
         def some_func(x: Any, y: int) -> None:
             return
 
-        lines = sphinx_icontract._format_function_contracts(func=some_func)
+        lines = sphinx_icontract._format.format_function_contracts(func=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -140,14 +142,14 @@ class TestFormatContracts(unittest.TestCase):
         def some_func(x: int) -> int:
             return x
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
         self.assertListEqual([], lines)
 
     def test_class_wo_contracts(self):
         class SomeClass:
             pass
 
-        lines = sphinx_icontract._format_contracts(what='class', obj=SomeClass)
+        lines = sphinx_icontract._format.format_contracts(what='class', obj=SomeClass)
         self.assertListEqual([], lines)
 
     def test_pre_single_line(self):
@@ -155,7 +157,7 @@ class TestFormatContracts(unittest.TestCase):
         def some_func(x: int) -> int:
             return x
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
         self.assertListEqual(
             [
                 # yapf: disable
@@ -179,7 +181,7 @@ class TestFormatContracts(unittest.TestCase):
         def some_func(lst: List[int]) -> None:
             pass
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -202,7 +204,7 @@ class TestFormatContracts(unittest.TestCase):
         def some_func(x: int) -> int:
             return x
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
         self.assertListEqual(
             [
                 # yapf: disable
@@ -225,7 +227,7 @@ class TestFormatContracts(unittest.TestCase):
         def some_func() -> List[int]:
             return [1, 2, 3]
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -256,7 +258,7 @@ class TestFormatContracts(unittest.TestCase):
         def resolve_initial_paths(initial_paths: List[pathlib.Path]) -> List[pathlib.Path]:
             pass
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=resolve_initial_paths)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=resolve_initial_paths)
 
         self.assertListEqual(
             [
@@ -275,7 +277,7 @@ class TestFormatContracts(unittest.TestCase):
         def some_func(x: int) -> int:
             return x
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
         self.assertListEqual(
             [
                 # yapf: disable
@@ -296,7 +298,7 @@ class TestFormatContracts(unittest.TestCase):
         def some_func(lst: List[int], value: int) -> None:
             lst.append(value)
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
         # yapf: disable
         self.assertListEqual(
             [
@@ -333,7 +335,7 @@ class TestFormatContracts(unittest.TestCase):
         def some_func(lst: List[int]) -> None:
             pass
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -370,7 +372,7 @@ class TestFormatContracts(unittest.TestCase):
         def some_func(lst: List[int], value: int) -> None:
             lst.append(value)
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -390,7 +392,7 @@ class TestFormatContracts(unittest.TestCase):
         def some_func(x: int) -> int:
             return x
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
         self.assertListEqual(
             [
                 # yapf: disable
@@ -414,7 +416,7 @@ class TestFormatContracts(unittest.TestCase):
             def some_getter(self) -> int:
                 return 1
 
-        lines = sphinx_icontract._format_contracts(what='class', obj=SomeClass)
+        lines = sphinx_icontract._format.format_contracts(what='class', obj=SomeClass)
         # yapf: disable
         self.assertListEqual(
             [
@@ -445,7 +447,7 @@ class TestFormatContracts(unittest.TestCase):
             def do_something(self) -> None:
                 ...
 
-        lines = sphinx_icontract._format_contracts(what='class', obj=SomeClass)
+        lines = sphinx_icontract._format.format_contracts(what='class', obj=SomeClass)
 
         # yapf: disable
         self.assertListEqual(
@@ -471,7 +473,7 @@ class TestFormatContracts(unittest.TestCase):
             def some_getter(self) -> int:
                 return 1
 
-        lines = sphinx_icontract._format_contracts(what='class', obj=SomeClass)
+        lines = sphinx_icontract._format.format_contracts(what='class', obj=SomeClass)
         self.assertListEqual(
             [
                 # yapf: disable
@@ -515,7 +517,7 @@ class TestFormatContracts(unittest.TestCase):
                 """Delete some property."""
                 self.dels += 1
 
-        lines = sphinx_icontract._format_contracts(what='attribute', obj=SomeClass.some_property)
+        lines = sphinx_icontract._format.format_contracts(what='attribute', obj=SomeClass.some_property)
         # yapf: disable
         self.assertListEqual(
             [':get OLD:',
@@ -566,10 +568,10 @@ class TestFormatContracts(unittest.TestCase):
             def some_func(self, x: int) -> int:
                 return x
 
-        lines = sphinx_icontract._format_contracts(what='class', obj=SomeAbstract)
+        lines = sphinx_icontract._format.format_contracts(what='class', obj=SomeAbstract)
         self.assertListEqual([':establishes:', '    * :code:`self.some_getter() > 0`'], lines)
 
-        lines = sphinx_icontract._format_contracts(what='class', obj=SomeClass)
+        lines = sphinx_icontract._format.format_contracts(what='class', obj=SomeClass)
         self.assertListEqual(
             [
                 # yapf: disable
@@ -580,7 +582,7 @@ class TestFormatContracts(unittest.TestCase):
             ],
             lines)
 
-        lines = sphinx_icontract._format_contracts(what='method', obj=SomeClass.some_func)
+        lines = sphinx_icontract._format.format_contracts(what='method', obj=SomeClass.some_func)
 
         self.assertListEqual(
             [
@@ -613,7 +615,7 @@ class TestFormatContracts(unittest.TestCase):
                 value = value * 1000  # do something to make the toy example meaningful
                 super().some_func(lst, value)
 
-        lines = sphinx_icontract._format_contracts(what='method', obj=SomeClass.some_func)
+        lines = sphinx_icontract._format.format_contracts(what='method', obj=SomeClass.some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -634,7 +636,7 @@ class TestError(unittest.TestCase):
         def some_func(x: int) -> None:
             pass
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -654,7 +656,7 @@ class TestError(unittest.TestCase):
         def some_func(x: int) -> None:
             pass
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -672,7 +674,7 @@ class TestError(unittest.TestCase):
         def some_func(x: int) -> None:
             pass
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -693,7 +695,7 @@ class TestError(unittest.TestCase):
         def some_func(x: int) -> None:
             pass
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -715,7 +717,7 @@ class TestError(unittest.TestCase):
         def some_func(x: int) -> None:
             pass
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -734,7 +736,7 @@ class TestError(unittest.TestCase):
         def some_func(x: int) -> None:
             pass
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -752,7 +754,7 @@ class TestError(unittest.TestCase):
         def some_func(x: int) -> None:
             pass
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -773,7 +775,7 @@ class TestError(unittest.TestCase):
         def some_func(x: int) -> None:
             pass
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -792,7 +794,7 @@ class TestError(unittest.TestCase):
         def some_func(x: int) -> None:
             pass
 
-        lines = sphinx_icontract._format_contracts(what='function', obj=some_func)
+        lines = sphinx_icontract._format.format_contracts(what='function', obj=some_func)
 
         # yapf: disable
         self.assertListEqual(
@@ -806,5 +808,17 @@ class TestError(unittest.TestCase):
         # yapf: enable
 
 
+class TestSelfChecks(unittest.TestCase):
+    def test_enabled_in_slow_mode(self):
+        assert icontract.SLOW, \
+            "Slow contracts need to be enabled by setting the environment variable ICONTRACT_SLOW."
+
+        with self.assertRaises(icontract.ViolationError):
+            sphinx_icontract.Lines(['some\nline'])
+
+        with self.assertRaises(icontract.ViolationError):
+            sphinx_icontract._format.format_preconditions(preconditions=[], prefix=' get ')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Test sphinx_icontract._statistics."""
+
+# pylint: disable=missing-docstring
+# pylint: disable=protected-access
+import json
+import pathlib
+import types
+import unittest
+import unittest.mock
+from typing import Any, List
+
+import sphinx_icontract
+import sphinx_icontract._statistics
+
+import tests.common
+
+
+class TestAggregation(unittest.TestCase):
+    def test_objects_deduplicated_and_grouped_by_module(self):
+        some_func = sphinx_icontract._statistics.ObjectStatistics(what='function', module='some_module')
+        some_func.kinds.update({'requires': 2, 'ensures': 1})
+        some_func.paths.update({'plain': 2, 'implication': 1})
+
+        another_func = sphinx_icontract._statistics.ObjectStatistics(what='function', module='some_module')
+
+        some_class = sphinx_icontract._statistics.ObjectStatistics(what='class', module='another_module')
+        some_class.kinds.update({'establishes': 1})
+        some_class.paths.update({'multi-line': 1})
+
+        jsonable = sphinx_icontract._statistics.to_jsonable(objects=[('some_module.some_func', another_func), (
+            'some_module.some_func', some_func), ('some_module.another_func',
+                                                  another_func), ('another_module.SomeClass', some_class)])
+
+        self.assertEqual(3, jsonable['objects'])
+        self.assertEqual(2, jsonable['with_contracts'])
+        self.assertEqual(4, jsonable['contracts'])
+
+        self.assertDictEqual({
+            'requires': 2,
+            'requires else': 0,
+            'OLD': 0,
+            'ensures': 1,
+            'establishes': 1
+        }, dict(jsonable['kinds']))
+        self.assertDictEqual({
+            'plain': 2,
+            'implication': 1,
+            'multi-line': 1,
+            'pattern': 0,
+            'function': 0
+        }, dict(jsonable['paths']))
+
+        self.assertListEqual(['another_module', 'some_module'], list(jsonable['modules'].keys()))
+        self.assertEqual(0.5, jsonable['modules']['some_module']['coverage'])
+        self.assertEqual(3, jsonable['modules']['some_module']['contracts'])
+
+        # The statistics need to be dumpable for the trend tracking.
+        json.dumps(jsonable)
+
+        summary = sphinx_icontract._statistics.format_summary(jsonable=jsonable)
+        self.assertIn('2 of 3 documented object(s) with contracts, 4 contract(s)', summary)
+        self.assertIn('50.0%', summary)
+
+
+class TestCollectedStatistics(unittest.TestCase):
+    def setUp(self) -> None:
+        self.module = tests.common.import_source(
+            self,
+            name='counted_module',
+            text='''\
+            import icontract
+
+
+            def is_positive(x: int) -> bool:
+                return x > 0
+
+
+            @icontract.require(lambda x: x > 0)
+            @icontract.require(lambda x, y: not (x > 1) or y > 1)
+            @icontract.require(is_positive)
+            @icontract.snapshot(lambda y: y)
+            @icontract.ensure(
+                lambda x, result:
+                result > x and
+                result > 0
+            )
+            def some_func(x: int, y: int) -> int:
+                return x + y
+
+
+            def another_func() -> None:
+                pass
+
+
+            @icontract.invariant(lambda self: self.x > 0)
+            class SomeBase(icontract.DBC):
+                def __init__(self) -> None:
+                    self.x = 1
+
+                @icontract.require(lambda x: x > 0)
+                def some_method(self, x: int) -> None:
+                    pass
+
+                @property
+                @icontract.ensure(lambda result: result > 0)
+                def some_prop(self) -> int:
+                    return self.x
+
+
+            class SomeClass(SomeBase):
+                @icontract.require(lambda x: x > -10)
+                def some_method(self, x: int) -> None:
+                    pass
+            ''')
+
+        self.uncounted_module = tests.common.import_source(
+            self,
+            name='uncounted_module',
+            text='''\
+            def yet_another_func() -> None:
+                pass
+            ''')
+
+        sphinx_icontract._render.CONTRACT_CACHE.clear()
+        sphinx_icontract._CONTRACT_FREE_MODULES.clear()
+        self.addCleanup(sphinx_icontract._CONTRACT_FREE_MODULES.clear)
+
+        self.env = types.SimpleNamespace(temp_data={'docname': 'some_doc'})
+
+    def process(self) -> None:
+        # yapf: disable
+        objects = [
+            ('counted_module', 'module', self.module),
+            ('counted_module.some_func', 'function', self.module.some_func),
+            ('counted_module.another_func', 'function', self.module.another_func),
+            ('counted_module.SomeBase', 'class', self.module.SomeBase),
+            ('counted_module.SomeBase.some_method', 'method', self.module.SomeBase.some_method),
+            ('counted_module.SomeBase.some_prop', 'attribute', self.module.SomeBase.some_prop),
+            ('counted_module.SomeClass.some_method', 'method', self.module.SomeClass.some_method),
+            ('uncounted_module.yet_another_func', 'function', self.uncounted_module.yet_another_func)
+        ]
+        # yapf: enable
+
+        app = types.SimpleNamespace(env=self.env)
+        for name, what, obj in objects:
+            sphinx_icontract.process_docstring(app=app, what=what, name=name, obj=obj, options=None, lines=[])
+
+    def test_counted(self):
+        extract_contract = unittest.mock.Mock(wraps=sphinx_icontract._render.extract_contract)
+
+        with unittest.mock.patch.object(sphinx_icontract, '_STATISTICS', True), \
+                unittest.mock.patch.object(sphinx_icontract._render, 'extract_contract', extract_contract):
+            self.process()
+
+        # The statistics are counted from the renderings and the contracts are not extracted again.
+        self.assertEqual(8, extract_contract.call_count)
+
+        statistics = self.env.icontract_documents['some_doc'].statistics
+        self.assertListEqual([
+            'counted_module.some_func', 'counted_module.another_func', 'counted_module.SomeBase',
+            'counted_module.SomeBase.some_method', 'counted_module.SomeBase.some_prop',
+            'counted_module.SomeClass.some_method', 'uncounted_module.yet_another_func'
+        ], list(statistics.keys()))
+
+        some_func = statistics['counted_module.some_func']
+        self.assertDictEqual({'requires': 3, 'OLD': 1, 'ensures': 1}, dict(some_func.kinds))
+        self.assertDictEqual({'plain': 1, 'implication': 1, 'function': 1, 'multi-line': 1}, dict(some_func.paths))
+
+        # The inherited preconditions are counted as well.
+        self.assertDictEqual({
+            'requires': 1,
+            'requires else': 1
+        }, dict(statistics['counted_module.SomeClass.some_method'].kinds))
+
+        jsonable = sphinx_icontract._statistics.to_jsonable(objects=statistics.items())
+        self.assertEqual(5, jsonable['modules']['counted_module']['with_contracts'])
+        self.assertEqual(6, jsonable['modules']['counted_module']['objects'])
+        self.assertEqual(0.0, jsonable['modules']['uncounted_module']['coverage'])
+
+    def test_not_collected_if_disabled(self):
+        with unittest.mock.patch.object(sphinx_icontract, '_object_statistics', side_effect=AssertionError):
+            self.process()
+
+        self.assertDictEqual(dict(), self.env.icontract_documents['some_doc'].statistics)
+
+    def test_report_at_build_finished(self):
+        with unittest.mock.patch.object(sphinx_icontract, '_STATISTICS', True):
+            self.process()
+
+            json_path = pathlib.Path(self.module.__file__).parent / 'statistics.json'
+            app = types.SimpleNamespace(
+                env=self.env, config=types.SimpleNamespace(icontract_statistics_json=str(json_path)))
+
+            logged = []  # type: List[Any]
+            with unittest.mock.patch('sphinx.util.logging.getLogger') as get_logger:
+                get_logger.return_value.info.side_effect = logged.append
+                sphinx_icontract._build_finished(app=app, exception=None)
+
+        self.assertTrue(any('sphinx-icontract statistics: 5 of 7' in message for message in logged))
+
+        jsonable = json.loads(json_path.read_text())
+        self.assertEqual(10, jsonable['contracts'])
+
+
+if __name__ == '__main__':
+    unittest.main()